@@ -1,10 +1,42 @@
 # webapp/__init__.py
+import itertools
+import time
 from flask import Flask
+from sqlalchemy import inspect, text
 from config import Config
 from .extensions import db, login_manager
 from .models import User
+from .alert_store import AlertWriter, IncidentWriter, import_sinks, seed_rollups
+from snort_manager import importer
+from snort_manager.broadcast import get_broadcaster
+from snort_manager.classify import get_classifier
+from snort_manager.correlate import get_correlator
+from snort_manager.ingester import start_ingester
+from snort_manager.line_index import get_line_index
+from snort_manager.rollup import LEVELS, get_rollups
 
-def create_app():
+def _add_missing_columns():
+    """db.create_all() var olan tablolara kolon eklemez: modele sonradan eklenen
+    nullable kolonları ve index'lerini ekler (ör. severity)."""
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                for index in table.indexes:
+                    if column.name in index.columns:
+                        index.create(conn)
+
+def create_app(pipeline=None):
+    """pipeline: ingest hattını bu süreçte başlat. Varsayılan olarak kontrol
+    daemon'u yoksa (Config.CONTROL_SOCKET boş) başlatılır; daemon varsa hat
+    onun içinde çalışır ve web worker'ları ona bağlanır."""
     app = Flask(__name__)
     app.config.from_object(Config)
 
@@ -16,4 +48,33 @@ def create_app():
 
     with app.app_context():
         db.create_all()
+        _add_missing_columns()
+
+    if pipeline is None:
+        pipeline = not Config.CONTROL_SOCKET
+    if not pipeline:
+        return app
+
+    # Alert log'u arka planda artımlı olarak izle, alert'lere thresholds.yaml'a göre
+    # severity ata, incident'larda birleştirip tabloya yaz, zaman bucket'larında
+    # topla ve açık dashboard'lara (SSE) yayınla
+    writer = AlertWriter(app)
+    incidents = IncidentWriter(app)
+    correlator = get_correlator()
+    correlator.ids = itertools.count(incidents.recover())
+    correlator.add_sink(incidents)
+    rollups = get_rollups()
+    seed_rollups(app, rollups, since=time.time() - max(retention for _, retention in LEVELS),
+                 raw_alerts=Config.STORE_RAW_ALERTS)
+    # Logs görünümünün satır indeksini sadece bu süreç yazar; web worker'ları okur
+    line_index = get_line_index()
+    line_index.writer = True
+    sinks = [correlator, rollups, get_broadcaster(), line_index]
+    if Config.STORE_RAW_ALERTS:
+        sinks.insert(0, writer)
+    start_ingester(checkpoint_loader=writer.load_checkpoint, sinks=sinks, classifier=get_classifier())
+    # Geçmiş log importu (import_logs.py) aynı süreçte arka plan işi olarak çalışır
+    importer.configure(writer.load_checkpoint,
+                       lambda: import_sinks(app, correlator, rollups, raw_alerts=Config.STORE_RAW_ALERTS),
+                       writer.load_checkpoints)
     return app
@@ -0,0 +1,144 @@
+# benchmarks/alert_gen.py
+"""Gerçekçi boyut ve dağılımda sentetik Snort alert log'u üretir.
+
+Formatlar: "console" (-A console), "fast" (-A fast, -y ile yıllı damga) ve
+"alert_json" (Snort 3). IP kardinalitesi ve sid dağılımı (Zipf) ayarlanabilir;
+satırlar binlik parçalar halinde üretilip yazılır, 100M satır da sabit bellekle
+üretilir. --live ile damgalar yazma anıdır (uçtan uca gecikme ölçümü için).
+
+    python -m benchmarks.alert_gen --format console --lines 10000000 --output alerts.log
+    python -m benchmarks.alert_gen --format alert_json --lines 1000000 --sids 20000 --zipf 1.2
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import time
+
+FORMATS = ("console", "fast", "alert_json")
+CHUNK = 1000
+PROTOCOLS = ("TCP", "TCP", "TCP", "UDP", "ICMP")
+PORTS = (80, 443, 22, 53, 25, 445, 3389, 8080)
+CLASSIFICATIONS = ("Attempted Information Leak", "Potentially Bad Traffic", "Misc activity",
+                   "A Network Trojan was detected", "Web Application Attack")
+
+
+def _ip_pool(count, prefix_a, rng):
+    """count adet farklı IPv4 adresi; prefix_a ilk okteti sabitler (en fazla 2^24)."""
+    count = min(count, 1 << 24)
+    seen = set()
+    while len(seen) < count:
+        value = rng.getrandbits(24)
+        seen.add(f"{prefix_a}.{value >> 16}.{(value >> 8) & 255}.{value & 255}")
+    return list(seen)
+
+
+def _zipf_weights(count, s):
+    """s=0 düzgün dağılım; s büyüdükçe az sayıda sid trafiğin çoğunu üretir."""
+    return list(itertools.accumulate(1.0 / (rank ** s) for rank in range(1, count + 1)))
+
+
+class AlertGenerator:
+    def __init__(self, fmt="console", src_ips=10000, dst_ips=1000, sids=5000, zipf=1.1,
+                 start=None, rate=1000.0, seed=1):
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        self.fmt = fmt
+        self.rng = random.Random(seed)
+        self.src_pool = _ip_pool(src_ips, 10, self.rng)
+        self.dst_pool = _ip_pool(dst_ips, 192, self.rng)
+        self.sid_pool = [1000000 + i for i in range(sids)]
+        # sid -> (mesaj, sınıf, öncelik) kuralın sabit özellikleri
+        self.rules = {sid: (f"ET SYNTHETIC rule {sid}", CLASSIFICATIONS[sid % len(CLASSIFICATIONS)], 1 + sid % 4)
+                      for sid in self.sid_pool}
+        self.sid_weights = _zipf_weights(sids, zipf)
+        # start verilmezse damgalar şimdiden geriye doğru, saniyede rate alert olacak şekilde
+        self.start = start
+        self.rate = rate
+
+    def _stamp(self, ts):
+        second = int(ts)
+        fmt = "%m/%d/%y-%H:%M:%S" if self.fmt == "fast" else "%m/%d-%H:%M:%S"
+        return f"{time.strftime(fmt, time.localtime(second))}.{int((ts - second) * 1e6):06d}"
+
+    def chunks(self, count, live=False):
+        """CHUNK satırlık str parçaları üretir."""
+        rng = self.rng
+        start = self.start if self.start is not None else time.time() - count / self.rate
+        produced = 0
+        while produced < count:
+            n = min(CHUNK, count - produced)
+            sids = rng.choices(self.sid_pool, cum_weights=self.sid_weights, k=n)
+            srcs = rng.choices(self.src_pool, k=n)
+            dsts = rng.choices(self.dst_pool, k=n)
+            base = time.time() if live else start + produced / self.rate
+            stamp_cache = {}
+            lines = []
+            for i in range(n):
+                ts = base if live else base + i / self.rate
+                key = int(ts * 1000)
+                stamp = stamp_cache.get(key)
+                if stamp is None:
+                    stamp = stamp_cache[key] = self._stamp(ts)
+                sid = sids[i]
+                msg, cls, priority = self.rules[sid]
+                proto = PROTOCOLS[sid % len(PROTOCOLS)]
+                sport = 1024 + (produced + i) * 7 % 64000
+                dport = PORTS[sid % len(PORTS)]
+                lines.append(self._line(stamp, sid, msg, cls, priority, proto, srcs[i], sport, dsts[i], dport))
+            produced += n
+            yield "".join(lines)
+
+    def _line(self, stamp, sid, msg, cls, priority, proto, src, sport, dst, dport):
+        if self.fmt == "alert_json":
+            return json.dumps({
+                "timestamp": stamp, "proto": proto, "src_addr": src, "src_port": sport,
+                "dst_addr": dst, "dst_port": dport, "gid": 1, "sid": sid, "rev": 1, "msg": msg,
+                "class": cls, "priority": priority, "action": "allow",
+            }) + "\n"
+        if proto == "ICMP":
+            endpoints = f"{src} -> {dst}"
+        else:
+            endpoints = f"{src}:{sport} -> {dst}:{dport}"
+        return (f"{stamp}  [**] [1:{sid}:1] {msg} [**] [Classification: {cls}] "
+                f"[Priority: {priority}] {{{proto}}} {endpoints}\n")
+
+    def lines(self, count):
+        """Bellekteki benchmark'lar için satır listesi (sonunda \\n olmadan)."""
+        result = []
+        for chunk in self.chunks(count):
+            result.extend(chunk.splitlines())
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic Snort alert log generator")
+    parser.add_argument("--format", choices=FORMATS, default="console")
+    parser.add_argument("--lines", type=int, default=1000000)
+    parser.add_argument("--src-ips", type=int, default=10000, help="distinct source addresses")
+    parser.add_argument("--dst-ips", type=int, default=1000, help="distinct destination addresses")
+    parser.add_argument("--sids", type=int, default=5000, help="distinct rules")
+    parser.add_argument("--zipf", type=float, default=1.1, help="sid skew, 0 = uniform")
+    parser.add_argument("--rate", type=float, default=1000.0, help="alerts per second of simulated time")
+    parser.add_argument("--live", action="store_true", help="stamp lines with the time they are written")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="file to write (default stdout)")
+    args = parser.parse_args()
+
+    generator = AlertGenerator(args.format, args.src_ips, args.dst_ips, args.sids, args.zipf,
+                               rate=args.rate, seed=args.seed)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in generator.chunks(args.lines, live=args.live):
+            out.write(chunk.encode())
+        out.flush()
+    except BrokenPipeError:
+        pass
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
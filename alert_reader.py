@@ -0,0 +1,161 @@
+# snort_manager/alert_reader.py
+import glob
+import json
+import os
+import socket
+import struct
+from config import Config
+from .parser import AlertRecord, parse_lines, parse_timestamp, split_endpoint
+
+# Snort 3 alert_json'un varsayılan alanları msg/priority/class içermez, açıkça istiyoruz
+ALERT_JSON_FIELDS = ("timestamp proto src_addr src_port dst_addr dst_port "
+                     "gid sid rev msg class priority action")
+
+PROTOCOLS = {1: "ICMP", 6: "TCP", 17: "UDP", 58: "IPV6-ICMP", 132: "SCTP"}
+
+# unified2 kayıt başlığı: tip, uzunluk (big-endian)
+U2_HEADER = struct.Struct(">II")
+# Event gövdeleri: sensor_id, event_id, saniye, mikrosaniye, sid, gid, rev,
+# classification_id, priority, src, dst, sport/itype, dport/icode, proto, impact_flag, impact, blocked
+U2_EVENTS = {
+    7: (struct.Struct(">9I4s4s2H4B"), socket.AF_INET),
+    72: (struct.Struct(">9I16s16s2H4B"), socket.AF_INET6),
+    # v2 event'ler sonda mpls_label, vlan_id ve padding taşır, okumada yok sayılır
+    104: (struct.Struct(">9I4s4s2H4B"), socket.AF_INET),
+    105: (struct.Struct(">9I16s16s2H4B"), socket.AF_INET6),
+}
+
+
+def _int(value):
+    return int(value) if value not in (None, "") else None
+
+
+def _json_record(event):
+    get = event.get
+    if "src_addr" in event:
+        src_ip, src_port = event["src_addr"], _int(get("src_port"))
+        dst_ip, dst_port = get("dst_addr"), _int(get("dst_port"))
+    else:
+        # Varsayılan alanlar: "1.2.3.4:80" biçiminde src_ap/dst_ap
+        src_ip, src_port = split_endpoint(get("src_ap", ""))
+        dst_ip, dst_port = split_endpoint(get("dst_ap", ""))
+    if "sid" in event:
+        gid, sid, rev = _int(get("gid")), _int(event["sid"]), _int(get("rev"))
+    else:
+        rule = get("rule", "").split(":")
+        gid, sid, rev = (int(x) for x in rule) if len(rule) == 3 else (None, None, None)
+    ts = get("timestamp")
+    return AlertRecord(
+        parse_timestamp(ts) if ts else None, gid, sid, rev,
+        get("msg"), get("class"), _int(get("priority")),
+        get("proto"), src_ip or None, src_port, dst_ip or None, dst_port,
+    )
+
+
+def _safe_record(event):
+    """_json_record; alan değerleri bozuksa (ör. "src_port": "x") None."""
+    try:
+        return _json_record(event)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def parse_json_line(line):
+    """Snort 3 alert_json satırını AlertRecord'a çevirir; alert değilse None döner."""
+    if not line.startswith("{"):
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return _safe_record(event)
+
+
+def parse_json_lines(lines):
+    """Satır listesini tek bir json.loads çağrısıyla (dizi olarak) çözer; bozuk
+    satır varsa satır satır çözmeye geri döner. Alanları bozuk kayıtlar atlanır."""
+    lines = [line for line in lines if line.startswith("{")]
+    try:
+        events = json.loads("[" + ",".join(lines) + "]")
+    except ValueError:
+        return [r for r in map(parse_json_line, lines) if r is not None]
+    return [r for r in map(_safe_record, events) if r is not None]
+
+
+def parse_unified2(buffer):
+    """Tampondaki tam unified2 kayıtlarını çözer: (AlertRecord listesi, tüketilen byte).
+    Paket ve extra-data kayıtları atlanır; yarım kalan kayıt bir sonraki okumaya bırakılır."""
+    records = []
+    pos = 0
+    size = len(buffer)
+    while pos + U2_HEADER.size <= size:
+        rtype, length = U2_HEADER.unpack_from(buffer, pos)
+        end = pos + U2_HEADER.size + length
+        if end > size:
+            break
+        event = U2_EVENTS.get(rtype)
+        # Gövdesi event yapısından kısa kayıt bozuktur, atlanır
+        if event is not None and length >= event[0].size:
+            layout, family = event
+            (_, _, sec, usec, sid, gid, rev, _, priority, src, dst,
+             sport, dport, proto, _, _, _) = layout.unpack_from(buffer, pos + U2_HEADER.size)
+            has_ports = proto in (6, 17, 132)
+            records.append(AlertRecord(
+                sec + usec / 1e6, gid, sid, rev, None, None, priority,
+                PROTOCOLS.get(proto, str(proto)),
+                socket.inet_ntop(family, src), sport if has_ports else None,
+                socket.inet_ntop(family, dst), dport if has_ports else None,
+            ))
+        pos = end
+    return records, pos
+
+
+def iter_unified2(path, chunk_size=1024 * 1024):
+    """Bir unified2 dosyasındaki alert'leri akış halinde üretir."""
+    with open(path, "rb") as f:
+        buffer = b""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            buffer += chunk
+            records, consumed = parse_unified2(buffer)
+            buffer = buffer[consumed:]
+            yield from records
+
+
+def iter_alert_json(path):
+    """Bir alert_json dosyasındaki alert'leri akış halinde üretir."""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            record = parse_json_line(line)
+            if record is not None:
+                yield record
+
+
+# Format -> toplu satır parser'ı (unified2 ikili olduğu için satır tabanlı değildir)
+LINE_PARSERS = {
+    "console": parse_lines,
+    "alert_json": parse_json_lines,
+}
+
+
+def alert_source(log_dir=None):
+    """Config.SNORT_ALERT_MODE'a göre ingester'ın izleyeceği (yol, format).
+    log_dir verilirse (ör. bir Snort instance'ının dizini) dosya modları oradan okunur."""
+    mode = Config.SNORT_ALERT_MODE
+    log_dir = log_dir or Config.SNORT_LOG_DIR
+    if mode == "alert_json":
+        return os.path.join(log_dir, "alert_json.txt"), mode
+    if mode == "unified2":
+        return os.path.join(log_dir, Config.SNORT_UNIFIED2_GLOB), mode
+    return Config.SNORT_LOG_FILE, "console"
+
+
+def resolve_path(path):
+    """Glob desenleri için en yeni dosya; unified2 dosyaları epoch sonekiyle
+    döndüğünden isim sırası zaman sırasıdır."""
+    if not glob.has_magic(path):
+        return path
+    matches = glob.glob(path)
+    return max(matches) if matches else None
@@ -0,0 +1,221 @@
+# webapp/alert_store.py
+import threading
+import time
+from sqlalchemy import bindparam, func
+from snort_manager.correlate import CorrelationEngine
+from .extensions import db
+from .models import Alert, Incident, IngestCheckpoint
+
+ALERT_COLUMNS = ("timestamp", "gid", "sid", "rev", "msg", "classification", "priority",
+                 "proto", "src_ip", "src_port", "dst_ip", "dst_port", "severity")
+INCIDENT_COLUMNS = ("id", "first_seen", "last_seen", "count", "gid", "sid", "rev", "msg", "classification",
+                    "priority", "proto", "src_ip", "dst_ip", "dst_port", "severity", "closed")
+# Seed'de bir incident'ın alert'lerinin yayıldığı en fazla nokta sayısı
+SEED_POINTS = 600
+
+
+def _add_checkpoint(checkpoints, checkpoint):
+    """Bekleyen checkpoint'lere (yol, inode, offset) ekler. Aynı yolda inode
+    değiştiyse (rotate) önceki dosyanın son offset'i "<yol>@<inode>" anahtarıyla
+    kalır; import canlı ingester'ın okuduğu döndürülmüş dosyaları buradan bilir."""
+    path, inode, offset = checkpoint
+    previous = checkpoints.get(path)
+    if previous and previous[0] != inode:
+        checkpoints[f"{path}@{previous[0]}"] = previous
+    checkpoints[path] = (inode, offset)
+
+
+def _save_checkpoints(conn, checkpoints):
+    cp = IngestCheckpoint.__table__
+
+    def upsert(path, inode, offset):
+        updated = conn.execute(
+            cp.update().where(cp.c.path == path).values(inode=inode, offset=offset)
+        ).rowcount
+        if not updated:
+            conn.execute(cp.insert().values(path=path, inode=inode, offset=offset))
+
+    for path, (inode, offset) in checkpoints.items():
+        row = conn.execute(db.select(cp.c.inode, cp.c.offset).where(cp.c.path == path)).first()
+        if row is not None and row.inode is not None and row.inode != inode:
+            # Önceki flush'ta yazılmış dosya döndürülmüş: son offset'i geçmişte kalır
+            key = f"{path}@{row.inode}"
+            if key not in checkpoints:
+                upsert(key, row.inode, row.offset)
+        upsert(path, inode, offset)
+
+
+class AlertWriter:
+    """Ingester'dan gelen AlertRecord'ları biriktirip toplu (executemany) olarak
+    Alert tablosuna yazar. Okuma checkpoint'i aynı transaction'da güncellenir,
+    böylece yeniden başlatmada alert'ler tekrar yazılmaz."""
+
+    def __init__(self, app, batch_size=5000, flush_interval=1.0):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._rows = []
+        self._checkpoints = {}
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def load_checkpoint(self, path):
+        """(inode, offset) döner; kayıt yoksa (None, 0)."""
+        with self.app.app_context():
+            cp = db.session.get(IngestCheckpoint, path)
+            result = (cp.inode, cp.offset) if cp else (None, 0)
+            db.session.remove()
+        return result
+
+    def load_checkpoints(self):
+        """Tüm checkpoint'ler: {anahtar: (inode, offset)}; döndürülmüş dosyaların
+        "<yol>@<inode>" kayıtları dahil (bkz. _add_checkpoint)."""
+        with self.app.app_context():
+            rows = db.session.query(IngestCheckpoint.path, IngestCheckpoint.inode, IngestCheckpoint.offset).all()
+            db.session.remove()
+        return {path: (inode, offset) for path, inode, offset in rows}
+
+    def write(self, records, checkpoint):
+        self._rows.extend(dict(zip(ALERT_COLUMNS, r)) for r in records)
+        _add_checkpoint(self._checkpoints, checkpoint)
+        self._dirty = True
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def tick(self):
+        if self._dirty and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        rows = self._rows
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                for i in range(0, len(rows), self.batch_size):
+                    conn.execute(Alert.__table__.insert(), rows[i:i + self.batch_size])
+                _save_checkpoints(conn, self._checkpoints)
+        # Hata durumunda satırlar bir sonraki flush'ta tekrar denenir
+        self._rows = []
+        self._checkpoints = {}
+        self.written += len(rows)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+
+class IncidentWriter:
+    """CorrelationEngine çıktısını Incident tablosuna yazar. İlk kez görülen
+    incident'lar toplu insert, daha önce yazılmış açık olanlar toplu update
+    edilir; checkpoint aynı transaction'da güncellenir. Saniyede bir, sadece
+    değişen incident'lar yazıldığı için yazma hacmi alert sayısından bağımsızdır."""
+
+    def __init__(self, app, batch_size=5000):
+        self.app = app
+        self.batch_size = batch_size
+        self.written = 0
+        self._stored = set()  # tabloda satırı olan açık incident id'leri
+        self._pending = {}
+        self._checkpoints = {}
+
+    def recover(self):
+        """Önceki çalışmadan açık kalan incident'ları kapatır; yeni incident'ların
+        başlayacağı id'yi döner."""
+        table = Incident.__table__
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(table.update().where(table.c.closed.is_(False)).values(closed=True))
+                last_id = conn.execute(db.select(func.max(table.c.id))).scalar() or 0
+        return last_id + 1
+
+    def write_incidents(self, incidents, checkpoint):
+        for incident in incidents:
+            self._pending[incident.id] = incident
+        if checkpoint:
+            _add_checkpoint(self._checkpoints, checkpoint)
+        self.flush()
+
+    def flush(self):
+        incidents = list(self._pending.values())
+        inserts = [dict(zip(INCIDENT_COLUMNS, i)) for i in incidents if i.id not in self._stored]
+        updates = [{"b_id": i.id, "first_seen": i.first_seen, "last_seen": i.last_seen, "count": i.count,
+                    "closed": i.closed} for i in incidents if i.id in self._stored]
+        table = Incident.__table__
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                for i in range(0, len(inserts), self.batch_size):
+                    conn.execute(table.insert(), inserts[i:i + self.batch_size])
+                if updates:
+                    statement = (table.update().where(table.c.id == bindparam("b_id"))
+                                 .values(first_seen=bindparam("first_seen"), last_seen=bindparam("last_seen"),
+                                         count=bindparam("count"), closed=bindparam("closed")))
+                    for i in range(0, len(updates), self.batch_size):
+                        conn.execute(statement, updates[i:i + self.batch_size])
+                _save_checkpoints(conn, self._checkpoints)
+        # Hata durumunda bekleyenler bir sonraki çağrıda tekrar denenir
+        for incident in incidents:
+            if incident.closed:
+                self._stored.discard(incident.id)
+            else:
+                self._stored.add(incident.id)
+        self._pending = {}
+        self._checkpoints = {}
+        self.written += len(incidents)
+
+
+def import_sinks(app, correlator, rollups, raw_alerts=False):
+    """Geçmiş log importu için sink'ler. Import kendi korelasyon motorunu kullanır
+    (eski alert'ler canlı incident'lara karışmasın) ama id'leri canlı motordan alır;
+    incident'lar ve checkpoint her aralıktan sonra yazılır, rollup'lar canlıdır."""
+    engine = CorrelationEngine(correlator.window, correlator.max_open, flush_interval=0, ids=correlator.ids)
+    engine.add_sink(IncidentWriter(app))
+    sinks = [engine, rollups]
+    if raw_alerts:
+        sinks.insert(0, AlertWriter(app, flush_interval=0))
+    return sinks
+
+
+def _spread(rows):
+    """Incident satırlarını (ilk, son, priority, sid, kaynak, hedef, port, sayı) ağırlıklı
+    rollup satırlarına çevirir: sayı ilk..son aralığında en fazla SEED_POINTS eşit
+    aralıklı noktaya bölünür. Maliyet incident başına sabittir, alert sayısına bağlı değil."""
+    for first, last, priority, sid, src, dst, port, count in rows:
+        first = first if first is not None else last
+        points = max(min(count, int(last - first) + 1, SEED_POINTS), 1)
+        step = (last - first) / (points - 1) if points > 1 else 0
+        share, extra = divmod(count, points)
+        for i in range(points):
+            yield (first + i * step, priority, sid, src, dst, port), share + (i < extra)
+
+
+def seed_rollups(app, rollups, since, raw_alerts=True):
+    """Yeniden başlatmada rollup'ları tablodaki son alert'lerle doldurur. Sınır id
+    ingester başlamadan okunur; sonraki satırlar zaten ingest sink'inden gelir.
+    Ham alert'ler saklanmıyorsa incident'lar kullanılır: her incident'ın sayısı
+    ilk ve son görülme zamanı arasına yayılır (bkz. _spread)."""
+    model = Alert if raw_alerts else Incident
+    with app.app_context():
+        last_id = db.session.query(func.max(model.id)).scalar() or 0
+        db.session.remove()
+
+    def run():
+        if raw_alerts:
+            columns = (Alert.timestamp, Alert.priority, Alert.sid, Alert.src_ip, Alert.dst_ip, Alert.dst_port)
+            query = db.select(*columns).where(Alert.id <= last_id, Alert.timestamp >= since)
+        else:
+            columns = (Incident.first_seen, Incident.last_seen, Incident.priority, Incident.sid, Incident.src_ip,
+                       Incident.dst_ip, Incident.dst_port, Incident.count)
+            query = db.select(*columns).where(Incident.id <= last_id, Incident.last_seen >= since)
+        query = query.execution_options(yield_per=10000)
+        try:
+            with app.app_context():
+                with db.engine.connect() as conn:
+                    for rows in conn.execute(query).partitions():
+                        if raw_alerts:
+                            rollups.add_rows(rows)
+                        else:
+                            rollups.add_rows(_spread(rows), weighted=True)
+                        rollups.flush()
+        except Exception as e:
+            print(f"Rollup seed error: {e}")
+
+    if last_id:
+        threading.Thread(target=run, name="rollup-seed", daemon=True).start()
@@ -0,0 +1,226 @@
+# snort_manager/backend.py
+import contextlib
+import fcntl
+import json
+import os
+import socket
+import socketserver
+from config import Config
+from . import controller, importer
+from .broadcast import get_broadcaster
+from .jobs import get_job_manager
+from .perf import get_perf_collector
+from .rollup import get_rollups
+
+# Kontrol soketi üzerinden çağrılabilen işlemler (LocalBackend metotları)
+OPERATIONS = ("snort_status", "instances", "capture_stats", "submit", "job", "jobs", "reload_rules",
+              "reload_status", "rule_profile", "profile_session", "mark", "perf_series", "rollup_query",
+              "rollup_top")
+CONNECT_TIMEOUT = 30
+
+
+class LocalBackend:
+    """Snort, ingest ve rollup durumuna süreç içinden erişim. Tek süreçli
+    sunumda (run.py) web süreci, çok worker'lı sunumda kontrol daemon'u
+    bunu kullanır. Dönüş değerleri JSON'a çevrilebilir olmalıdır."""
+
+    # action -> (iş fonksiyonu, key); aynı key'li işler aynı anda çalışmaz
+    ACTIONS = {
+        "start": (controller.start_job, "snort"),
+        "stop": (controller.stop_job, "snort"),
+        "import": (importer.import_job, "import"),
+    }
+
+    def snort_status(self):
+        return controller.get_snort_status()
+
+    def instances(self):
+        return controller.get_instances_status()
+
+    def capture_stats(self):
+        return controller.get_capture_stats()
+
+    def submit(self, action, **kwargs):
+        """Başlat/durdur/import işini kuyruğa koyar; aynı türden bir işlem sürüyorsa ValueError."""
+        if action not in self.ACTIONS:
+            raise ValueError(f"unknown action {action}")
+        func, key = self.ACTIONS[action]
+        return get_job_manager().submit(action, func, key=key, **kwargs).to_dict()
+
+    def job(self, job_id):
+        job = get_job_manager().get(job_id)
+        return job.to_dict() if job else None
+
+    def jobs(self, limit=10):
+        return [job.to_dict() for job in get_job_manager().recent(limit)]
+
+    def reload_rules(self, summary=""):
+        return controller.reload_rules(summary)
+
+    def reload_status(self):
+        return controller.get_reload_status()
+
+    def rule_profile(self):
+        totals = controller.get_rule_profile()
+        return None if totals is None else list(totals.values())
+
+    def profile_session(self):
+        return controller.get_profile_session()
+
+    def mark(self, label):
+        get_perf_collector().mark(label)
+
+    def perf_series(self, since=0):
+        return get_perf_collector().series(since=since)
+
+    def rollup_query(self, window, bucket=None, group_by=None, limit=10):
+        return get_rollups().query(window, bucket, group_by, limit)
+
+    def rollup_top(self, dim, k, window, bucket=None):
+        return get_rollups().top(dim, k, window, bucket)
+
+    def stream(self):
+        """SSE mesajları (str) üreten generator."""
+        broadcaster = get_broadcaster()
+        return broadcaster.stream(broadcaster.subscribe())
+
+
+class RemoteBackend:
+    """LocalBackend ile aynı arayüz; her çağrı kontrol daemon'una Unix soketi
+    üzerinden tek satırlık bir JSON isteğidir. Tüm gunicorn worker'ları aynı
+    Snort süreçlerini, işleri ve alert akışını görür."""
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+
+    def _connect(self, op, args):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps({"op": op, "args": args}).encode() + b"\n")
+        except OSError as e:
+            sock.close()
+            raise ConnectionError(f"Snort control daemon is not reachable at {self.socket_path}: {e}") from e
+        return sock
+
+    def _call(self, op, **args):
+        sock = self._connect(op, args)
+        try:
+            with sock.makefile("rb") as f:
+                line = f.readline()
+        except OSError as e:
+            raise ConnectionError(f"Snort control daemon did not answer {op}: {e}") from e
+        finally:
+            sock.close()
+        if not line:
+            raise ConnectionError(f"Snort control daemon closed the connection during {op}")
+        response = json.loads(line)
+        if "error" in response:
+            raise (ValueError if response.get("type") == "ValueError" else RuntimeError)(response["error"])
+        return response["result"]
+
+    def __getattr__(self, op):
+        if op not in OPERATIONS:
+            raise AttributeError(op)
+        return lambda **args: self._call(op, **args)
+
+    def stream(self):
+        # Bağlantı hemen kurulur: daemon kapalıysa hata yanıt başlamadan yükselir
+        sock = self._connect("stream", {})
+        sock.settimeout(None)
+
+        def messages():
+            try:
+                with sock.makefile("rb") as f:
+                    for line in f:
+                        yield json.loads(line)
+            finally:
+                sock.close()
+        return messages()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            op, args = request["op"], request.get("args") or {}
+        except (ValueError, KeyError, TypeError):
+            return
+        backend = self.server.backend
+        if op == "stream":
+            # Yayıncıdan gelen her SSE mesajı bir JSON satırı; istemci kopunca
+            # yazma hata verir ve generator kapanarak aboneliği bırakır
+            with contextlib.closing(backend.stream()) as messages:
+                for message in messages:
+                    try:
+                        self.wfile.write(json.dumps(message).encode() + b"\n")
+                        self.wfile.flush()
+                    except OSError:
+                        return
+            return
+        try:
+            if op not in OPERATIONS:
+                raise ValueError(f"unknown operation {op}")
+            response = {"result": getattr(backend, op)(**args)}
+        except Exception as e:
+            response = {"error": str(e), "type": type(e).__name__}
+        try:
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+        except OSError:
+            pass
+
+
+class ControlServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, backend):
+        if os.path.exists(socket_path):
+            # Önceki daemon'dan kalan soket; PID kilidi tek daemon olduğunu garanti eder
+            os.unlink(socket_path)
+        self.backend = backend
+        super().__init__(socket_path, _Handler)
+        # Soket Snort'u başlatıp durdurabilir: sadece sahibi ve grubu bağlanabilsin
+        os.chmod(socket_path, 0o660)
+
+
+def acquire_pid_file(path):
+    """PID dosyasını kilitler ve içine PID yazar; başka bir daemon çalışıyorsa
+    RuntimeError. Kilit dönen dosya açık kaldığı sürece tutulur."""
+    f = open(path, "a+")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.seek(0)
+        pid = f.read().strip()
+        f.close()
+        raise RuntimeError(f"Snort control daemon is already running (pid {pid or '?'})")
+    f.seek(0)
+    f.truncate()
+    f.write(f"{os.getpid()}\n")
+    f.flush()
+    return f
+
+
+def daemon_running(socket_path):
+    try:
+        RemoteBackend(socket_path).snort_status()
+        return True
+    except (ConnectionError, RuntimeError):
+        return False
+
+
+_backend = None
+
+
+def get_backend():
+    """Config.CONTROL_SOCKET ayarlıysa daemon'a bağlanan, değilse süreç içi backend."""
+    global _backend
+    if _backend is None:
+        _backend = RemoteBackend(Config.CONTROL_SOCKET) if Config.CONTROL_SOCKET else LocalBackend()
+    return _backend
+
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
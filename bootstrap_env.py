@@ -75,6 +75,15 @@ THRESHOLDS_YAML_CONTENT = """# Snort öncelik ➜ tehlike seviyesi eşlemesi
 2: warning
 3: safe
 4: safe
+# Eşlemede olmayan öncelikler
+default: warning
+# SID bazında istisnalar (önceliğe göre eşlemeden önce uygulanır)
+# sids:
+#   1000001: danger
+# Hedef ya da kaynak IP'ye göre istisnalar, en uzun önek kazanır
+# subnets:
+#   10.0.0.0/8: warning
+#   10.0.5.0/24: danger
 """
 
 # ------------------ Yardımcılar ------------------
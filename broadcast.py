@@ -0,0 +1,113 @@
+# snort_manager/broadcast.py
+import heapq
+import json
+import threading
+import time
+from collections import deque
+
+RECENT_ALERTS = 20
+# Mesaj başına en fazla bu kadar hedef IP deltası; tarama sırasında mesajlar şişmesin
+MAX_DST = 20
+
+
+class _Client:
+    """Tek bir SSE bağlantısının sınırlı tamponu. Tampon taşarsa en eski delta
+    atılır ve bir sonraki mesajda istemciden yeniden senkron olması istenir."""
+
+    def __init__(self, buffer_size):
+        self.queue = deque(maxlen=buffer_size)
+        self.overflowed = False
+        self.ready = threading.Event()
+
+
+class AlertBroadcaster:
+    """Ingester sink'i: N açık dashboard için tek bir tail'den beslenir. Gelen
+    alert'ler interval boyunca birleştirilir (hedef IP başına delta, toplam, son
+    birkaç alert) ve her abonenin kuyruğuna tek bir mesaj olarak konur."""
+
+    def __init__(self, interval=1.0, buffer_size=60):
+        self.interval = interval
+        self.buffer_size = buffer_size
+        self.clients = set()
+        self._lock = threading.Lock()
+        self._dst = {}
+        self._priority = {}
+        self._total = 0
+        self._recent = deque(maxlen=RECENT_ALERTS)
+        self._last_emit = time.monotonic()
+
+    def subscribe(self):
+        client = _Client(self.buffer_size)
+        with self._lock:
+            self.clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self.clients.discard(client)
+
+    def write(self, records, checkpoint):
+        if not records or not self.clients:
+            return
+        with self._lock:
+            dst = self._dst
+            priority = self._priority
+            for r in records:
+                if r.dst_ip is not None:
+                    dst[r.dst_ip] = dst.get(r.dst_ip, 0) + 1
+                if r.priority is not None:
+                    priority[r.priority] = priority.get(r.priority, 0) + 1
+            self._total += len(records)
+            self._recent.extend(records[-RECENT_ALERTS:])
+
+    def tick(self):
+        now = time.monotonic()
+        if now - self._last_emit < self.interval:
+            return
+        self._last_emit = now
+        with self._lock:
+            if not self._total:
+                return
+            message = json.dumps({
+                "ts": time.time(),
+                "total": self._total,
+                "dst": dict(heapq.nlargest(MAX_DST, self._dst.items(), key=lambda item: item[1])),
+                "priority": self._priority,
+                "recent": [{"ts": r.ts, "sid": r.sid, "msg": r.msg, "priority": r.priority,
+                            "src": r.src_ip, "dst": r.dst_ip} for r in self._recent],
+            })
+            self._dst, self._priority, self._total = {}, {}, 0
+            self._recent.clear()
+            for client in self.clients:
+                if len(client.queue) == client.queue.maxlen:
+                    client.overflowed = True
+                client.queue.append(message)
+                client.ready.set()
+
+    def stream(self, client, keepalive=15.0):
+        """SSE biçiminde mesaj üreten generator; bağlantı kapanınca abonelikten çıkar."""
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                if not client.ready.wait(keepalive):
+                    yield ": keepalive\n\n"
+                    continue
+                client.ready.clear()
+                if client.overflowed:
+                    # Yavaş istemci delta kaçırdı: toplamları yeniden çekmesi gerekir
+                    client.overflowed = False
+                    yield "event: resync\ndata: {}\n\n"
+                while client.queue:
+                    yield f"data: {client.queue.popleft()}\n\n"
+        finally:
+            self.unsubscribe(client)
+
+
+_broadcaster = None
+
+
+def get_broadcaster():
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = AlertBroadcaster()
+    return _broadcaster
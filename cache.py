@@ -0,0 +1,128 @@
+# webapp/cache.py
+import functools
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from flask import Response, request
+from sqlalchemy import func
+from config import Config
+from snort_manager.segments import MANIFEST_SUFFIX
+from .extensions import db
+from .models import Incident
+
+
+class ResponseCache:
+    """API yanıtlarının LRU önbelleği. Anahtar endpoint + sorgu parametreleri;
+    her kayıt üretildiği andaki ingest watermark'ıyla saklanır ve watermark
+    değişince yeniden hesaplanır. Bellek gövde boyutlarının toplamıyla sınırlıdır."""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, watermark):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != watermark:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, watermark, body, mimetype, etag):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+            self._entries[key] = (watermark, body, mimetype, etag)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+
+def alert_watermark():
+    """Son açılan incident'ın id'si, en son alert zamanı ve toplam alert sayısı;
+    tüm worker'lar aynı veritabanını görür. Açık incident'lar yerinde güncellenir ve
+    sıra dışı gelen bir alert last_seen'i ilerletmeyebilir, sayaç toplamı yine de
+    değişir. Sadece alert sayılarını izler: incident'ın kapanması (closed)
+    watermark'ı değiştirmez."""
+    return (db.session.query(func.max(Incident.id)).scalar(),
+            db.session.query(func.max(Incident.last_seen)).scalar(),
+            db.session.query(func.sum(Incident.count)).scalar())
+
+
+def log_watermark():
+    """Alert log dosyasının ve segment manifest'inin boyutu/değişme zamanı."""
+    mark = []
+    for path in (Config.SNORT_LOG_FILE, Config.SNORT_LOG_FILE + MANIFEST_SUFFIX):
+        try:
+            st = os.stat(path)
+            mark.append((st.st_size, st.st_mtime_ns))
+        except OSError:
+            mark.append(None)
+    return tuple(mark)
+
+
+def windowed(watermark, resolution=1):
+    """Son N saniyelik pencereler alert gelmese de kayar: watermark'a zaman dilimi eklenir."""
+    return lambda: (watermark(), int(time.time() // resolution))
+
+
+def cached(watermark):
+    """GET view'ının 200 yanıtlarını watermark değişene kadar önbellekten verir.
+    Yanıta gövdeden hesaplanan ETag konur; If-None-Match eşleşirse 304 döner,
+    böylece veri değişmediği sürece açık dashboard'lar gövdeyi tekrar indirmez."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET":
+                return view(*args, **kwargs)
+            # "_": jQuery'nin önbellek kırıcı parametresi, çıktıyı etkilemez
+            key = (request.endpoint, tuple(sorted((k, v) for k, v in request.args.items(multi=True) if k != "_")),
+                   tuple(sorted(kwargs.items())))
+            mark = watermark()
+            cache = get_response_cache()
+            entry = cache.get(key, mark)
+            if entry is None:
+                response = view(*args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+                cache.put(key, mark, body, response.mimetype, etag)
+            else:
+                _, body, mimetype, etag = entry
+                response = Response(body, mimetype=mimetype)
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+_cache = None
+
+
+def get_response_cache():
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(Config.RESPONSE_CACHE_BYTES)
+    return _cache
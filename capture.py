@@ -0,0 +1,143 @@
+# snort_manager/capture.py
+import os
+import queue
+import threading
+import time
+
+READ_CHUNK = 256 * 1024
+
+
+class LogCapture:
+    """Snort stdout'unu büyük parçalar halinde okur, satırları toplu olarak sınırlı
+    bir kuyruğa koyar; ayrı bir yazıcı thread'i boyut/zaman eşiğinde dosyaya flush eder.
+
+    Kuyruk dolarsa okuyucu put_timeout kadar bekler (backpressure); hâlâ doluysa
+    parti atılır ve dropped sayacı artar. Böylece pipe dolup Snort'u durdurmaz.
+
+    rotator (bkz. segments.SegmentManager) verilirse dosya her flush'tan sonra
+    boyut/yaş eşiğinde döndürülür; satırlar partiler arasında bölünmez."""
+
+    def __init__(self, path, max_batches=256, flush_bytes=256 * 1024, flush_interval=0.5,
+                 put_timeout=0.5, on_write=None, rotator=None):
+        self.path = path
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.on_write = on_write
+        self.rotator = rotator
+        self.lines_read = 0
+        self.lines_written = 0
+        self.lines_dropped = 0
+        self.bytes_written = 0
+        # Kaynak (ör. Snort instance adı) başına okunan satır sayısı
+        self.stream_lines = {}
+        self._queue = queue.Queue(maxsize=max_batches)
+        self._pending_lines = 0
+        self._readers = 0
+        self._lock = threading.Lock()
+        self._writer = None
+
+    def attach(self, stream, name=None):
+        """Bir pipe'ı (ör. Popen.stdout) okumaya başlar; gerekirse yazıcıyı başlatır.
+        Birden fazla pipe aynı dosyaya tek yazıcı üzerinden birleştirilir."""
+        with self._lock:
+            self._readers += 1
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name="log-writer", daemon=True)
+                self._writer.start()
+        threading.Thread(target=self._read_loop, args=(stream, name), name="log-reader", daemon=True).start()
+
+    def join(self, timeout=None):
+        if self._writer:
+            self._writer.join(timeout)
+
+    def stats(self):
+        return {
+            "lines_read": self.lines_read,
+            "lines_written": self.lines_written,
+            "lines_dropped": self.lines_dropped,
+            "backlog_lines": self._pending_lines,
+            "backlog_batches": self._queue.qsize(),
+            "bytes_written": self.bytes_written,
+        }
+
+    def _read_loop(self, stream, name):
+        fd = stream.fileno()
+        partial = b""
+        try:
+            while True:
+                chunk = os.read(fd, READ_CHUNK)
+                if not chunk:
+                    break
+                data = partial + chunk
+                cut = data.rfind(b"\n") + 1
+                if not cut:
+                    partial = data
+                    continue
+                partial = data[cut:]
+                self._enqueue(data[:cut], name)
+            if partial:
+                self._enqueue(partial + b"\n", name)
+        finally:
+            with self._lock:
+                self._readers -= 1
+
+    def _enqueue(self, batch, name):
+        lines = batch.count(b"\n")
+        try:
+            self._queue.put((batch, lines), timeout=self.put_timeout)
+            queued = True
+        except queue.Full:
+            queued = False
+        with self._lock:
+            self.lines_read += lines
+            self.stream_lines[name] = self.stream_lines.get(name, 0) + lines
+            if queued:
+                self._pending_lines += lines
+            else:
+                self.lines_dropped += lines
+
+    def _write_loop(self):
+        log_file = open(self.path, "ab")
+        try:
+            buffered = []
+            size = 0
+            lines = 0
+            last_flush = time.monotonic()
+            while True:
+                wait = max(self.flush_interval - (time.monotonic() - last_flush), 0.01)
+                try:
+                    batch, count = self._queue.get(timeout=wait)
+                    buffered.append(batch)
+                    size += len(batch)
+                    lines += count
+                except queue.Empty:
+                    pass
+                if buffered and (size >= self.flush_bytes
+                                 or time.monotonic() - last_flush >= self.flush_interval):
+                    self._flush(log_file, buffered, lines)
+                    buffered, size, lines = [], 0, 0
+                    if self.rotator and self.rotator.due(log_file.tell()):
+                        log_file.close()
+                        self.rotator.rotate()
+                        log_file = open(self.path, "ab")
+                if not buffered:
+                    last_flush = time.monotonic()
+                    with self._lock:
+                        if self._readers == 0 and self._queue.empty():
+                            self._writer = None
+                            return
+        finally:
+            log_file.close()
+
+    def _flush(self, log_file, buffered, lines):
+        data = b"".join(buffered).decode("utf-8", errors="ignore").encode("utf-8")
+        offset = log_file.tell()
+        log_file.write(data)
+        log_file.flush()
+        with self._lock:
+            self.lines_written += lines
+            self._pending_lines -= lines
+            self.bytes_written += len(data)
+        if self.on_write:
+            self.on_write(offset, data)
@@ -0,0 +1,225 @@
+# snort_manager/classify.py
+import ipaddress
+import os
+import re
+import threading
+import time
+from config import Config
+from .parser import AlertRecord
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+SEVERITIES = ("danger", "warning", "safe")
+# bootstrap_env.py'nin ürettiği eşleme; dosya yoksa bu kullanılır
+DEFAULT_THRESHOLDS = {1: "danger", 2: "warning", 3: "safe", 4: "safe"}
+DEFAULT_SEVERITY = "warning"
+# Eşik dosyasının değişip değişmediğine en fazla bu sıklıkta (saniye) bakılır
+RELOAD_CHECK = 2.0
+# IP -> alt ağ istisnası önbelleği; dolunca temizlenir
+IP_CACHE_SIZE = 65536
+# "anahtar: değer"; anahtar IPv6 öneki olabileceği için ilk ": " ya da satır sonundaki ":" ayırır
+SIMPLE_LINE_RE = re.compile(r"^(?P<key>.+?):(?:\s+(?P<value>.*))?$")
+
+
+def _scalar(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return int(value) if value.lstrip("-").isdigit() else value
+
+
+def _parse_simple_yaml(text):
+    """PyYAML kurulu değilse: "anahtar: değer" satırları ve bir seviye girintili
+    eşlemeler (sids:, subnets:). thresholds.yaml için yeterli alt küme."""
+    data = {}
+    section = None
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.split("#", 1)[0].rstrip()
+        if not line.strip():
+            continue
+        m = SIMPLE_LINE_RE.match(line.strip())
+        if m is None:
+            raise ValueError(f"line {number}: expected 'key: value'")
+        key, value = m.group("key"), m.group("value") or ""
+        if raw[0] in " \t":
+            if section is None:
+                raise ValueError(f"line {number}: unexpected indentation")
+            section[_scalar(key)] = _scalar(value)
+        elif value.strip():
+            data[_scalar(key)] = _scalar(value)
+            section = None
+        else:
+            section = data[_scalar(key)] = {}
+    return data
+
+
+def load_thresholds(path):
+    with open(path) as f:
+        text = f.read()
+    if yaml is None:
+        return _parse_simple_yaml(text)
+    try:
+        return yaml.safe_load(text) or {}
+    except yaml.YAMLError as e:
+        raise ValueError(str(e)) from e
+
+
+def _severity(value, where):
+    if value not in SEVERITIES:
+        raise ValueError(f"{where}: severity must be one of {', '.join(SEVERITIES)}, not {value!r}")
+    return value
+
+
+class PrefixTrie:
+    """CIDR önekleri için ikili trie; lookup en uzun eşleşen önekin değerini döner.
+    IPv4 ve IPv6 ayrı köklerde tutulur. Düğüm: [0 çocuğu, 1 çocuğu, değer]."""
+
+    def __init__(self):
+        self._roots = {4: [None, None, None], 6: [None, None, None]}
+        self.size = 0
+
+    def insert(self, network, value):
+        network = ipaddress.ip_network(network, strict=False)
+        node = self._roots[network.version]
+        bits, width = int(network.network_address), network.max_prefixlen
+        for i in range(network.prefixlen):
+            bit = (bits >> (width - 1 - i)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+        node[2] = value
+        self.size += 1
+
+    def lookup(self, ip):
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+        node = self._roots[address.version]
+        bits, width = int(address), address.max_prefixlen
+        found = node[2]
+        for i in range(width):
+            node = node[(bits >> (width - 1 - i)) & 1]
+            if node is None:
+                break
+            if node[2] is not None:
+                found = node[2]
+        return found
+
+
+def compile_thresholds(data):
+    """thresholds.yaml içeriğini (priority eşlemesi, sid istisnaları, alt ağ trie'si,
+    varsayılan) demetine çevirir; geçersiz değerde ValueError."""
+    if not isinstance(data, dict):
+        raise ValueError("thresholds file must be a mapping")
+    priorities, sids, subnets = {}, {}, PrefixTrie()
+    default = DEFAULT_SEVERITY
+    for key, value in data.items():
+        if key == "sids":
+            for sid, severity in (value or {}).items():
+                sids[int(sid)] = _severity(severity, f"sid {sid}")
+        elif key == "subnets":
+            for network, severity in (value or {}).items():
+                subnets.insert(network, _severity(severity, f"subnet {network}"))
+        elif key == "default":
+            default = _severity(value, "default")
+        elif isinstance(key, int) or str(key).isdigit():
+            priorities[int(key)] = _severity(value, f"priority {key}")
+        else:
+            raise ValueError(f"unknown key {key!r}")
+    return priorities or dict(DEFAULT_THRESHOLDS), sids, subnets, default
+
+
+class Classifier:
+    """Alert'lere thresholds.yaml'a göre önem derecesi (danger/warning/safe) atar.
+    Öncelik sırası: sid istisnası, hedef ya da kaynak IP'nin en uzun eşleşen alt
+    ağ istisnası, Snort priority eşlemesi, default.
+
+    Kurallar yüklenirken bir kez derlenir. classify() en fazla RELOAD_CHECK
+    saniyede bir dosyanın mtime/boyutuna bakar ve değiştiyse yeniden yükler; hatalı
+    dosyada önceki kurallar korunur. Toplu sınıflandırmada her farklı
+    (sid, priority, kaynak, hedef) bir kez değerlendirilir, port taraması gibi
+    tekrarlı alert'ler sözlük aramasına iner."""
+
+    def __init__(self, path):
+        self.path = path
+        self.error = None
+        self._stamp = None
+        # (priority eşlemesi, sid istisnaları, alt ağ trie'si, varsayılan, IP önbelleği)
+        self._rules = compile_thresholds({}) + ({},)
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Dosya değiştiyse yeniden yükler; kurallar değiştiyse True."""
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stamp = None
+        with self._lock:
+            if stamp == self._stamp:
+                return False
+            self._stamp = stamp
+            try:
+                rules = compile_thresholds(load_thresholds(self.path) if stamp else {})
+            except (OSError, ValueError) as e:
+                self.error = str(e)
+                print(f"Threshold file {self.path} ignored: {e}")
+                return False
+            self._rules = rules + ({},)
+            self.error = None
+        return True
+
+    @staticmethod
+    def _subnet(subnets, cache, ip):
+        if ip is None:
+            return None
+        # Önbellek thread'ler arasında paylaşılır; başka bir thread arada clear()
+        # edebilir, sonuç yerel değişkenden döner
+        subnet = cache.get(ip, cache)
+        if subnet is cache:
+            if len(cache) >= IP_CACHE_SIZE:
+                cache.clear()
+            subnet = cache[ip] = subnets.lookup(ip)
+        return subnet
+
+    def classify(self, records):
+        """records'un severity alanı doldurulmuş kopyaları."""
+        now = time.monotonic()
+        if now - self._checked >= RELOAD_CHECK:
+            self._checked = now
+            self.reload()
+        priorities, sids, subnets, default, cache = self._rules
+        make = AlertRecord._make
+        if not sids and not subnets.size:
+            # Sadece priority eşlemesi: kayıt başına tek sözlük araması
+            return [make(r[:-1] + (priorities.get(r.priority, default),)) for r in records]
+        memo = {}
+        result = []
+        for r in records:
+            key = (r.sid, r.priority, r.src_ip, r.dst_ip)
+            severity = memo.get(key)
+            if severity is None:
+                severity = sids.get(r.sid)
+                if severity is None and subnets.size:
+                    severity = self._subnet(subnets, cache, r.dst_ip) or self._subnet(subnets, cache, r.src_ip)
+                if severity is None:
+                    severity = priorities.get(r.priority, default)
+                memo[key] = severity
+            result.append(make(r[:-1] + (severity,)))
+        return result
+
+
+_classifier = None
+
+
+def get_classifier():
+    global _classifier
+    if _classifier is None:
+        _classifier = Classifier(Config.THRESHOLDS_FILE)
+    return _classifier
@@ -6,9 +6,46 @@ class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "my_secret_key")
     SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(BASE_DIR, 'snort_ids.db')}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Ingest thread'i yazarken web istekleri "database is locked" almasın
+    SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 30}}
     
     # Snort ile ilgili varsayılan ayarlar
-    SNORT_CONFIG_PATH = "/etc/snort/snort.conf"
+    # Alert çıktısı: "console" (Snort 2, stdout metni yakalanır) ya da "alert_json" /
+    # "unified2" (Snort 3, dosyadan okunur). installer.py apt'tan Snort 2 kurduğu için
+    # varsayılan console; Snort 3 kurulumlarında SNORT_ALERT_MODE ile seçilir.
+    SNORT_ALERT_MODE = os.environ.get("SNORT_ALERT_MODE", "console")
+    SNORT_CONFIG_PATH = "/etc/snort/snort.conf" if SNORT_ALERT_MODE == "console" else "/etc/snort/snort.lua"
     SNORT_RULES_PATH = "/etc/snort/rules/local.rules"
+    # Kural tarayıcısının indekslediği dizin (*.rules: local, community, ET ...)
+    SNORT_RULES_DIR = os.path.dirname(SNORT_RULES_PATH)
     SNORT_LOG_DIR = "/var/log/snort"
     SNORT_LOG_FILE = "/var/log/snort/snort_alerts.log"
+    SNORT_UNIFIED2_GLOB = "unified2.log*"
+    # Yakalanan log dosyasının döndürülmesi: boyut (bayt) ya da yaş (saniye) eşiği;
+    # kapanan segmentler sıkıştırılır ("zstd", zstandard kurulu değilse "gzip")
+    SNORT_LOG_ROTATE_BYTES = 256 * 1024 * 1024
+    SNORT_LOG_ROTATE_SECONDS = 86400
+    SNORT_LOG_COMPRESSION = os.environ.get("SNORT_LOG_COMPRESSION", "zstd")
+    # Sıkıştırılmış segmentlerin saklanma süresi (gün) ve toplam boyut sınırı (bayt)
+    SNORT_LOG_RETENTION_DAYS = 30
+    SNORT_LOG_RETENTION_BYTES = 10 * 1024 * 1024 * 1024
+    # Alert korelasyonu: aynı (sid, kaynak, hedef, hedef port) alert'leri arada
+    # INCIDENT_WINDOW saniyeden uzun sessizlik olmadıkça tek bir incident'ta toplanır;
+    # bellekte en fazla INCIDENT_MAX_OPEN açık incident tutulur
+    INCIDENT_WINDOW = int(os.environ.get("SNORT_INCIDENT_WINDOW", 60))
+    INCIDENT_MAX_OPEN = 200000
+    # Incident'lar her zaman yazılır; ham alert'ler de Alert tablosuna yazılsın mı
+    STORE_RAW_ALERTS = os.environ.get("SNORT_STORE_RAW_ALERTS") == "1"
+    # Snort priority / sid / alt ağ -> danger/warning/safe eşlemesi (bootstrap_env.py üretir);
+    # değişince ingest sırasında yeniden yüklenir
+    THRESHOLDS_FILE = os.environ.get("THRESHOLDS_FILE", os.path.join(BASE_DIR, "config", "thresholds.yaml"))
+    # Performans örnekleme aralığı (saniye)
+    SNORT_PERF_INTERVAL = 10
+    # Snort instance'larının sabitleneceği CPU'lar, ör. "2,3,4,5"; boşsa tüm CPU'lar sırayla
+    SNORT_CPUS = [int(c) for c in os.environ["SNORT_CPUS"].split(",")] if os.environ.get("SNORT_CPUS") else None
+    # Çok worker'lı sunumda (gunicorn) Snort ve ingest durumunu tutan kontrol
+    # daemon'unun soketi; boşsa hepsi web süreci içinde çalışır (run.py)
+    CONTROL_SOCKET = os.environ.get("SNORT_CONTROL_SOCKET")
+    CONTROL_PID_FILE = os.environ.get("SNORT_CONTROL_PID_FILE", os.path.join(BASE_DIR, "snort_control.pid"))
+    # API yanıt önbelleğinin worker başına üst sınırı (bayt)
+    RESPONSE_CACHE_BYTES = 32 * 1024 * 1024
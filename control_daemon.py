@@ -0,0 +1,57 @@
+# control_daemon.py
+"""Snort kontrol daemon'u.
+
+Çok worker'lı sunumda (gunicorn) Snort süreçleri, log yakalama, ingest hattı,
+rollup'lar, arka plan işleri ve canlı alert yayını tek bir süreçte yaşar;
+web worker'ları bunlara Config.CONTROL_SOCKET Unix soketi üzerinden erişir
+(bkz. snort_manager/backend.py). PID dosyası aynı anda tek daemon çalışmasını
+sağlar.
+
+    SNORT_CONTROL_SOCKET=/run/snort-manager/control.sock python control_daemon.py
+"""
+import os
+import signal
+import sys
+from config import BASE_DIR, Config
+
+DEFAULT_SOCKET = os.path.join(BASE_DIR, "snort_control.sock")
+
+
+def main():
+    from snort_manager.backend import ControlServer, LocalBackend, acquire_pid_file, set_backend
+    from snort_manager.controller import stop_snort
+    from snort_manager.ingester import get_ingester
+
+    socket_path = Config.CONTROL_SOCKET or DEFAULT_SOCKET
+    try:
+        pid_file = acquire_pid_file(Config.CONTROL_PID_FILE)
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+
+    # Ingest hattı sadece burada çalışır; worker'lar create_app() ile başlatmaz
+    from webapp import create_app
+    create_app(pipeline=True)
+    backend = LocalBackend()
+    set_backend(backend)
+    server = ControlServer(socket_path, backend)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Snort control daemon listening on {socket_path} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stop_snort()
+        get_ingester().stop()
+        for path in (socket_path, Config.CONTROL_PID_FILE):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        pid_file.close()
+
+
+if __name__ == "__main__":
+    main()
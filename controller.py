@@ -1,45 +1,225 @@
 # snort_manager/controller.py
 import os
-import subprocess
+import re
 import threading
+import time
 from config import Config
+from .ingester import get_ingester
+from .line_index import get_line_index
+from .capture import LogCapture
+from .alert_reader import ALERT_JSON_FIELDS, alert_source
+from .supervisor import SnortSupervisor, parse_interfaces
+from .installer import check_and_install_snort, configure_snort
+from .perf import get_perf_collector
+from .segments import get_segment_manager
+from .profiler import PROFILE_FILE, SNORT3_PROFILER, profile_config, read_profile
 
-snort_process = None
+supervisor = None
+capture = None
+reload_status = None
+# Rule profiling açıkken başlangıç zamanı ve okunacak çıktı dosyalarının o anki boyutları
+profile_session = None
 
-def start_snort(interface="lo"):
-    global snort_process
-    
+RELOAD_TIMEOUT = 120
+# Snort 3 "== reload complete", Snort 2 "Swapped to new configuration"
+RELOAD_DONE_RE = re.compile(r"reload complete|Swapped to new configuration", re.I)
+RELOAD_FAILED_RE = re.compile(r"reload failed|FATAL ERROR", re.I)
+
+def start_snort(interface="lo", profile=False):
+    """interface: "eth0", "eth0,eth1" ya da fanout için "eth0*4" (bkz. parse_interfaces).
+    profile=True ile Snort kural başına maliyet istatistikleri toplar; tablo
+    Snort kapanırken yazılır (bkz. get_rule_profile)."""
+    global profile_session
     log_dir = Config.SNORT_LOG_DIR
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
-    command = f"snort -i {interface} -A console -c {Config.SNORT_CONFIG_PATH} -l {log_dir} -K ascii"
-    
+    profile_session = {"started": time.time(), "config": None, "sources": {}} if profile else None
     try:
-        snort_process = subprocess.Popen(
-            command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
-        # Logları ayrı bir thread’de dosyaya aktar
-        threading.Thread(target=_capture_logs).start()
+        if profile and Config.SNORT_ALERT_MODE == "console":
+            profile_session["config"] = profile_config(Config.SNORT_CONFIG_PATH)
+        get_supervisor().start(parse_interfaces(interface), log_dir, Config.SNORT_CPUS)
     except Exception as e:
         print(f"Failed to start Snort: {e}")
+        return False
+    if profile:
+        # Snort 2 tabloyu instance dizinindeki dosyaya, Snort 3 yakalanan stdout'a yazar
+        if Config.SNORT_ALERT_MODE == "console":
+            paths = [os.path.join(i.log_dir, PROFILE_FILE) for i in supervisor.instances]
+        else:
+            paths = [Config.SNORT_LOG_FILE]
+        profile_session["sources"] = {path: os.path.getsize(path) if os.path.exists(path) else 0
+                                      for path in paths}
+    return True
+
+def _snort_command(instance):
+    """Config.SNORT_ALERT_MODE'a göre bir instance'ın Snort argv listesi. Shell
+    kullanılmaz; Snort doğrudan çocuk süreç olur, terminate doğrudan ona gider."""
+    mode = Config.SNORT_ALERT_MODE
+    interface, log_dir = instance.interface, instance.log_dir
+    if mode == "console":
+        config_path = profile_session["config"] if profile_session else Config.SNORT_CONFIG_PATH
+        command = ["snort", "-i", interface, "-A", "console", "-c", config_path, "-l", log_dir, "-K", "ascii"]
+    else:
+        # Snort 3: alert'ler log_dir içindeki dosyaya yazılır, ingester doğrudan oradan okur
+        command = ["snort", "-i", interface, "-c", Config.SNORT_CONFIG_PATH, "-l", log_dir, "-A", mode]
+        if mode == "alert_json":
+            command += ["--lua", f"alert_json = {{ file = true, fields = '{ALERT_JSON_FIELDS}' }}"]
+        # Periyodik paket/drop istatistikleri log_dir/perf_monitor_base.csv'ye
+        command += ["--lua", "perf_monitor = { output = 'file', format = 'csv', "
+                    f"seconds = {Config.SNORT_PERF_INTERVAL}, packets = 100 }}"]
+        if profile_session:
+            command += ["--lua", SNORT3_PROFILER]
+    if instance.workers > 1:
+        # Aynı arayüzdeki worker'lar afpacket fanout ile trafiği akış bazında paylaşır
+        command += ["--daq", "afpacket", "--daq-var", "fanout_type=hash"]
+    return command
+
+def start_job(job, interface="lo", profile=False):
+    """Kurulum kontrolü, yapılandırma ve başlatma; JobManager'da çalışır."""
+    job.progress("Checking Snort installation")
+    if not check_and_install_snort():
+        raise RuntimeError("Snort is not installed and could not be installed")
+    job.progress("Configuring Snort")
+    if not configure_snort(Config.SNORT_CONFIG_PATH, Config.SNORT_RULES_PATH):
+        raise RuntimeError(f"Configuration file {Config.SNORT_CONFIG_PATH} not found")
+    job.progress(f"Starting Snort on {interface}")
+    if not start_snort(interface, profile=profile):
+        raise RuntimeError("Snort could not be started, see the server log")
+    get_perf_collector().mark(f"Snort started ({interface}){' with rule profiling' if profile else ''}")
+    return {"instances": len(supervisor.instances)}
+
+def stop_job(job):
+    job.progress("Stopping Snort")
+    stop_snort()
+    get_perf_collector().mark("Snort stopped")
 
 def stop_snort():
-    global snort_process
-    if snort_process:
-        snort_process.terminate()
-        snort_process = None
+    if supervisor:
+        supervisor.stop()
+
+def reload_rules(summary=""):
+    """Kuralları durdur/başlat yerine SIGHUP ile canlı yükletir. Tamamlanma süresi
+    arka planda Snort çıktısından izlenir (bkz. get_reload_status)."""
+    global reload_status
+    if supervisor is None:
+        return False
+    # Reload mesajları Snort sürümüne göre stderr'e ya da yakalanan stdout'a düşer
+    paths = [os.path.join(i.log_dir, "snort_stderr.log") for i in supervisor.instances] + [Config.SNORT_LOG_FILE]
+    offsets = {path: os.path.getsize(path) if os.path.exists(path) else 0 for path in paths}
+    targets = supervisor.reload()
+    if not targets:
+        return False
+    reload_status = {"started": time.time(), "state": "pending", "duration": None,
+                     "instances": len(targets), "summary": summary}
+    threading.Thread(target=_watch_reload, args=(reload_status, offsets, targets),
+                     name="snort-reload", daemon=True).start()
+    return True
+
+def get_reload_status():
+    return reload_status
+
+def _watch_reload(status, offsets, targets):
+    deadline = time.monotonic() + RELOAD_TIMEOUT
+    completed = 0
+    state = "timeout"
+    while time.monotonic() < deadline and state == "timeout":
+        time.sleep(0.2)
+        for path, offset in offsets.items():
+            try:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    text = f.read().decode("utf-8", errors="ignore")
+                    offsets[path] = f.tell()
+            except OSError:
+                continue
+            if RELOAD_FAILED_RE.search(text):
+                state = "failed"
+            completed += len(RELOAD_DONE_RE.findall(text))
+        if state == "timeout":
+            if any(t.process.poll() is not None for t in targets):
+                # Reload desteği olmayan Snort SIGHUP ile çıkar; supervisor yeniden başlatır
+                state = "failed"
+            elif completed >= len(targets):
+                state = "complete"
+    status["duration"] = round(time.time() - status["started"], 2)
+    status["state"] = state
+    get_perf_collector().mark(f"Rules reload {state} in {status['duration']}s")
+
+def get_rule_profile():
+    """Son profil oturumunun kural başına toplamları; oturum yoksa None.
+    Snort çalışırken tablo henüz yazılmamış olabilir."""
+    if profile_session is None:
+        return None
+    return read_profile(profile_session["sources"])
+
+def get_profile_session():
+    return profile_session
 
 def get_snort_status():
-    global snort_process
-    if snort_process and snort_process.poll() is None:
+    if supervisor and supervisor.running():
         return "Running"
     return "Stopped"
 
-def _capture_logs():
-    """Snort stdout çıktısını yakalayıp log dosyasına yazar."""
-    global snort_process
-    if snort_process:
-        with open(Config.SNORT_LOG_FILE, "a") as log_file:
-            for line in iter(snort_process.stdout.readline, b''):
-                log_file.write(line.decode('utf-8', errors='ignore'))
+def get_instances_status():
+    """Instance başına durum, uptime, yeniden başlatma sayısı ve alert/paket oranları."""
+    if supervisor is None:
+        return []
+    return supervisor.status()
+
+def get_capture_stats():
+    """Okunan/yazılan/atılan satır ve bekleyen backlog sayaçları."""
+    if capture is None:
+        return None
+    return capture.stats()
+
+def get_supervisor():
+    global supervisor
+    if supervisor is None:
+        supervisor = SnortSupervisor(_snort_command, on_spawn=_on_spawn, collect=_collect)
+    return supervisor
+
+def _on_spawn(instance):
+    # stdout her modda boşaltılmalı; dosya modlarında alert'ler instance dizininden okunur
+    _capture_logs(instance)
+    if Config.SNORT_ALERT_MODE != "console":
+        get_ingester().add_source(*alert_source(instance.log_dir))
+
+def _collect(instance):
+    if Config.SNORT_ALERT_MODE == "console":
+        # Konsol modunda stdout satırları alert'lerdir
+        if capture:
+            instance.counters["alerts"] = capture.stream_lines.get(instance.name, 0)
+    else:
+        tail = get_ingester().tails.get(alert_source(instance.log_dir)[0])
+        if tail:
+            instance.counters["alerts"] = tail.alerts
+    get_perf_collector().collect(instance)
+
+def _on_capture_write(offset, data):
+    # Yazılan parti için indeks kayıtlarını ekle ve ingester'ı uyandır; dosya
+    # modlarında alert'leri Snort kendisi yazar, stdout sadece konsol çıktısıdır
+    if Config.SNORT_ALERT_MODE == "console":
+        get_line_index().append(offset, data)
+        get_ingester().notify()
+
+def _ingester_following():
+    """Ingester yakalanan log dosyasının şu anki halini açmış mı (döndürme için)."""
+    tail = get_ingester().tails.get(Config.SNORT_LOG_FILE)
+    if tail is None or tail.file is None:
+        return False
+    try:
+        return tail.inode == os.stat(Config.SNORT_LOG_FILE).st_ino
+    except OSError:
+        return False
+
+def _capture_logs(instance):
+    """Snort stdout çıktısını yakalayıp log dosyasına yazar; tüm instance'lar tek dosyada birleşir."""
+    global capture
+    if capture is None:
+        get_line_index().refresh()
+        rotator = get_segment_manager()
+        if rotator and Config.SNORT_ALERT_MODE == "console":
+            rotator.reader_ready = _ingester_following
+        capture = LogCapture(Config.SNORT_LOG_FILE, on_write=_on_capture_write, rotator=rotator)
+    capture.attach(instance.process.stdout, instance.name)
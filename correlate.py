@@ -0,0 +1,160 @@
+# snort_manager/correlate.py
+import heapq
+import itertools
+import threading
+import time
+from collections import namedtuple
+from config import Config
+
+Incident = namedtuple("Incident", ["id", "first_seen", "last_seen", "count", "gid", "sid", "rev", "msg",
+                                   "classification", "priority", "proto", "src_ip", "dst_ip", "dst_port",
+                                   "severity", "closed"])
+
+
+class CorrelationEngine:
+    """Ingester sink'i: aynı (sid, kaynak, hedef, hedef port) alert'lerini tek bir
+    incident'ta toplar. Incident, son alert'inden sonra window saniye boyunca yeni
+    alert gelmezse kapanır; sonraki alert yeni bir incident açar.
+
+    Kayıt başına iş bir dict araması ve birkaç alan güncellemesidir. Kapanma
+    zamanları bir heap'te tutulur (incident başına tek kayıt, tembel silme):
+    süresi dolan kayıt çıkarıldığında incident o arada güncellenmişse yeni
+    son zamanla geri konur. Açık incident sayısı max_open ile sınırlıdır; aşılınca
+    kapanması en yakın olanlar erken kapatılır.
+
+    Zaman alert zaman damgalarıyla ilerler (geçmiş log içe aktarımı da aynı
+    şekilde gruplanır); alert gelmediği sürece duvar saatiyle ilerler. Açılan,
+    güncellenen ve kapanan incident'lar flush_interval'da bir sinks'e
+    write_incidents(incidents, checkpoint) ile toplu verilir.
+
+    ids: incident id üreteci; aynı tabloya yazan motorlar (ör. geçmiş log
+    importu) canlı motorla aynı üreteci paylaşır."""
+
+    def __init__(self, window=60, max_open=200000, flush_interval=1.0, ids=None):
+        self.window = window
+        self.max_open = max_open
+        self.flush_interval = flush_interval
+        self.ids = ids or itertools.count(1)
+        self.sinks = []
+        self.alerts = 0
+        self.flushed = 0  # sink'lere yazılmış incident'lara katılan alert sayısı
+        self.opened = 0
+        self.closed = 0
+        self._open = {}      # anahtar -> [id, ilk, son, sayı, ilk AlertRecord]
+        self._heap = []      # (kapanma zamanı, id, anahtar)
+        self._dirty = {}     # id -> açık incident durumu (son flush'tan beri değişenler)
+        self._finished = []  # kapanan Incident'ler
+        self._clock = 0.0
+        self._arrival = time.monotonic()
+        self._checkpoint = None
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def write(self, records, checkpoint):
+        now = time.time()
+        window = self.window
+        with self._lock:
+            open_, dirty = self._open, self._dirty
+            clock = self._clock
+            for r in records:
+                ts = r.ts if r.ts is not None else now
+                key = (r.sid, r.src_ip, r.dst_ip, r.dst_port)
+                state = open_.get(key)
+                if state is None or ts - state[2] > window:
+                    if state is not None:
+                        self._close(key, state)
+                    incident_id = next(self.ids)
+                    state = open_[key] = [incident_id, ts, ts, 0, r]
+                    heapq.heappush(self._heap, (ts + window, incident_id, key))
+                    self.opened += 1
+                elif ts > state[2]:
+                    state[2] = ts
+                elif ts < state[1]:
+                    state[1] = ts
+                state[3] += 1
+                dirty[state[0]] = state
+                if ts > clock:
+                    clock = ts
+            self._clock = clock
+            self._arrival = time.monotonic()
+            self._checkpoint = checkpoint
+            self.alerts += len(records)
+            self._expire(clock)
+            while len(open_) > self.max_open:
+                self._evict()
+
+    def tick(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def close(self):
+        """Tüm açık incident'ları kapatıp yazar (ör. import sonunda)."""
+        self.flush(close=True)
+
+    def flush(self, close=False):
+        now = time.monotonic()
+        with self._lock:
+            if close:
+                for key, state in list(self._open.items()):
+                    self._close(key, state)
+                self._heap = []
+            else:
+                # Alert gelmiyorsa olay zamanı duvar saatiyle ilerler, sessiz incident'lar kapanır
+                self._expire(self._clock + (now - self._arrival))
+            incidents = self._finished + [self._incident(state, False) for state in self._dirty.values()]
+            checkpoint = self._checkpoint
+            alerts = self.alerts
+            self._finished = []
+            self._dirty = {}
+            self._checkpoint = None
+        self._last_flush = now
+        if incidents or checkpoint:
+            for sink in self.sinks:
+                sink.write_incidents(incidents, checkpoint)
+        self.flushed = alerts
+
+    def _expire(self, now):
+        heap, open_ = self._heap, self._open
+        while heap and heap[0][0] <= now:
+            _, incident_id, key = heapq.heappop(heap)
+            state = open_.get(key)
+            if state is None or state[0] != incident_id:
+                continue
+            if state[2] + self.window > now:
+                heapq.heappush(heap, (state[2] + self.window, incident_id, key))
+                continue
+            self._close(key, state)
+
+    def _evict(self):
+        _, incident_id, key = heapq.heappop(self._heap)
+        state = self._open.get(key)
+        if state is not None and state[0] == incident_id:
+            self._close(key, state)
+
+    def _close(self, key, state):
+        del self._open[key]
+        self._dirty.pop(state[0], None)
+        self._finished.append(self._incident(state, True))
+        self.closed += 1
+
+    @staticmethod
+    def _incident(state, closed):
+        incident_id, first, last, count, r = state
+        return Incident(incident_id, first, last, count, r.gid, r.sid, r.rev, r.msg, r.classification,
+                        r.priority, r.proto, r.src_ip, r.dst_ip, r.dst_port, r.severity, closed)
+
+    def stats(self):
+        return {"alerts": self.alerts, "open": len(self._open), "opened": self.opened, "closed": self.closed}
+
+
+_correlator = None
+
+
+def get_correlator():
+    global _correlator
+    if _correlator is None:
+        _correlator = CorrelationEngine(Config.INCIDENT_WINDOW, Config.INCIDENT_MAX_OPEN)
+    return _correlator
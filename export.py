@@ -0,0 +1,208 @@
+# webapp/export.py
+import csv
+import io
+import json
+from sqlalchemy import and_, or_
+from config import Config
+from snort_manager.alert_reader import LINE_PARSERS, alert_source
+from snort_manager.classify import get_classifier
+from snort_manager.line_index import BLOCK_LINES
+from snort_manager.segments import get_alert_log
+from .alert_store import ALERT_COLUMNS, INCIDENT_COLUMNS
+from .extensions import db
+from .models import Alert, Incident
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# format -> (mimetype, dosya uzantısı)
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+SOURCES = ("alerts", "incidents")
+# Tek seferde bellekte tutulan en fazla satır; yanıt bu boyutta parçalar halinde akar
+BATCH_ROWS = 5000
+FLOAT_COLUMNS = ("timestamp", "first_seen", "last_seen")
+INT_COLUMNS = ("id", "count", "gid", "sid", "rev", "priority", "src_port", "dst_port")
+
+
+class _Chunks(io.RawIOBase):
+    """pyarrow yazıcılarının çıktısını toplayan, sadece yazılabilir dosya;
+    take() o ana kadar yazılanları verip boşaltır."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _db_batches(model, columns, order, conditions):
+    """(sıra kolonu, id) üzerinden keyset sayfalama: her parça ayrı, kısa bir
+    transaction'da okunur. Yavaş bir istemci uzun bir indirme boyunca okuma
+    snapshot'ını açık tutmaz, WAL checkpoint'i ingest'i beklemez. Sıra kolonu
+    NULL olan satırlar önce id sırasıyla gelir."""
+    select = db.select(*(getattr(model, c) for c in columns), order, model.id)
+    nulls = True
+    key = None
+    while True:
+        if nulls:
+            where = [order.is_(None)] + ([model.id > key] if key is not None else [])
+            query = select.where(*conditions, *where).order_by(model.id)
+        else:
+            where = [order.isnot(None)]
+            if key is not None:
+                where.append(and_(order >= key[0], or_(order > key[0], model.id > key[1])))
+            query = select.where(*conditions, *where).order_by(order, model.id)
+        with db.engine.connect() as conn:
+            rows = conn.execute(query.limit(BATCH_ROWS)).all()
+        if rows:
+            yield [tuple(row[:-2]) for row in rows]
+        if len(rows) < BATCH_ROWS:
+            if not nulls:
+                return
+            nulls, key = False, None
+            continue
+        key = rows[-1][-1] if nulls else (rows[-1][-2], rows[-1][-1])
+
+
+def _log_batches(since, until, keep):
+    """Yakalanan alert log'unu (döndürülmüş segmentler dahil) okuyup ayrıştırır;
+    zaman aralığı dışındaki segmentler hiç açılmaz."""
+    fmt = alert_source()[1]
+    # unified2 modunda log görünümü Snort'un metin çıktısıdır
+    parse = LINE_PARSERS.get(fmt, LINE_PARSERS["console"])
+    classify = get_classifier().classify
+    log = get_alert_log()
+    log.refresh()
+    lines = []
+    for _, line in log.iter_lines(since=since, until=until):
+        lines.append(line)
+        if len(lines) < BLOCK_LINES:
+            continue
+        batch = [tuple(r) for r in classify(parse(lines)) if keep(r)]
+        lines = []
+        if batch:
+            yield batch
+    if lines:
+        batch = [tuple(r) for r in classify(parse(lines)) if keep(r)]
+        if batch:
+            yield batch
+
+
+def export_batches(source, since=None, until=None, sid=None, priority=None, ip=None, severity=None):
+    """(kolonlar, satır listeleri üreten generator). source "incidents" ise Incident
+    tablosu; "alerts" ise ham alert'ler saklanıyorsa Alert tablosu, saklanmıyorsa
+    alert log'u. DB sorguları zaman index'i sırasında parça parça okunur (bkz. _db_batches)."""
+    if source not in SOURCES:
+        raise ValueError(f"source must be one of {', '.join(SOURCES)}")
+    if source == "incidents":
+        model, columns = Incident, INCIDENT_COLUMNS
+        order = Incident.first_seen
+        conditions = []
+        if since is not None:
+            conditions.append(Incident.last_seen >= since)
+        if until is not None:
+            conditions.append(Incident.first_seen <= until)
+    elif Config.STORE_RAW_ALERTS:
+        model, columns = Alert, ALERT_COLUMNS
+        order = Alert.timestamp
+        conditions = []
+        if since is not None:
+            conditions.append(Alert.timestamp >= since)
+        if until is not None:
+            conditions.append(Alert.timestamp <= until)
+    else:
+        def keep(r):
+            return ((since is None or (r.ts is not None and r.ts >= since))
+                    and (until is None or (r.ts is not None and r.ts <= until))
+                    and (sid is None or r.sid == sid)
+                    and (priority is None or r.priority == priority)
+                    and (ip is None or ip in (r.src_ip, r.dst_ip))
+                    and (severity is None or r.severity == severity))
+        return ALERT_COLUMNS, _log_batches(since, until, keep)
+
+    if sid is not None:
+        conditions.append(model.sid == sid)
+    if priority is not None:
+        conditions.append(model.priority == priority)
+    if ip is not None:
+        conditions.append(or_(model.src_ip == ip, model.dst_ip == ip))
+    if severity is not None:
+        conditions.append(model.severity == severity)
+    return columns, _db_batches(model, columns, order, conditions)
+
+
+def _csv(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+
+
+def _jsonl(columns, batches):
+    for batch in batches:
+        yield "".join(json.dumps(dict(zip(columns, row))) + "\n" for row in batch).encode()
+
+
+def _arrow_type(column):
+    if column in FLOAT_COLUMNS:
+        return pyarrow.float64()
+    if column in INT_COLUMNS:
+        return pyarrow.int64()
+    if column == "closed":
+        return pyarrow.bool_()
+    return pyarrow.string()
+
+
+def _columnar(columns, batches, parquet):
+    """Her parça bir Parquet row group'u ya da Arrow IPC record batch'i olur."""
+    schema = pyarrow.schema([(column, _arrow_type(column)) for column in columns])
+    sink = _Chunks()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema) if parquet else pyarrow.ipc.new_stream(sink, schema)
+    try:
+        for batch in batches:
+            arrays = [pyarrow.array(values, type=field.type) for values, field in zip(zip(*batch), schema)]
+            writer.write_batch(pyarrow.record_batch(arrays, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def serialize(fmt, columns, batches):
+    """Satır parçalarını seçilen formatta byte parçalarına çevirir."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    if fmt in ("parquet", "arrow"):
+        if pyarrow is None:
+            raise ValueError(f"{fmt} export requires pyarrow")
+        return _columnar(columns, batches, fmt == "parquet")
+    return (_csv if fmt == "csv" else _jsonl)(columns, batches)
@@ -1,6 +1,6 @@
 # webapp/forms.py
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, TextAreaField, SubmitField
+from wtforms import StringField, PasswordField, TextAreaField, BooleanField, SubmitField
 from wtforms.validators import DataRequired, Length
 
 class LoginForm(FlaskForm):
@@ -16,3 +16,8 @@ class RegisterForm(FlaskForm):
 class RuleForm(FlaskForm):
     rules = TextAreaField("Snort Rules", validators=[DataRequired()])
     submit = SubmitField("Update Rules")
+
+class RuleEditForm(FlaskForm):
+    rule = TextAreaField("Rule", validators=[DataRequired()])
+    enabled = BooleanField("Enabled")
+    submit = SubmitField("Save Rule")
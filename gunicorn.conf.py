@@ -0,0 +1,37 @@
+# gunicorn.conf.py
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+# Worker'lar config'i import etmeden önce: hepsi aynı kontrol daemon'una bağlanır
+os.environ.setdefault("SNORT_CONTROL_SOCKET", os.path.join(BASE_DIR, "snort_control.sock"))
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", (os.cpu_count() or 1) + 1))
+# SSE (/api/stream) bağlantıları bir thread'i açık tuttuğu için thread'li worker
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+timeout = 60
+graceful_timeout = 10
+accesslog = "-"
+
+DAEMON_START_TIMEOUT = 30
+
+
+def on_starting(server):
+    """Kontrol daemon'u çalışmıyorsa başlatır ve soketi hazır olana kadar bekler.
+    Daemon gunicorn'dan bağımsızdır: gunicorn yeniden başlatılınca Snort durmaz."""
+    sys.path.insert(0, BASE_DIR)
+    from snort_manager.backend import daemon_running
+    socket_path = os.environ["SNORT_CONTROL_SOCKET"]
+    if daemon_running(socket_path):
+        return
+    subprocess.Popen([sys.executable, os.path.join(BASE_DIR, "control_daemon.py")], cwd=BASE_DIR,
+                     start_new_session=True)
+    deadline = time.monotonic() + DAEMON_START_TIMEOUT
+    while not daemon_running(socket_path):
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Snort control daemon did not start on {socket_path}")
+        time.sleep(0.2)
@@ -0,0 +1,57 @@
+# import_logs.py
+"""Geçmiş Snort log'larını alert deposuna (incident'lar) ve rollup'lara aktarır.
+
+Dosyalar satır/kayıt sınırlarında byte aralıklarına bölünür ve bir süreç
+havuzunda ayrıştırılır (bkz. snort_manager/importer.py). Import, ingest hattının
+çalıştığı süreçte bir arka plan işidir: kontrol daemon'u (Config.CONTROL_SOCKET)
+çalışıyorsa ona gönderilir, değilse bu süreçte hat kurulur — bu durumda web
+uygulaması (run.py) kapalı olmalıdır. Yarıda kalan import aynı komutla kaldığı
+yerden devam eder; --no-resume baştan okur. Canlı ingester'ın zaten okuduğu
+kısımlar (checkpoint'indeki inode ve offset'e kadar; döndürülmüş dosyalar ve
+segmentler dahil) her durumda atlanır.
+
+    python import_logs.py                          # Config.SNORT_LOG_DIR
+    python import_logs.py /backup/snort --workers 8
+"""
+import argparse
+import sys
+import time
+from config import Config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("paths", nargs="*", help="log files or directories (default: Config.SNORT_LOG_DIR)")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=int, default=32, help="byte range handed to one worker")
+    parser.add_argument("--no-resume", action="store_true", help="ignore import checkpoints")
+    args = parser.parse_args()
+
+    from snort_manager.backend import LocalBackend, RemoteBackend, daemon_running
+    if Config.CONTROL_SOCKET and daemon_running(Config.CONTROL_SOCKET):
+        backend = RemoteBackend(Config.CONTROL_SOCKET)
+    else:
+        from webapp import create_app
+        create_app(pipeline=True)
+        backend = LocalBackend()
+
+    try:
+        job = backend.submit(action="import", paths=args.paths or None, workers=args.workers,
+                             chunk_bytes=args.chunk_mb * 1024 * 1024, resume=not args.no_resume)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    printed = 0
+    while True:
+        job = backend.job(job_id=job["id"])
+        for step in job["steps"][printed:]:
+            print(f"[{step['elapsed']:>8.1f}s] {step['message']}")
+        printed = len(job["steps"])
+        if job["state"] in ("succeeded", "failed"):
+            break
+        time.sleep(1)
+    sys.exit(0 if job["state"] == "succeeded" else 1)
+
+
+if __name__ == "__main__":
+    main()
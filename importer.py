@@ -0,0 +1,379 @@
+# snort_manager/importer.py
+import collections
+import fnmatch
+import gzip
+import mmap
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config import Config
+from .alert_reader import LINE_PARSERS, U2_HEADER, alert_source, parse_unified2, resolve_path
+from .classify import Classifier
+from .line_index import RECORD
+from .segments import BLOCK_SUFFIX, MANIFEST_SUFFIX, RAW_SEGMENT_RE, _codec, read_manifest
+
+# Bir worker'ın tek seferde ayrıştırdığı byte aralığı
+CHUNK_BYTES = 32 * 1024 * 1024
+# Import checkpoint'leri ingester'ınkilerle aynı tabloda bu önekle tutulur
+CHECKPOINT_PREFIX = "import:"
+# Format tespiti için okunan dosya başı
+SNIFF_BYTES = 64 * 1024
+SKIP_SUFFIXES = (".idx", ".tmp", MANIFEST_SUFFIX, BLOCK_SUFFIX)
+SEGMENT_CODECS = {".zst": "zstd", ".gz": "gzip"}
+# İlerleme mesajları arası süre (saniye); her mesaj işin adımlarına eklenir
+REPORT_INTERVAL = 5
+
+# create_app() tarafından ayarlanır: (path) -> (inode, offset), import sink'lerini üreten
+# fonksiyon ve () -> {anahtar: (inode, offset)} tüm checkpoint'ler
+_checkpoint_loader = None
+_sink_factory = None
+_checkpoints_loader = None
+# Worker süreçte _init_worker'ın kurduğu Classifier
+_worker_classifier = None
+
+
+def configure(checkpoint_loader, sink_factory, checkpoints_loader=None):
+    global _checkpoint_loader, _sink_factory, _checkpoints_loader
+    _checkpoint_loader = checkpoint_loader
+    _sink_factory = sink_factory
+    _checkpoints_loader = checkpoints_loader
+
+
+def _sniff(head):
+    """Metin log'un formatı; alert satırı görülmezse None."""
+    for line in head.split(b"\n")[:100]:
+        if line.startswith(b"{"):
+            return "alert_json"
+        if b"[**]" in line:
+            return "console"
+    return None
+
+
+def _live_files():
+    """Canlı ingester'ın izlediği dosyalar; import bunlara dokunmaz."""
+    live = {os.path.abspath(Config.SNORT_LOG_FILE)}
+    current = resolve_path(alert_source()[0])
+    if current:
+        live.add(os.path.abspath(current))
+    return live
+
+
+def _live_consumed(checkpoints):
+    """Canlı ingester'ın checkpoint'lerinden (döndürülmüş dosyaların geçmiş kayıtları
+    dahil) inode -> okunan offset. Import checkpoint'leri sayılmaz."""
+    consumed = {}
+    for key, (inode, offset) in checkpoints.items():
+        if inode is not None and not key.startswith(CHECKPOINT_PREFIX):
+            consumed[inode] = max(consumed.get(inode, 0), offset)
+    return consumed
+
+
+def _segment_source(path):
+    """Sıkıştırılmış segmentin manifest'teki ham dosya inode'u ve son tam satırın
+    bittiği offset (bkz. SegmentManager._split); manifest'te yoksa (None, 0)."""
+    log = RAW_SEGMENT_RE.sub("", os.path.splitext(path)[0])
+    name = os.path.basename(path)
+    for segment in read_manifest(log):
+        if segment["file"] == name:
+            return segment.get("inode"), segment.get("end", 0)
+    return None, 0
+
+
+def discover(paths=None, consumed=None):
+    """Verilen dosya/dizinlerdeki (varsayılan Config.SNORT_LOG_DIR) alert log'ları:
+    (yol, tür, format, codec) listesi, değişme zamanı sırasında. tür "text",
+    "unified2", "segment" (blok blok sıkıştırılmış) ya da "gzip" (tek parça) olur.
+    consumed (inode -> offset, bkz. _live_consumed): canlı ingester'ın sonuna kadar
+    okuduğu dosyalar ve kaynağı tamamen okunmuş segmentler atlanır."""
+    consumed = consumed or {}
+    files = []
+    for path in paths or [Config.SNORT_LOG_DIR]:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names)
+        elif os.path.isfile(path):
+            files.append(path)
+    live = _live_files()
+    found = []
+    for path in sorted(set(map(os.path.abspath, files)), key=lambda p: (os.path.getmtime(p), p)):
+        name = os.path.basename(path)
+        if path in live or name.endswith(SKIP_SUFFIXES):
+            continue
+        st = os.stat(path)
+        if st.st_ino in consumed and consumed[st.st_ino] >= st.st_size:
+            continue
+        if fnmatch.fnmatch(name, Config.SNORT_UNIFIED2_GLOB):
+            found.append((path, "unified2", "unified2", None))
+            continue
+        suffix = os.path.splitext(path)[1]
+        try:
+            if suffix in SEGMENT_CODECS and os.path.exists(path + BLOCK_SUFFIX):
+                inode, end = _segment_source(path)
+                if inode in consumed and consumed[inode] >= end:
+                    continue
+                codec = SEGMENT_CODECS[suffix]
+                with open(path, "rb") as f:
+                    head = _block_data(f, codec, _segment_blocks(path)[:1])
+                kind = "segment"
+            elif suffix == ".gz":
+                codec = "gzip"
+                with gzip.open(path, "rb") as f:
+                    head = f.read(SNIFF_BYTES)
+                kind = "gzip"
+            else:
+                codec = None
+                with open(path, "rb") as f:
+                    head = f.read(SNIFF_BYTES)
+                kind = "text"
+        except (OSError, EOFError, ValueError) as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        fmt = _sniff(head)
+        if fmt:
+            found.append((path, kind, fmt, codec))
+    return found
+
+
+def plan_chunks(path, kind, chunk_bytes=CHUNK_BYTES):
+    """Dosyayı kayıt sınırlarında bölünmüş (başlangıç, bitiş, bloklar) aralıklarına ayırır.
+    Metin dosyaları satır sonunda, unified2 kayıt başlığı zincirinde, sıkıştırılmış
+    segmentler .blk indeksindeki blok sınırlarında bölünür. Tek parça .gz dosyaları
+    önceden bölünemez, bkz. gzip_chunks."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    if kind == "segment":
+        chunks = []
+        blocks = []
+        for begin, end in _segment_blocks(path):
+            blocks.append((begin, end))
+            if end - blocks[0][0] >= chunk_bytes:
+                chunks.append((blocks[0][0], end, blocks))
+                blocks = []
+        if blocks:
+            chunks.append((blocks[0][0], blocks[-1][1], blocks))
+        return chunks
+    chunks = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        if kind == "unified2":
+            # Sadece 8 byte'lık başlıklar okunur; gövdeler atlanır
+            pos = 0
+            while pos + U2_HEADER.size <= size:
+                end = pos + U2_HEADER.size + U2_HEADER.unpack_from(mm, pos)[1]
+                if end > size:
+                    break
+                if end - start >= chunk_bytes:
+                    chunks.append((start, end, None))
+                    start = end
+                pos = end
+            size = pos
+        else:
+            while start < size:
+                nl = mm.find(b"\n", min(start + chunk_bytes, size) - 1)
+                end = size if nl == -1 else nl + 1
+                chunks.append((start, end, None))
+                start = end
+    if start < size:
+        chunks.append((start, size, None))
+    return chunks
+
+
+def gzip_chunks(path, chunk_bytes=CHUNK_BYTES, skip=0):
+    """Tek parça .gz dosyasını akış halinde açıp satır sonunda bölünmüş (başlangıç,
+    bitiş, veri, okunan sıkıştırılmış byte) parçaları üretir; başlangıç/bitiş açılmış
+    veri içindeki offset'lerdir. skip'ten önce biten parçalar açılıp atlanır (resume).
+    Bellekte bir parça ve yarım kalan satır tutulur."""
+    with open(path, "rb") as raw, gzip.GzipFile(fileobj=raw) as f:
+        start = 0
+        buf = b""
+        consumed = 0
+        while True:
+            data = f.read(chunk_bytes)
+            buf += data
+            if data:
+                nl = buf.rfind(b"\n")
+                if nl == -1:
+                    continue
+                piece, buf = buf[:nl + 1], buf[nl + 1:]
+            else:
+                piece, buf = buf, b""
+            end = start + len(piece)
+            if piece and end > skip:
+                if start < skip:
+                    # Önceki import başka bir parça boyutuyla yapılmış; skip bir satır sonudur
+                    piece, start = piece[skip - start:], skip
+                yield start, end, piece, raw.tell() - consumed
+                consumed = raw.tell()
+            start = end
+            if not data:
+                return
+
+
+def _gzip_isize(path):
+    """gzip trailer'ındaki açılmış boyut (mod 2^32; çok üyeli dosyada son üyeninki)."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(-4, os.SEEK_END)
+            return int.from_bytes(f.read(4), "little")
+    except OSError:
+        return None
+
+
+def _segment_blocks(path):
+    """Sıkıştırılmış segmentin bağımsız açılabilen blokları: (başlangıç, bitiş) listesi."""
+    with open(path + BLOCK_SUFFIX, "rb") as f:
+        data = f.read()
+    offsets = [RECORD.unpack_from(data, pos)[0] for pos in range(0, len(data), RECORD.size)]
+    return list(zip(offsets, offsets[1:] + [os.path.getsize(path)]))
+
+
+def _block_data(f, codec, blocks):
+    decompress = _codec(codec)[2]
+    parts = []
+    for begin, end in blocks:
+        f.seek(begin)
+        parts.append(decompress(f.read(end - begin)))
+    return b"".join(parts)
+
+
+def _init_worker():
+    """Pool worker'ının başlangıcı. Fork üst süreçteki Classifier'ı kilidiyle birlikte
+    kopyalar; kilit o an ingester thread'inde tutuluyorsa worker'da hiç açılmaz.
+    Worker kendi Classifier'ını kurar."""
+    global _worker_classifier
+    _worker_classifier = Classifier(Config.THRESHOLDS_FILE)
+
+
+def parse_chunk(path, kind, fmt, codec, start, end, blocks, data=None):
+    """Worker süreçte çalışır: aralıktaki kayıtları ayrıştırıp sınıflandırır,
+    (AlertRecord listesi, satır sayısı) döner. Düz dosyalar mmap ile açılır, sadece
+    aralık kopyalanır; .gz parçaları (data) ana süreçte açılıp gönderilir."""
+    if kind == "segment":
+        with open(path, "rb") as f:
+            data = _block_data(f, codec, blocks)
+    elif data is None:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[start:end]
+    if kind == "unified2":
+        records, _ = parse_unified2(data)
+        lines = 0
+    else:
+        lines = data.split(b"\n")
+        if lines and not lines[-1]:
+            lines.pop()
+        records = LINE_PARSERS[fmt]([raw.decode("utf-8", errors="ignore") for raw in lines])
+        lines = len(lines)
+    return _worker_classifier.classify(records), lines
+
+
+def run_import(sinks, paths=None, workers=None, chunk_bytes=CHUNK_BYTES, resume=True,
+               checkpoint_loader=None, progress=print, checkpoints_loader=None):
+    """Geçmiş log'ları paralel ayrıştırıp sink'lere (ingester sink arayüzü) sırayla
+    verir. Worker sonuçları dosya sırasında tüketilir; her aralıktan sonra sink'lerin
+    tick()'i çağrılır ve checkpoint ("import:<yol>", inode, aralık sonu) yazılır.
+    Yarıda kalan import resume ile kaldığı aralıktan devam eder. .gz dosyaları bu
+    süreçte akış halinde açılır, parçaları worker'lara gider; checkpoint'leri
+    açılmış veri offset'idir. checkpoints_loader verilirse canlı ingester'ın okuduğu
+    kısımlar (aynı inode, checkpoint offset'ine kadar) resume'dan bağımsız atlanır."""
+    workers = workers or os.cpu_count() or 1
+    consumed = _live_consumed(checkpoints_loader()) if checkpoints_loader else {}
+    files = []
+    total_bytes = 0
+    for path, kind, fmt, codec in discover(paths, consumed):
+        inode = os.stat(path).st_ino
+        key = CHECKPOINT_PREFIX + path
+        done = 0
+        if resume and checkpoint_loader:
+            saved_inode, offset = checkpoint_loader(key)
+            if saved_inode == inode:
+                done = offset
+        if kind in ("text", "unified2"):
+            # Canlı checkpoint'ler de kayıt sınırıdır
+            done = max(done, consumed.get(inode, 0))
+        if kind == "gzip":
+            # Tamamlanmış dosya yeniden açılmaz (boyut trailer'la karşılaştırılır)
+            if done and done % 2 ** 32 == _gzip_isize(path):
+                continue
+            chunks = None
+            total_bytes += os.path.getsize(path)
+        else:
+            chunks = [chunk for chunk in plan_chunks(path, kind, chunk_bytes) if chunk[1] > done]
+            if not chunks:
+                continue
+            if chunks[0][0] < done:
+                # Önceki import başka bir parça boyutuyla yapılmış: done bir kayıt (segmentlerde
+                # blok) sınırıdır, işlenmiş kısım tekrar okunmaz
+                start, end, blocks = chunks[0]
+                if blocks is not None:
+                    blocks = [block for block in blocks if block[0] >= done]
+                chunks[0] = (done, end, blocks)
+            total_bytes += sum(end - start for start, end, _ in chunks)
+        files.append((path, kind, fmt, codec, key, inode, done, chunks))
+    progress(f"Importing {len(files)} files ({total_bytes / 1e6:.1f} MB) with {workers} workers")
+
+    def tasks():
+        """(parse_chunk argümanları, checkpoint, diskteki byte) üçlüleri, dosya sırasında."""
+        for path, kind, fmt, codec, key, inode, done, chunks in files:
+            if chunks is None:
+                for start, end, data, size in gzip_chunks(path, chunk_bytes, done):
+                    yield (path, kind, fmt, codec, start, end, None, data), (key, inode, end), size
+            else:
+                for start, end, blocks in chunks:
+                    yield (path, kind, fmt, codec, start, end, blocks), (key, inode, end), end - start
+
+    summary = {"files": len(files), "chunks": 0, "bytes": 0, "lines": 0, "alerts": 0}
+    started = last_report = time.monotonic()
+    # fork: spawn/forkserver ana modülü yeniden import eder (run.py uygulamayı ve ingest
+    # hattını modül düzeyinde kurar). Fork sadece çağıran thread'i kopyalar: başka
+    # thread'lerin tuttuğu kilitler worker'da sonsuza kadar kilitli kalır. Worker'lar
+    # sadece parse_chunk çalıştırır ve üst süreçten kalan tek paylaşılan nesne olan
+    # Classifier'ı _init_worker'da yeniden kurar; bağlantılara dokunmaz.
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"),
+                             initializer=_init_worker) as pool:
+        queue = tasks()
+        pending = collections.deque()
+
+        def submit():
+            task = next(queue, None)
+            if task is not None:
+                pending.append((pool.submit(parse_chunk, *task[0]), task))
+
+        # Bellekte en fazla 2 x worker aralık sonucu (ve .gz parçası) bekler
+        for _ in range(workers * 2):
+            submit()
+        while pending:
+            future, (_, checkpoint, size) = pending.popleft()
+            submit()
+            records, lines = future.result()
+            for sink in sinks:
+                sink.write(records, checkpoint)
+            for sink in sinks:
+                sink.tick()
+            summary["chunks"] += 1
+            summary["bytes"] += size
+            summary["lines"] += lines
+            summary["alerts"] += len(records)
+            now = time.monotonic()
+            if now - last_report >= REPORT_INTERVAL:
+                last_report = now
+                rate = summary["bytes"] / (now - started)
+                eta = (total_bytes - summary["bytes"]) / rate if rate else 0
+                progress(f"{summary['bytes'] / 1e6:.1f}/{total_bytes / 1e6:.1f} MB, "
+                         f"{summary['alerts']} alerts, {rate / 1e6:.1f} MB/s, ETA {eta:.0f}s")
+    for sink in sinks:
+        close = getattr(sink, "close", None)
+        if close:
+            close()
+    summary["seconds"] = round(time.monotonic() - started, 2)
+    progress(f"Imported {summary['alerts']} alerts from {summary['bytes'] / 1e6:.1f} MB in {summary['seconds']}s")
+    return summary
+
+
+def import_job(job, paths=None, workers=None, chunk_bytes=CHUNK_BYTES, resume=True):
+    """Arka plan işi olarak import (bkz. backend.LocalBackend.ACTIONS)."""
+    if _sink_factory is None:
+        raise RuntimeError("log import is only available in the ingest process")
+    return run_import(_sink_factory(), paths, workers, chunk_bytes, resume, _checkpoint_loader, job.progress,
+                      _checkpoints_loader)
@@ -0,0 +1,221 @@
+# snort_manager/ingester.py
+import os
+import threading
+from .alert_reader import LINE_PARSERS, alert_source, parse_unified2, resolve_path
+
+READ_CHUNK = 1024 * 1024
+
+
+class _Tail:
+    """Tek bir alert dosyasının okuma durumu: açık dosya, inode, offset, yarım kayıt."""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self.current_path = None
+        self.offset = 0
+        self.inode = None
+        self.lines = 0
+        self.alerts = 0
+        self.file = None
+        self.partial = b""
+        self.resume = None
+
+
+class LogIngester:
+    """Alert log dosyalarını byte offset + inode takibiyle izler, sadece yeni eklenen
+    kısmı okur ve parse edilen alert'leri kayıtlı sink'lere iletir. Birden fazla
+    kaynak (ör. her Snort instance'ının kendi dosyası) tek thread'de birleştirilir.
+
+    fmt: "console" / "alert_json" (satır tabanlı) ya da "unified2" (ikili kayıtlar).
+    path bir glob deseni olabilir; daha yeni bir dosya belirince eskisi bitirilip ona geçilir.
+
+    Sink arayüzü: write(records, checkpoint) ve tick(). checkpoint
+    (path, inode, offset) üçlüsüdür; offset son tam kaydın bittiği byte'tır."""
+
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self.sinks = []
+        self.tails = {}
+        # path -> (inode, offset); kaynak eklenirken kaldığı yerden devam için
+        self.checkpoint_loader = None
+        # Kayıtlar sink'lere verilmeden önce severity atanır (classify.Classifier)
+        self.classifier = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def lines(self):
+        return sum(tail.lines for tail in self.tails.values())
+
+    @property
+    def alerts(self):
+        return sum(tail.alerts for tail in self.tails.values())
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def add_source(self, path, fmt):
+        """Yeni bir dosyayı izlemeye başlar; aynı yol iki kez eklenmez."""
+        with self._lock:
+            if path in self.tails:
+                return self.tails[path]
+            tail = _Tail(path, fmt)
+            if self.checkpoint_loader:
+                tail.resume = self.checkpoint_loader(path)
+            self.tails[path] = tail
+        self._wakeup.set()
+        return tail
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="log-ingester", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        for tail in self.tails.values():
+            self._close(tail)
+
+    def notify(self):
+        """Yazıcı tarafı yeni satır eklediğinde beklemeden okumayı tetikler."""
+        self._wakeup.set()
+
+    def poll(self):
+        """Tüm kaynaklardaki yeni kayıtları işler, işlenen kayıt/satır sayısını döner."""
+        with self._lock:
+            tails = list(self.tails.values())
+        return sum(self._poll_tail(tail) for tail in tails)
+
+    def _poll_tail(self, tail):
+        if tail.file is None and not self._open(tail):
+            return 0
+        count = self._drain(tail)
+        target = resolve_path(tail.path)
+        try:
+            st = os.stat(target)
+        except (FileNotFoundError, TypeError):
+            # Rotate edildi, yeni dosya henüz oluşmadı
+            return count
+        if st.st_ino != tail.inode:
+            # logrotate ya da yeni unified2 dosyası: eskisini sonuna kadar oku (son drain'den
+            # sonra, rename'den önce yazılanlar dahil), yenisine geç
+            count += self._drain(tail)
+            self._close(tail)
+            if self._open(tail):
+                count += self._drain(tail)
+        elif st.st_size < tail.offset:
+            # copytruncate: dosya kesildi, baştan oku
+            tail.file.seek(0)
+            tail.offset = 0
+            tail.partial = b""
+            count += self._drain(tail)
+        return count
+
+    def _open(self, tail):
+        target = resolve_path(tail.path)
+        if target is None:
+            return False
+        try:
+            tail.file = open(target, "rb")
+        except FileNotFoundError:
+            return False
+        tail.current_path = target
+        st = os.fstat(tail.file.fileno())
+        tail.inode = st.st_ino
+        tail.offset = 0
+        tail.partial = b""
+        if tail.resume:
+            inode, offset = tail.resume
+            tail.resume = None
+            if inode == st.st_ino and offset <= st.st_size:
+                tail.file.seek(offset)
+                tail.offset = offset
+        return True
+
+    def _close(self, tail):
+        if tail.file:
+            tail.file.close()
+            tail.file = None
+
+    def _drain(self, tail):
+        count = 0
+        while True:
+            chunk = tail.file.read(READ_CHUNK)
+            if not chunk:
+                return count
+            data = tail.partial + chunk
+            try:
+                if tail.fmt == "unified2":
+                    records, consumed = parse_unified2(data)
+                    partial = data[consumed:]
+                    lines = 0
+                else:
+                    lines = data.split(b"\n")
+                    partial = lines.pop()
+                    records = LINE_PARSERS[tail.fmt]([raw.decode("utf-8", errors="ignore") for raw in lines])
+                    lines = len(lines)
+                if self.classifier is not None and records:
+                    records = self.classifier.classify(records)
+            except Exception:
+                # Henüz hiçbir sink parçayı görmedi: aynı parça sonraki poll'da yeniden okunur
+                tail.file.seek(tail.offset)
+                raise
+            checkpoint = (tail.path, tail.inode, tail.offset + len(chunk) - len(partial))
+            for sink in self.sinks:
+                # Her sink parçayı tam bir kez görür. Yazamayan sink (ör. DB kilitli)
+                # bekleyen satırlarını kendisi saklayıp sonraki flush'ta yeniden dener;
+                # diğer sink'ler etkilenmez.
+                try:
+                    sink.write(records, checkpoint)
+                except Exception as e:
+                    print(f"Log ingest sink error ({type(sink).__name__}): {e}")
+            tail.offset += len(chunk)
+            tail.partial = partial
+            tail.lines += lines
+            tail.alerts += len(records)
+            count += lines if tail.fmt != "unified2" else len(records)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Log ingest error: {e}")
+            for sink in self.sinks:
+                try:
+                    sink.tick()
+                except Exception as e:
+                    print(f"Log ingest sink error ({type(sink).__name__}): {e}")
+            self._wakeup.wait(self.poll_interval)
+
+
+_ingester = None
+
+
+def get_ingester():
+    global _ingester
+    if _ingester is None:
+        _ingester = LogIngester()
+    return _ingester
+
+
+def start_ingester(checkpoint_loader=None, sinks=(), classifier=None):
+    """Varsayılan alert kaynağını ekleyip ingest thread'ini başlatır."""
+    ingester = get_ingester()
+    ingester.checkpoint_loader = checkpoint_loader
+    ingester.classifier = classifier
+    for sink in sinks:
+        ingester.add_sink(sink)
+    ingester.add_source(*alert_source())
+    ingester.start()
+    return ingester
@@ -2,13 +2,31 @@
 import os
 import subprocess
 
-def check_and_install_snort():
+# Snort bir kez bulunduktan sonra sonraki başlatmalarda "snort -V" çalıştırılmaz
+_installed = False
+
+def snort_installed(refresh=False):
+    global _installed
+    if _installed and not refresh:
+        return True
     try:
         subprocess.run(["snort", "-V"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        _installed = True
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        _installed = False
+    return _installed
+
+def check_and_install_snort():
+    """Snort kurulu değilse apt ile kurar; sonunda kurulu olup olmadığını döner."""
+    if snort_installed():
         print("Snort is already installed.")
-    except FileNotFoundError:
-        print("Snort not found, installing...")
-        os.system("sudo apt-get update && sudo apt-get install -y snort")
+        return True
+    print("Snort not found, installing...")
+    result = subprocess.run("sudo apt-get update && sudo apt-get install -y snort", shell=True)
+    if result.returncode != 0:
+        print(f"Snort installation failed (exit code {result.returncode}).")
+        return False
+    return snort_installed(refresh=True)
 
 def configure_snort(config_path, rules_path):
     if not os.path.exists(config_path):
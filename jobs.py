@@ -0,0 +1,114 @@
+# snort_manager/jobs.py
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Durum sorgusu için saklanan en fazla iş sayısı; en eski bitmiş işler atılır
+MAX_JOBS = 100
+
+
+class Job:
+    """Arka planda çalışan tek bir işlem. İş fonksiyonu ilk argüman olarak
+    Job'u alır ve ilerlemeyi job.progress() ile bildirir."""
+
+    def __init__(self, name, key=None):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.key = key
+        self.state = "queued"
+        self.message = "Queued"
+        self.steps = []
+        self.error = None
+        self.result = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+    @property
+    def done(self):
+        return self.state in ("succeeded", "failed")
+
+    def progress(self, message):
+        self.message = message
+        self.steps.append((round(time.time() - (self.started or self.created), 2), message))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "state": self.state,
+            "message": self.message,
+            "steps": [{"elapsed": elapsed, "message": message} for elapsed, message in self.steps],
+            "error": self.error,
+            "result": self.result,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "duration": round((self.finished or time.time()) - self.started, 2) if self.started else None,
+        }
+
+
+class JobManager:
+    """Uzun süren kontrol işlemlerini (kurulum, yapılandırma, başlat/durdur)
+    istek thread'i dışında bir thread havuzunda çalıştırır. Aynı key'li işler
+    (ör. Snort'u başlatan ve durduran) aynı anda çalışamaz."""
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snort-job")
+        self._lock = threading.Lock()
+        self.jobs = OrderedDict()
+
+    def submit(self, name, func, *args, key=None, **kwargs):
+        """İşi kuyruğa koyar ve Job'u döner. Aynı key'li bitmemiş bir iş varsa
+        ValueError."""
+        with self._lock:
+            if key is not None:
+                for job in self.jobs.values():
+                    if job.key == key and not job.done:
+                        raise ValueError(f"{job.name} job {job.id} is still {job.state}")
+            job = Job(name, key)
+            self.jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        job.started = time.time()
+        job.state = "running"
+        try:
+            job.result = func(job, *args, **kwargs)
+        except Exception as e:
+            print(f"Job {job.name} ({job.id}) failed: {e}")
+            job.error = str(e)
+            job.state = "failed"
+            job.progress(f"Failed: {e}")
+        else:
+            job.state = "succeeded"
+            job.progress("Done")
+        finally:
+            job.finished = time.time()
+
+    def _prune(self):
+        excess = len(self.jobs) - MAX_JOBS
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.done][:max(excess, 0)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def recent(self, limit=10):
+        with self._lock:
+            jobs = list(self.jobs.values())
+        return jobs[::-1][:limit]
+
+
+_jobs = None
+
+
+def get_job_manager():
+    global _jobs
+    if _jobs is None:
+        _jobs = JobManager()
+    return _jobs
@@ -0,0 +1,291 @@
+# snort_manager/line_index.py
+import mmap
+import os
+import struct
+import threading
+from config import Config
+from .alert_reader import alert_source
+from .parser import line_timestamp
+
+READ_CHUNK = 1024 * 1024
+BLOCK_LINES = 1000
+# Zaman damgası aranan satır başı uzunluğu (alert_json'da damga birkaç byte içeride)
+HEAD_BYTES = 64
+
+# Sidecar dosya düzeni: başlık + sabit genişlikli kayıtlar.
+# Başlık: magic, sürüm, log dosyasının inode'u, indekslenen son tam satırın bittiği offset
+HEADER = struct.Struct("<4sIQQ")
+MAGIC = b"SLIX"
+VERSION = 1
+# Kayıt: satırın başlangıç offset'i, zaman damgası (epoch saniye)
+RECORD = struct.Struct("<Qd")
+
+
+class LineIndex:
+    """Log dosyasındaki her tam satırın başlangıç offset'ini ve zaman damgasını
+    "<log>.idx" sidecar dosyasında tutar. Sayfa istekleri doğrudan ilgili
+    offset'e seek eder (O(1)), zaman aralıkları ikili arama ile bulunur (O(log n)).
+    Sidecar yoksa ya da başka bir dosyaya aitse ilk refresh'te yeniden kurulur.
+
+    Sidecar'ı tek bir süreç yazar (writer=True; ingest hattının çalıştığı süreç,
+    orada ingester sink'i olarak tick'te güncellenir). Diğer süreçler (web
+    worker'ları) dosyayı salt okunur açar ve refresh'te başlığı izler. Yazıcı
+    dosyayı yerinde hiç küçültmez: yeniden kurulan indeks yeni bir dosyaya yazılıp
+    rename edilir, böylece okuyucuların eski mmap'leri geçerli kalır."""
+
+    def __init__(self, path, index_path=None, writer=True):
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        self.writer = writer
+        self.inode = None
+        self.end = 0  # son tam satırın bittiği offset
+        self.count = 0
+        self._last_ts = 0.0
+        self._idx = None
+        self._map = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return self.count
+
+    def append(self, offset, data):
+        """Yazıcı tarafından çağrılır: offset'e yazılan tam satır(lar)ı indekse ekler.
+        Kesintisiz değilse (başka yazıcı, rotate) sonraki refresh tamamlar."""
+        with self._lock:
+            if not self.writer or self._idx is None or offset != self.end:
+                return False
+            records = bytearray()
+            pos = 0
+            while pos < len(data):
+                nl = data.find(b"\n", pos)
+                if nl == -1:
+                    break
+                records += self._record(offset + pos, data[pos:pos + HEAD_BYTES])
+                pos = nl + 1
+            self._write(records, offset + pos)
+            return True
+
+    def refresh(self):
+        """Son indekslenen noktadan sonra eklenen satırları indekse ekler; okuyucu
+        süreçte yazıcının eklediklerini görür. Yeni satır sayısını döner."""
+        if not self.writer:
+            return self._follow()
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return 0
+            if self._idx is None:
+                self._load(st)
+            if st.st_ino != self.inode or st.st_size < self.end:
+                # Rotate ya da truncate: indeksi baştan kur
+                self._reset(st.st_ino)
+            if st.st_size == self.end:
+                return 0
+            before = self.count
+            with open(self.path, "rb") as f:
+                f.seek(self.end)
+                base = self.end
+                buf = b""
+                while True:
+                    chunk = f.read(READ_CHUNK)
+                    if not chunk:
+                        break
+                    buf += chunk
+                    records = bytearray()
+                    pos = 0
+                    nl = buf.find(b"\n")
+                    while nl != -1:
+                        records += self._record(base + pos, buf[pos:pos + HEAD_BYTES])
+                        pos = nl + 1
+                        nl = buf.find(b"\n", pos)
+                    self._write(records, base + pos)
+                    buf = buf[pos:]
+                    base += pos
+            return self.count - before
+
+    # Ingester sink arayüzü (yazıcı süreç): kayıtlar kullanılmaz, yeni satırlar her
+    # poll sonunda dosyadan indekslenir. Konsol modunda append zaten günceller; tick
+    # döndürmeden sonra yeni dosyayı yakalar.
+    def write(self, records, checkpoint):
+        pass
+
+    def tick(self):
+        self.refresh()
+
+    def offset(self, lineno):
+        return self._entry(lineno)[0]
+
+    def timestamp(self, lineno):
+        return self._entry(lineno)[1]
+
+    def seek_time(self, ts):
+        """Zaman damgası ts'ye eşit ya da büyük ilk satırın numarası (ikili arama)."""
+        with self._lock:
+            lo, hi = 0, self.count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._entry(mid)[1] < ts:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return lo
+
+    def read_lines(self, first, count):
+        """[first, first + count) aralığındaki satırları döner."""
+        with self._lock:
+            last = min(first + count, self.count)
+            if first >= last:
+                return []
+            begin = self._entry(first)[0]
+            stop = self._entry(last)[0] if last < self.count else self.end
+        with open(self.path, "rb") as f:
+            f.seek(begin)
+            data = f.read(stop - begin)
+        return data.decode("utf-8", errors="replace").split("\n")[:last - first]
+
+    def iter_lines(self, reverse=False):
+        """(satır no, metin) çiftlerini blok blok üretir; bellek kullanımı bloğa sınırlıdır."""
+        starts = range(0, self.count, BLOCK_LINES)
+        if reverse:
+            starts = reversed(starts)
+        for first in starts:
+            lines = self.read_lines(first, BLOCK_LINES)
+            numbered = enumerate(lines, first)
+            if reverse:
+                numbered = reversed(list(numbered))
+            yield from numbered
+
+    def page(self, start, length, search="", reverse=False):
+        """DataTables sayfası: (toplam, filtrelenmiş, [(satır no, metin), ...])."""
+        self.refresh()
+        total = self.count
+        if not search:
+            if reverse:
+                first = max(total - start - length, 0)
+                rows = list(enumerate(self.read_lines(first, total - start - first), first))
+                rows.reverse()
+            else:
+                rows = list(enumerate(self.read_lines(start, length), start))
+            return total, total, rows
+        needle = search.lower()
+        matched = 0
+        rows = []
+        for lineno, text in self.iter_lines(reverse):
+            if needle in text.lower():
+                if start <= matched < start + length:
+                    rows.append((lineno, text))
+                matched += 1
+        return total, matched, rows
+
+    def _record(self, offset, head):
+        # Zaman damgası olmayan satırlar bir öncekini taşır, dizi monoton kalır
+        ts = line_timestamp(head)
+        if ts is None:
+            ts = self._last_ts
+        else:
+            self._last_ts = ts
+        return RECORD.pack(offset, ts)
+
+    def _entry(self, lineno):
+        pos = HEADER.size + lineno * RECORD.size
+        if self._map is None or len(self._map) < pos + RECORD.size:
+            self._remap()
+        return RECORD.unpack_from(self._map, pos)
+
+    def _remap(self):
+        self._idx.flush()
+        self._unmap()
+        self._map = mmap.mmap(self._idx.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _unmap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _follow(self):
+        with self._lock:
+            try:
+                st = os.stat(self.index_path)
+            except FileNotFoundError:
+                return 0
+            if self._idx is None or os.fstat(self._idx.fileno()).st_ino != st.st_ino:
+                # Yazıcı indeksi yeniden kurdu: yeni dosyayı aç
+                self._unmap()
+                if self._idx is not None:
+                    self._idx.close()
+                self._idx = open(self.index_path, "rb")
+                self.inode, self.end, self.count = None, 0, 0
+            header = os.pread(self._idx.fileno(), HEADER.size, 0)
+            if len(header) < HEADER.size:
+                return 0
+            magic, version, inode, end = HEADER.unpack(header)
+            if (magic, version) != (MAGIC, VERSION) or (inode, end) == (self.inode, self.end):
+                return 0
+            before = self.count if inode == self.inode else 0
+            count = (os.fstat(self._idx.fileno()).st_size - HEADER.size) // RECORD.size
+            self.inode, self.end = inode, end
+            # Başlıktan önce yazılmış kayıtlar sonraki refresh'te sayılır
+            while count and self._entry(count - 1)[0] >= end:
+                count -= 1
+            self.count = count
+            return count - before
+
+    def _load(self, st):
+        """Mevcut sidecar'ı açar; geçersizse boş bir indeksle başlar."""
+        mode = "r+b" if os.path.exists(self.index_path) else "w+b"
+        self._idx = open(self.index_path, mode)
+        header = self._idx.read(HEADER.size)
+        if len(header) == HEADER.size:
+            magic, version, inode, end = HEADER.unpack(header)
+            size = os.fstat(self._idx.fileno()).st_size
+            count = (size - HEADER.size) // RECORD.size
+            if (magic, version, inode) == (MAGIC, VERSION, st.st_ino) and end <= st.st_size:
+                self.inode, self.end, self.count = inode, end, count
+                # Başlık güncellenmeden kalmış kayıtlar yok sayılır; sonraki yazmalar
+                # üzerine yazar (dosya küçültülmez, okuyucular onu map'lemiş olabilir)
+                while self.count and self._entry(self.count - 1)[0] >= end:
+                    self.count -= 1
+                if self.count:
+                    self._last_ts = self._entry(self.count - 1)[1]
+                return
+        self._reset(st.st_ino)
+
+    def _reset(self, inode):
+        self._unmap()
+        self.inode = inode
+        self.end = 0
+        self.count = 0
+        self._last_ts = 0.0
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, inode or 0, 0))
+        os.replace(tmp_path, self.index_path)
+        self._idx.close()
+        self._idx = open(self.index_path, "r+b")
+
+    def _write(self, records, end):
+        if records:
+            self._idx.seek(HEADER.size + self.count * RECORD.size)
+            self._idx.write(records)
+            self.count += len(records) // RECORD.size
+        self.end = end
+        # Başlık en son güncellenir; yarıda kesilirse kayıtlar yeniden üretilir.
+        # Okuyucu süreçler başlığı diskten okur, tampon hemen boşaltılır.
+        self._idx.seek(0)
+        self._idx.write(HEADER.pack(MAGIC, VERSION, self.inode, end))
+        self._idx.flush()
+
+
+_line_index = None
+
+
+def get_line_index():
+    """Süreçteki indeks; salt okunur başlar, ingest hattını kuran süreç
+    (create_app) writer'ı True yapıp ingester'a sink olarak ekler."""
+    global _line_index
+    if _line_index is None:
+        path, fmt = alert_source()
+        # unified2 ikili olduğundan logs görünümü Snort'un metin çıktısını gösterir
+        _line_index = LineIndex(path if fmt != "unified2" else Config.SNORT_LOG_FILE, writer=False)
+    return _line_index
@@ -13,3 +13,45 @@ class User(UserMixin, db.Model):
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
+
+class Alert(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    timestamp = db.Column(db.Float, index=True)  # epoch saniye
+    gid = db.Column(db.Integer)
+    sid = db.Column(db.Integer, index=True)
+    rev = db.Column(db.Integer)
+    priority = db.Column(db.Integer)
+    classification = db.Column(db.String(128))
+    msg = db.Column(db.String(255))
+    proto = db.Column(db.String(8))
+    src_ip = db.Column(db.String(45))
+    src_port = db.Column(db.Integer)
+    dst_ip = db.Column(db.String(45), index=True)
+    dst_port = db.Column(db.Integer)
+    severity = db.Column(db.String(8), index=True)  # danger / warning / safe
+
+class Incident(db.Model):
+    """Aynı (sid, kaynak, hedef, hedef port) alert'lerinin bir zaman penceresindeki
+    toplamı; snort_manager/correlate.py üretir, açık olanlar yerinde güncellenir."""
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    first_seen = db.Column(db.Float, index=True)
+    last_seen = db.Column(db.Float, index=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    gid = db.Column(db.Integer)
+    sid = db.Column(db.Integer, index=True)
+    rev = db.Column(db.Integer)
+    priority = db.Column(db.Integer)
+    classification = db.Column(db.String(128))
+    msg = db.Column(db.String(255))
+    proto = db.Column(db.String(8))
+    src_ip = db.Column(db.String(45), index=True)
+    dst_ip = db.Column(db.String(45), index=True)
+    dst_port = db.Column(db.Integer)
+    severity = db.Column(db.String(8), index=True)
+    closed = db.Column(db.Boolean, nullable=False, default=False)
+
+class IngestCheckpoint(db.Model):
+    """Ingester'ın hangi dosyada nereye kadar okuduğu; alert/incident'larla aynı transaction'da yazılır."""
+    path = db.Column(db.String(255), primary_key=True)
+    inode = db.Column(db.Integer)
+    offset = db.Column(db.BigInteger, nullable=False, default=0)
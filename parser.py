@@ -0,0 +1,103 @@
+# snort_manager/parser.py
+import re
+import time
+from collections import namedtuple
+from datetime import datetime
+
+# severity ingest sırasında classify.Classifier tarafından doldurulur
+AlertRecord = namedtuple("AlertRecord", [
+    "ts", "gid", "sid", "rev", "msg", "classification", "priority",
+    "proto", "src_ip", "src_port", "dst_ip", "dst_port", "severity",
+], defaults=(None,))
+
+# Örnek (-A console / fast):
+# 04/15-06:55:12.123456  [**] [1:1000001:0] ICMP test [**] [Classification: Misc activity] [Priority: 3] {ICMP} 192.168.1.5 -> 192.168.1.10
+ALERT_RE = re.compile(
+    r"^(?P<ts>\d{2}/\d{2}(?:/\d{2})?-\d{2}:\d{2}:\d{2}(?:\.\d+)?)\s+"
+    r"\[\*\*\]\s+\[(?P<gid>\d+):(?P<sid>\d+):(?P<rev>\d+)\]\s+(?P<msg>.*?)\s*\[\*\*\]"
+    r"(?:\s+\[Classification:\s*(?P<cls>[^\]]*)\])?"
+    r"(?:\s+\[Priority:\s*(?P<pri>\d+)\])?"
+    r"\s+\{(?P<proto>[^}]+)\}\s+(?P<src>\S+)\s+->\s+(?P<dst>\S+)"
+)
+
+TIMESTAMP_RE = re.compile(rb"(\d{2}/\d{2}(?:/\d{2})?-\d{2}:\d{2}:\d{2}(?:\.\d+)?)[\s\"]")
+
+
+def split_endpoint(value):
+    """"1.2.3.4:80" -> ("1.2.3.4", 80); portsuz adres ve IPv6 için port None döner."""
+    if value.startswith("["):
+        addr, _, port = value[1:].partition("]")
+        port = port.lstrip(":")
+        return addr, int(port) if port.isdigit() else None
+    if value.count(":") == 1:
+        addr, port = value.split(":")
+        return addr, int(port) if port.isdigit() else None
+    return value, None
+
+
+_last_second = (None, 0.0)
+
+
+def parse_timestamp(value, now=None):
+    """Snort zaman damgasını epoch saniyeye çevirir. -y kullanılmadığında yıl
+    bilgisi yoktur, bu durumda içinde bulunulan yıl varsayılır."""
+    global _last_second
+    stamp, _, fraction = value.partition(".")
+    frac = float("0." + fraction) if fraction else 0.0
+    # Ardışık alert'ler çoğunlukla aynı saniyeye düşer, strptime'ı tekrarlama
+    key, base = _last_second
+    if key == stamp and now is None:
+        return base + frac
+    now = now or time.time()
+    date, _, clock = stamp.partition("-")
+    parts = date.split("/")
+    year = 2000 + int(parts[2]) if len(parts) == 3 else datetime.fromtimestamp(now).year
+    dt = datetime.strptime(f"{year}/{parts[0]}/{parts[1]} {clock}", "%Y/%m/%d %H:%M:%S")
+    if len(parts) == 2 and dt.timestamp() > now + 86400:
+        # Yılbaşı dönümünde bir önceki yıla ait kayıt
+        dt = dt.replace(year=year - 1)
+    base = dt.timestamp()
+    _last_second = (stamp, base)
+    return base + frac
+
+
+def parse_line(line):
+    """Tek bir alert satırını AlertRecord'a çevirir; alert değilse None döner."""
+    if "->" not in line:
+        return None
+    m = ALERT_RE.match(line)
+    if m is None:
+        # Tanınmayan format: en azından hedef IP'yi koru (eski log_stats davranışı)
+        parts = line.split("->")
+        if len(parts) != 2:
+            return None
+        dst = parts[1].strip().split(":")[0]
+        return AlertRecord(None, None, None, None, None, None, None, None, None, None, dst, None)
+    src_ip, src_port = split_endpoint(m.group("src"))
+    dst_ip, dst_port = split_endpoint(m.group("dst"))
+    pri = m.group("pri")
+    try:
+        ts = parse_timestamp(m.group("ts"))
+    except ValueError:
+        # Geçersiz tarih (ör. 13. ay): bozuk satır, atlanır
+        return None
+    return AlertRecord(
+        ts,
+        int(m.group("gid")), int(m.group("sid")), int(m.group("rev")),
+        m.group("msg"), m.group("cls"), int(pri) if pri else None,
+        m.group("proto"), src_ip, src_port, dst_ip, dst_port,
+    )
+
+
+def line_timestamp(data):
+    """Ham satırın (bytes) başındaki zaman damgasını döner; yoksa None.
+    alert_json satırlarında damga '{ "timestamp" : "..."' alanındadır."""
+    m = TIMESTAMP_RE.search(data)
+    if m is None:
+        return None
+    return parse_timestamp(m.group(1).decode("ascii"))
+
+
+def parse_lines(lines):
+    """Satır listesindeki alert'leri AlertRecord listesi olarak döner."""
+    return [r for r in map(parse_line, lines) if r is not None]
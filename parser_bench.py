@@ -0,0 +1,161 @@
+# benchmarks/parser_bench.py
+"""Alert ayrıştırma stratejilerinin mikro benchmark'ı.
+
+Aynı sentetik girdi üzerinde satır bölme (ingester/capture'daki chunk -> satır
+adımı) ve satır ayrıştırma stratejilerini karşılaştırır, her stratejinin
+çıktısının mevcut parser ile aynı olduğunu doğrular ve satır/s verir:
+
+  split:    bytes.split + satır başına decode (ingester), decode + splitlines,
+            io.TextIOWrapper ile satır satır okuma
+  console:  regex (parser.parse_lines), str.split tabanlı elle ayrıştırıcı,
+            tüm tampon üzerinde tek bir derlenmiş bytes regex'i (finditer),
+            eski log_stats'taki sadece hedef IP ayıklama (taban çizgisi)
+  alert_json: toplu json.loads (parse_json_lines) ve satır başına json.loads
+
+    python -m benchmarks.parser_bench --lines 500000 --output parser.json
+"""
+import argparse
+import io
+import json
+import re
+import time
+
+from snort_manager.alert_reader import parse_json_line, parse_json_lines
+from snort_manager.parser import AlertRecord, parse_lines, parse_timestamp, split_endpoint
+from .alert_gen import AlertGenerator
+
+# Tampon üzerinde çalışan, satır sınırlarını kendisi bulan derlenmiş desen
+BUFFER_RE = re.compile(
+    rb"^(\d{2}/\d{2}(?:/\d{2})?-\d{2}:\d{2}:\d{2}(?:\.\d+)?)\s+\[\*\*\]\s+\[(\d+):(\d+):(\d+)\]\s+(.*?)\s*\[\*\*\]"
+    rb"(?:\s+\[Classification:\s*([^\]]*)\])?(?:\s+\[Priority:\s*(\d+)\])?"
+    rb"\s+\{([^}]+)\}\s+(\S+)\s+->\s+(\S+)\r?$",
+    re.M,
+)
+
+
+def parse_split(lines):
+    """Regex'siz ayrıştırıcı: sabit ayraçlarla str.split / partition."""
+    records = []
+    append = records.append
+    for line in lines:
+        head, sep, rest = line.partition("  [**] [")
+        if not sep:
+            continue
+        rule, _, rest = rest.partition("] ")
+        msg, _, rest = rest.partition(" [**] ")
+        gid, sid, rev = rule.split(":")
+        cls = priority = None
+        if rest.startswith("[Classification: "):
+            cls, _, rest = rest[17:].partition("] ")
+        if rest.startswith("[Priority: "):
+            priority, _, rest = rest[11:].partition("] ")
+        proto, _, rest = rest[1:].partition("} ")
+        src, _, dst = rest.partition(" -> ")
+        src_ip, src_port = split_endpoint(src)
+        dst_ip, dst_port = split_endpoint(dst.strip())
+        append(AlertRecord(parse_timestamp(head), int(gid), int(sid), int(rev), msg, cls,
+                           int(priority) if priority else None, proto, src_ip, src_port, dst_ip, dst_port))
+    return records
+
+
+def parse_buffer(data):
+    """Chunk'ı satırlara bölmeden tek finditer ile ayrıştırır."""
+    records = []
+    append = records.append
+    for m in BUFFER_RE.finditer(data):
+        ts, gid, sid, rev, msg, cls, pri, proto, src, dst = m.groups()
+        src_ip, src_port = split_endpoint(src.decode())
+        dst_ip, dst_port = split_endpoint(dst.decode())
+        append(AlertRecord(parse_timestamp(ts.decode()), int(gid), int(sid), int(rev), msg.decode(),
+                           cls.decode() if cls is not None else None, int(pri) if pri else None,
+                           proto.decode(), src_ip, src_port, dst_ip, dst_port))
+    return records
+
+
+def dst_only(lines):
+    """Orijinal log_stats'ın yaptığı: "->" sonrasından hedef IP."""
+    return [line.split("->")[1].strip().split(":")[0] for line in lines if "->" in line]
+
+
+def timed(func, arg, repeat):
+    """En iyi süre (s) ve son çağrının sonucu."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = func(arg)
+        best = min(best, time.perf_counter() - t)
+    return best, result
+
+
+def run(lines, repeat):
+    results = {}
+
+    console = AlertGenerator("console").lines(lines)
+    data = ("\n".join(console) + "\n").encode()
+    split_strategies = {
+        "bytes_split_decode": lambda d: [raw.decode("utf-8", errors="ignore") for raw in d.split(b"\n")[:-1]],
+        "decode_splitlines": lambda d: d.decode("utf-8", errors="ignore").splitlines(),
+        "textiowrapper": lambda d: list(io.TextIOWrapper(io.BytesIO(d), encoding="utf-8", errors="ignore")),
+    }
+    results["split"] = {}
+    for name, func in split_strategies.items():
+        seconds, out = timed(func, data, repeat)
+        assert len(out) == len(console), name
+        results["split"][name] = {"seconds": round(seconds, 4), "lines_per_sec": round(len(console) / seconds)}
+
+    expected = parse_lines(console)
+    console_strategies = {
+        "regex": (parse_lines, console),
+        "split": (parse_split, console),
+        "compiled_buffer": (parse_buffer, data),
+        "dst_only_baseline": (dst_only, console),
+    }
+    results["console"] = {}
+    for name, (func, arg) in console_strategies.items():
+        seconds, out = timed(func, arg, repeat)
+        if name == "dst_only_baseline":
+            same = out == [r.dst_ip for r in expected]
+        else:
+            same = out == expected
+        results["console"][name] = {"seconds": round(seconds, 4), "lines_per_sec": round(len(console) / seconds),
+                                    "matches_parser": same}
+
+    fast = AlertGenerator("fast").lines(lines)
+    seconds, out = timed(parse_lines, fast, repeat)
+    results["fast"] = {"regex": {"seconds": round(seconds, 4), "lines_per_sec": round(len(fast) / seconds),
+                                 "records": len(out)}}
+
+    alert_json = AlertGenerator("alert_json").lines(lines)
+    expected = parse_json_lines(alert_json)
+    json_strategies = {
+        "bulk_array": parse_json_lines,
+        "per_line": lambda ls: [r for r in map(parse_json_line, ls) if r is not None],
+        "per_line_loads_only": lambda ls: [json.loads(line) for line in ls],
+    }
+    results["alert_json"] = {}
+    for name, func in json_strategies.items():
+        seconds, out = timed(func, alert_json, repeat)
+        entry = {"seconds": round(seconds, 4), "lines_per_sec": round(len(alert_json) / seconds)}
+        if name != "per_line_loads_only":
+            entry["matches_parser"] = out == expected
+        results["alert_json"][name] = entry
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snort alert parser microbenchmarks")
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per strategy, best time is reported")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    results = {"lines": args.lines, "results": run(args.lines, args.repeat)}
+    for group, strategies in results["results"].items():
+        for name, entry in strategies.items():
+            print(f"{group:>10} {name:<22} {entry['lines_per_sec']:>12,} lines/s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# snort_manager/perf.py
+import os
+import re
+import signal
+import threading
+import time
+from collections import deque
+from config import Config
+
+# Snort 3 perf_monitor'ün log dizinine yazdığı temel istatistik dosyası
+PERF_CSV = "perf_monitor_base.csv"
+# Snort 3 perf_monitor sütunları -> ortak alan adları
+PERF_COLUMNS = {
+    "daq.received": "received",
+    "daq.analyzed": "analyzed",
+    "daq.dropped": "dropped",
+}
+# Snort 2'nin SIGUSR1 ile stderr'e döktüğü "Packet I/O Totals" bölümü
+STATS_RE = re.compile(r"^\s*(Received|Analyzed|Dropped):\s+(\d+)", re.M)
+# SIGUSR1'in varsayılan davranışı süreci öldürür; Snort 2 handler'larını kurup bu
+# satırı yazana kadar sinyal gönderilmez
+READY_RE = re.compile(r"^Commencing packet processing", re.M)
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def _read_from(path, offset, limit=None):
+    """Dosyaya offset'ten sonra eklenen tam satırlar ve son tam satırın bittiği yeni
+    offset. Yazılmakta olan yarım satır sonraki okumaya kalır. limit verilirse sadece
+    son limit byte'taki satırlar okunur (sadece son değerin önemli olduğu dosyalar için)."""
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < offset:
+                offset = 0
+            base = offset if limit is None else max(offset, size - limit)
+            f.seek(base)
+            data = f.read(size - base)
+    except FileNotFoundError:
+        return "", offset
+    if base > offset:
+        # Aralığın başındaki yarım satır atlanır
+        skip = data.find(b"\n") + 1
+        if not skip:
+            return "", offset
+        base += skip
+        data = data[skip:]
+    end = data.rfind(b"\n") + 1
+    return data[:end].decode("utf-8", errors="ignore"), base + end
+
+
+def _cpu_ticks(pid):
+    """/proc/<pid>/stat içinden utime + stime (clock tick)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rpartition(")")[2].split()
+        return int(fields[11]) + int(fields[12])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class InstancePerf:
+    """Bir Snort instance'ının performans zaman serisi ve okuma durumu."""
+
+    def __init__(self, history):
+        self.samples = deque(maxlen=history)
+        self.totals = {"received": 0, "analyzed": 0, "dropped": 0}
+        self.last_time = None
+        self.last_totals = None
+        self.last_alerts = 0
+        self.last_ticks = None
+        self.csv_offset = 0
+        self.csv_columns = None
+        self.stderr_offset = 0
+        self.pid = None
+        self.ready = False
+
+    def read_perf_csv(self, log_dir):
+        """Snort 3 perf_monitor CSV'sinin yeni satırlarını toplamlara ekler
+        (perf_monitor her satırda aralık içindeki değerleri yazar)."""
+        text, self.csv_offset = _read_from(os.path.join(log_dir, PERF_CSV), self.csv_offset)
+        for line in text.splitlines():
+            if line.startswith("#"):
+                self.csv_columns = line.lstrip("#").split(",")
+                continue
+            if not self.csv_columns or not line:
+                continue
+            for column, value in zip(self.csv_columns, line.split(",")):
+                key = PERF_COLUMNS.get(column)
+                if key and value.isdigit():
+                    self.totals[key] += int(value)
+
+    def read_signal_dump(self, log_dir):
+        """Snort 2'nin SIGUSR1 dökümündeki kümülatif sayaçları okur; başlangıç
+        çıktısında READY_RE görülünce ready olur."""
+        # Sayaçlar kümülatif: hazır olduktan sonra sadece son dökümler gerekir
+        text, self.stderr_offset = _read_from(os.path.join(log_dir, "snort_stderr.log"), self.stderr_offset,
+                                              limit=1024 * 1024 if self.ready else None)
+        if not self.ready and READY_RE.search(text):
+            self.ready = True
+        for name, value in STATS_RE.findall(text):
+            self.totals[name.lower()] = int(value)
+
+
+class PerfCollector:
+    """Supervisor'ın her kontrolünde çağrılır; interval saniyede bir her instance
+    için alınan/düşürülen paket, alert/s ve CPU örneği kaydeder. Kural
+    değişiklikleri gibi olaylar aynı zaman ekseninde işaretlenir."""
+
+    def __init__(self, interval=10, history=8640, signal_stats=False):
+        self.interval = interval
+        self.history = history
+        self.signal_stats = signal_stats
+        self.instances = {}
+        self.events = deque(maxlen=1000)
+        self._lock = threading.Lock()
+
+    def collect(self, instance):
+        perf = self.instances.get(instance.name)
+        if perf is None:
+            perf = self.instances[instance.name] = InstancePerf(self.history)
+        now = time.time()
+        if perf.last_time is not None and now - perf.last_time < self.interval:
+            return
+        if self.signal_stats:
+            if perf.pid != instance.pid:
+                # Yeni süreç: çıktısı spawn anındaki offset'ten okunur, hazır olana kadar sinyal yok
+                perf.pid, perf.ready, perf.stderr_offset = instance.pid, False, instance.stderr_offset
+            perf.read_signal_dump(instance.log_dir)
+        else:
+            perf.read_perf_csv(instance.log_dir)
+        ticks = _cpu_ticks(instance.pid) if instance.state == "running" else None
+        alerts = instance.counters.get("alerts", 0)
+        totals = dict(perf.totals)
+        if perf.last_time is not None:
+            elapsed = now - perf.last_time
+            # Snort yeniden başlarsa kümülatif sayaçlar sıfırlanır, negatif farkı yok say
+            received = max(totals["received"] - perf.last_totals["received"], 0)
+            dropped = max(totals["dropped"] - perf.last_totals["dropped"], 0)
+            cpu = None
+            if ticks is not None and perf.last_ticks is not None and ticks >= perf.last_ticks:
+                cpu = round((ticks - perf.last_ticks) / CLOCK_TICKS / elapsed * 100, 1)
+            sample = {
+                "ts": round(now, 3),
+                "received": totals["received"],
+                "dropped": totals["dropped"],
+                "pps": round(received / elapsed, 1),
+                "drops_ps": round(dropped / elapsed, 1),
+                "drop_pct": round(100.0 * dropped / received, 3) if received > 0 else 0.0,
+                "alerts_ps": round(max(alerts - perf.last_alerts, 0) / elapsed, 1),
+                "cpu": cpu,
+            }
+            with self._lock:
+                perf.samples.append(sample)
+        perf.last_time, perf.last_totals, perf.last_alerts, perf.last_ticks = now, totals, alerts, ticks
+        instance.counters["packets"] = totals["received"]
+        instance.counters["dropped"] = totals["dropped"]
+        if self.signal_stats and perf.ready and instance.state == "running":
+            # Bir sonraki örnek için Snort 2'den istatistik dökümü iste
+            try:
+                os.kill(instance.pid, signal.SIGUSR1)
+            except (OSError, TypeError):
+                pass
+
+    def mark(self, label):
+        """Zaman serisi üzerinde bir olay işaretler (ör. kural güncellemesi)."""
+        with self._lock:
+            self.events.append({"ts": round(time.time(), 3), "label": label})
+
+    def series(self, since=0):
+        with self._lock:
+            return {
+                "instances": {name: [s for s in perf.samples if s["ts"] >= since]
+                              for name, perf in self.instances.items()},
+                "events": [e for e in self.events if e["ts"] >= since],
+            }
+
+
+_collector = None
+
+
+def get_perf_collector():
+    global _collector
+    if _collector is None:
+        _collector = PerfCollector(Config.SNORT_PERF_INTERVAL,
+                                   signal_stats=Config.SNORT_ALERT_MODE == "console")
+    return _collector
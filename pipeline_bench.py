@@ -0,0 +1,182 @@
+# benchmarks/pipeline_bench.py
+"""Uçtan uca ingest hattı benchmark'ı.
+
+Snort'u pcap üzerinde okuma modunda (-r) ya da Snort yoksa sentetik bir alert
+üreticisini alt süreç olarak çalıştırır ve stdout'unu gerçek hattan geçirir:
+LogCapture -> log dosyası + satır indeksi -> LogIngester -> korelasyon ->
+IncidentWriter (SQLite) ve rollup'lar -> API uçları. Aşama başına alert/s, üretimden ingest'e gecikme
+yüzdelikleri, API yanıt süreleri ve tepe RSS JSON olarak yazılır; sonuçlar
+commit'ler arasında karşılaştırılabilir.
+
+    python -m benchmarks.pipeline_bench --alerts 500000 --output bench.json
+    python -m benchmarks.pipeline_bench --pcap traffic.pcap
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SNORT_CMD = "snort -q -r {pcap} -c {config} -A console -K none"
+API_ENDPOINTS = (
+    "/api/log_stats",
+    "/api/log_stats?window=300&group_by=dst",
+    "/api/top?field=src_ip&k=20",
+    "/api/incidents?draw=1&start=0&length=100&order[0][column]=2&order[0][dir]=desc",
+    "/api/logs?draw=1&start=0&length=100&order[0][dir]=desc",
+    "/api/logs?draw=1&start=0&length=100&search[value]=Priority: 1",
+)
+
+
+def percentiles(values):
+    if not values:
+        return None
+    values = sorted(values)
+    pick = lambda p: values[min(int(len(values) * p / 100), len(values) - 1)]
+    return {"count": len(values), "p50": pick(50), "p90": pick(90), "p99": pick(99), "max": values[-1],
+            "mean": sum(values) / len(values)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.realpath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+class LatencySink:
+    """Ingester sink'i: her sample'ıncı kaydın üretimden ingest'e gecikmesi (ms)."""
+
+    def __init__(self, sample=10):
+        self.sample = sample
+        self.latencies = []
+
+    def write(self, records, checkpoint):
+        now = time.time()
+        for r in records[::self.sample]:
+            if r.ts is not None:
+                self.latencies.append((now - r.ts) * 1000)
+
+    def tick(self):
+        pass
+
+
+def wait_for(condition, timeout, interval=0.02):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("pipeline did not drain in time")
+        time.sleep(interval)
+    return time.monotonic()
+
+
+def run(args):
+    from config import Config
+    work_dir = tempfile.mkdtemp(prefix="snort-bench-")
+    Config.SNORT_ALERT_MODE = "console"
+    Config.SNORT_LOG_DIR = work_dir
+    Config.SNORT_LOG_FILE = os.path.join(work_dir, "snort_alerts.log")
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+
+    from webapp import create_app
+    from webapp.alert_store import IncidentWriter
+    from snort_manager import controller
+    from snort_manager.capture import LogCapture
+    from snort_manager.correlate import get_correlator
+    from snort_manager.ingester import get_ingester
+    from snort_manager.line_index import get_line_index
+
+    app = create_app()
+    app.config["LOGIN_DISABLED"] = True
+    client = app.test_client()
+    ingester = get_ingester()
+    correlator = get_correlator()
+    writer = next(sink for sink in correlator.sinks if isinstance(sink, IncidentWriter))
+    latency = LatencySink()
+    ingester.add_sink(latency)
+
+    if args.pcap and shutil.which("snort"):
+        source = "snort"
+        command = args.snort_cmd.format(pcap=args.pcap, config=Config.SNORT_CONFIG_PATH)
+        process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE)
+    else:
+        source = "synthetic"
+        # --live: damga yazma anıdır, gecikme ölçümü bu damgaya göre yapılır
+        generator = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alert_gen.py")
+        process = subprocess.Popen([sys.executable, generator, "--format", "console", "--live",
+                                    "--lines", str(args.alerts)], stdout=subprocess.PIPE)
+
+    get_line_index().refresh()
+    capture = LogCapture(Config.SNORT_LOG_FILE, on_write=controller._on_capture_write)
+    started = time.monotonic()
+    capture.attach(process.stdout, "bench")
+    process.wait()
+    capture.join()
+    captured = time.monotonic()
+    expected = capture.lines_written
+    ingested = wait_for(lambda: ingester.alerts >= expected, args.timeout)
+    stored = wait_for(lambda: correlator.flushed >= expected, args.timeout)
+
+    api = {}
+    for endpoint in API_ENDPOINTS:
+        timings = []
+        for _ in range(args.api_requests):
+            t = time.perf_counter()
+            response = client.get(endpoint)
+            timings.append((time.perf_counter() - t) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"{endpoint} returned {response.status_code}")
+        api[endpoint] = percentiles(timings)
+
+    ingester.stop()
+    rate = lambda end: round(expected / (end - started), 1) if end > started else None
+    result = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "source": source,
+        "alerts": expected,
+        "stages": {
+            "capture": {"seconds": round(captured - started, 3), "alerts_per_sec": rate(captured),
+                        **capture.stats()},
+            "ingest": {"seconds": round(ingested - started, 3), "alerts_per_sec": rate(ingested),
+                       "latency_ms": percentiles(latency.latencies) if source == "synthetic" else None},
+            "storage": {"seconds": round(stored - started, 3), "alerts_per_sec": rate(stored),
+                        "rows_written": writer.written, "incidents": correlator.stats()},
+            "api_ms": api,
+        },
+        # Linux'ta ru_maxrss KiB cinsindendir; children en büyük alt süreçtir (Snort ya da üretici)
+        "peak_rss_kb": {
+            "pipeline": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        },
+    }
+    if not args.keep:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end Snort alert pipeline benchmark")
+    parser.add_argument("--alerts", type=int, default=200000, help="synthetic alert count")
+    parser.add_argument("--pcap", help="replay this pcap through snort -r instead of the synthetic generator")
+    parser.add_argument("--snort-cmd", default=DEFAULT_SNORT_CMD, help="snort command ({pcap}, {config})")
+    parser.add_argument("--api-requests", type=int, default=50, help="requests per API endpoint")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds to wait for each stage to drain")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary log/database directory")
+    args = parser.parse_args()
+    result = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(result + "\n")
+    else:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# snort_manager/profiler.py
+import os
+import re
+
+# Snort 2 profile_rules çıktısı her instance'ın log dizinine yazılır (append: her kapanışta yeni tablo)
+PROFILE_FILE = "rule_prof.txt"
+PROFILE_CONF = "snort_profile.conf"
+# Snort 3 profiler tabloyu kapanışta stdout'a basar
+SNORT3_PROFILER = "profiler = { rules = { show = true, count = 0, sort = 'total_time' } }"
+# Tablo başlığı: Snort 2 "Num SID GID Rev Checks ...", Snort 3 "# gid sid rev checks ..."
+HEADER_RE = re.compile(r"^\s*(Num|#)\s+(SID|gid)\s+(GID|sid)\s+rev\s+checks\s+matches\s+alerts\s+", re.I)
+ROW_RE = re.compile(r"^\s*\d+\s+\d+\s+\d+\s+\d+\s+\d+")
+COLUMNS = ("checks", "matches", "alerts", "microsecs")
+READ_LIMIT = 64 * 1024 * 1024
+
+
+def profile_config(config_path):
+    """Snort 2 için mevcut yapılandırmayı include eden ve rule profiling açan
+    bir sarmalayıcı yazar. Snort göreli include'ları ana yapılandırmanın
+    dizinine göre çözdüğü için dosya onun yanına konur."""
+    path = os.path.join(os.path.dirname(config_path), PROFILE_CONF)
+    with open(path, "w") as f:
+        f.write(f"include {config_path}\n")
+        f.write(f"config profile_rules: print all, sort total_ticks, filename {PROFILE_FILE} append\n")
+    return path
+
+
+def parse_profile(text):
+    """Metindeki tüm rule profile tablolarını (gid, sid) başına toplar.
+    Birden fazla instance ya da yeniden başlatma ayrı tablolar üretir."""
+    totals = {}
+    sid_first = None
+    for line in text.splitlines():
+        header = HEADER_RE.match(line)
+        if header:
+            sid_first = header.group(2).lower() == "sid"
+            continue
+        if sid_first is None:
+            continue
+        if not ROW_RE.match(line):
+            # Tablo sonu; ayraç satırları ("===") ve boş satırlar atlanır
+            if line.strip() and not set(line.strip()) <= {"=", " "}:
+                sid_first = None
+            continue
+        fields = line.split()
+        try:
+            first, second, rev = int(fields[1]), int(fields[2]), int(fields[3])
+            values = [int(float(v)) for v in fields[4:8]]
+        except (IndexError, ValueError):
+            continue
+        sid, gid = (first, second) if sid_first else (second, first)
+        row = totals.get((gid, sid))
+        if row is None:
+            row = totals[(gid, sid)] = {"gid": gid, "sid": sid, "rev": rev, **dict.fromkeys(COLUMNS, 0)}
+        for column, value in zip(COLUMNS, values):
+            row[column] += value
+    return totals
+
+
+def read_profile(sources):
+    """sources: {dosya yolu: profil oturumu başındaki boyut}. Oturum boyunca
+    eklenen tabloları okuyup birleştirir."""
+    totals = {}
+    for path, offset in sources.items():
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                # Dosya kesildiyse (logrotate) baştan oku
+                f.seek(offset if offset <= size else 0)
+                text = f.read(READ_LIMIT).decode("utf-8", errors="ignore")
+        except FileNotFoundError:
+            continue
+        for key, row in parse_profile(text).items():
+            if key in totals:
+                for column in COLUMNS:
+                    totals[key][column] += row[column]
+            else:
+                totals[key] = row
+    return totals
+
+
+def build_report(rows, store):
+    """Profil satırlarını (read_profile değerleri) kural metadatasıyla birleştirir.
+    Store'da olup hiç kontrol edilmeyen etkin kurallar da sıfır değerlerle eklenir."""
+    report = []
+    seen = set()
+    for row in rows:
+        gid, sid = row["gid"], row["sid"]
+        seen.add((gid, sid))
+        entry = store.by_sid.get((gid, sid))
+        checks, matches = row["checks"], row["matches"]
+        report.append({
+            **row,
+            "msg": entry.msg if entry else None,
+            "classtype": entry.classtype if entry else None,
+            "file": entry.file if entry else None,
+            "avg_check": round(row["microsecs"] / checks, 2) if checks else 0.0,
+            "avg_match": round(row["microsecs"] / matches, 2) if matches else 0.0,
+        })
+    for entry in store.entries():
+        if entry.enabled and (entry.gid, entry.sid) not in seen:
+            report.append({"gid": entry.gid, "sid": entry.sid, "rev": entry.rev,
+                           **dict.fromkeys(COLUMNS, 0), "msg": entry.msg, "classtype": entry.classtype,
+                           "file": entry.file, "avg_check": 0.0, "avg_match": 0.0})
+    return report
@@ -0,0 +1,259 @@
+# snort_manager/rollup.py
+import heapq
+import itertools
+import threading
+import time
+from .sketch import HyperLogLog, SpaceSaving
+
+# (bucket genişliği, saklama süresi) saniye cinsinden: 1s -> 1 saat, 1m -> 2 gün, 1h -> 35 gün
+LEVELS = ((1, 3600), (60, 2 * 86400), (3600, 35 * 86400))
+BUCKET_NAMES = {"1s": 1, "1m": 60, "1h": 3600}
+DIMENSIONS = ("priority", "sid", "src", "dst", "port")
+# Kardinalitesi sınırsız olabilen boyutlar: seviye bucket'larında kesin sayaç yerine
+# Space-Saving özeti ve HyperLogLog tutulur. Kapasite seviye başına; böylece tarama ya da
+# DDoS sırasında bellek en fazla (bucket sayısı x kapasite) kadar büyür.
+SKETCHED = ("sid", "src", "dst", "port")
+CAPACITY = {1: 32, 60: 256, 3600: 1024}
+# /api/top sorgusunda bucket'lar bu kapasitede bir özette birleştirilir
+TOP_CAPACITY = 4096
+TOP_FIELDS = {"priority": "priority", "sid": "sid", "src_ip": "src", "dst_ip": "dst",
+              "dst_port": "port", "src": "src", "dst": "dst", "port": "port"}
+# Otomatik bucket seçiminde grafikte olabilecek en fazla nokta sayısı
+MAX_POINTS = 1500
+PRUNE_INTERVAL = 60
+
+
+def check_window(window, bucket, max_points=MAX_POINTS):
+    """Açıkça seçilen bucket genişliği için pencere sınırı: seviyenin saklama süresi
+    ve (zaman serisi sorgularında) en fazla max_points nokta. Aşılırsa ValueError."""
+    retention = dict(LEVELS)[bucket]
+    if window > retention:
+        raise ValueError(f"window must be at most {retention}s for {bucket}s buckets")
+    if max_points and window / bucket > max_points:
+        raise ValueError(f"window must be at most {max_points * bucket}s for {bucket}s buckets")
+
+
+class Bucket:
+    """Tek bir zaman aralığının toplam sayısı ve boyut başına sayaçları.
+    capacity verilmezse (bekleyen saniyelik bucket) tüm sayaçlar kesin dict'tir."""
+
+    __slots__ = ("total", "counts", "distinct")
+
+    def __init__(self, capacity=None):
+        self.total = 0
+        if capacity is None:
+            self.counts = {dim: {} for dim in DIMENSIONS}
+            self.distinct = None
+        else:
+            self.counts = {dim: SpaceSaving(capacity) if dim in SKETCHED else {} for dim in DIMENSIONS}
+            self.distinct = {dim: HyperLogLog() for dim in SKETCHED}
+
+    def merge(self, other, distinct=None):
+        """Kesin sayaçlı bir bucket'ı ekler; distinct önceden hesaplanmış HLL'lerdir."""
+        self.total += other.total
+        for dim, counts in other.counts.items():
+            target = self.counts[dim]
+            if dim in SKETCHED:
+                target.update(counts)
+                continue
+            for key, n in counts.items():
+                target[key] = target.get(key, 0) + n
+        if distinct:
+            for dim, hll in distinct.items():
+                self.distinct[dim].merge(hll)
+
+
+def _combine(parts):
+    """Kesin sayaçlı bucket'ları tek bir kesin sayaçlı bucket'ta toplar."""
+    combined = Bucket()
+    for part in parts:
+        combined.total += part.total
+        for dim, counts in part.counts.items():
+            target = combined.counts[dim]
+            for key, n in counts.items():
+                target[key] = target.get(key, 0) + n
+    return combined
+
+
+class RollupEngine:
+    """Ingest sırasında alert'leri sabit zaman bucket'larında önceden toplar.
+
+    Gelen kayıtlar önce saniyelik bekleyen bucket'lara sayılır; tick() bunları
+    1s/1m/1h seviyelerine birleştirir ve saklama süresi dolanları siler. Böylece
+    kayıt başına maliyet sabit kalır, seviyeler arası birleştirme kayıt sayısıyla
+    değil farklı anahtar sayısıyla orantılıdır. Sorgular DB'ye hiç dokunmaz."""
+
+    def __init__(self, levels=LEVELS):
+        self.levels = {width: {} for width, _ in levels}
+        self.retention = dict(levels)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_prune = 0
+
+    def add_rows(self, rows, weighted=False):
+        """rows: (ts, priority, sid, src_ip, dst_ip, dst_port) demetleri. weighted ise
+        (demet, alert sayısı) çiftleri; ör. incident'lardan seed."""
+        now = time.time()
+        pairs = rows if weighted else zip(rows, itertools.repeat(1))
+        with self._lock:
+            pending = self._pending
+            for (ts, priority, sid, src, dst, port), n in pairs:
+                second = int(ts if ts is not None else now)
+                bucket = pending.get(second)
+                if bucket is None:
+                    bucket = pending[second] = Bucket()
+                bucket.total += n
+                counts = bucket.counts
+                for dim, key in (("priority", priority), ("sid", sid), ("src", src), ("dst", dst),
+                                 ("port", port)):
+                    if key is not None:
+                        c = counts[dim]
+                        c[key] = c.get(key, 0) + n
+
+    def write(self, records, checkpoint):
+        self.add_rows((r.ts, r.priority, r.sid, r.src_ip, r.dst_ip, r.dst_port) for r in records)
+
+    def tick(self):
+        self.flush()
+        if time.monotonic() - self._last_prune >= PRUNE_INTERVAL:
+            self.prune()
+
+    def flush(self):
+        """Bekleyen saniyelik bucket'ları tüm seviyelere birleştirir. Aynı seviye
+        bucket'ına düşen saniyeler (ör. toplu import ya da seed) önce kesin
+        sayaçlarla toplanır; HLL'ler saniye başına değil hedef bucket başına bir
+        kez hesaplanır."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            now = time.time()
+            for width, buckets in self.levels.items():
+                cutoff = now - self.retention[width]
+                groups = {}
+                for second, bucket in pending.items():
+                    if second >= cutoff:
+                        groups.setdefault(second - second % width, []).append(bucket)
+                for start, parts in groups.items():
+                    source = parts[0] if len(parts) == 1 else _combine(parts)
+                    distinct = {}
+                    for dim in SKETCHED:
+                        hll = distinct[dim] = HyperLogLog()
+                        hll.add_many(source.counts[dim])
+                    target = buckets.get(start)
+                    if target is None:
+                        target = buckets[start] = Bucket(CAPACITY.get(width, TOP_CAPACITY))
+                    target.merge(source, distinct)
+
+    def prune(self):
+        now = time.time()
+        with self._lock:
+            for width, buckets in self.levels.items():
+                cutoff = now - self.retention[width]
+                for start in [s for s in buckets if s + width <= cutoff]:
+                    del buckets[start]
+        self._last_prune = time.monotonic()
+
+    def pick_bucket(self, window):
+        """Pencereyi saklayan ve en fazla MAX_POINTS nokta veren en ince seviye."""
+        for width in sorted(self.levels):
+            if self.retention[width] >= window and window / width <= MAX_POINTS:
+                return width
+        return max(self.levels)
+
+    def _window(self, window, bucket, now):
+        width = bucket or self.pick_bucket(window)
+        # Saklama süresinden eski bucket'lar hiç veri tutmaz
+        window = min(window, self.retention[width])
+        now = int(now or time.time())
+        end = now - now % width
+        first = end - (max(int(window) // width, 1) - 1) * width
+        return width, list(range(first, end + 1, width))
+
+    @staticmethod
+    def _merge_counts(selected, dim):
+        """Seçili bucket'ların dim sayaçlarını tek bir dict ya da özet olarak birleştirir."""
+        if dim in SKETCHED:
+            merged = SpaceSaving(TOP_CAPACITY)
+            for b in selected:
+                if b:
+                    merged.merge(b.counts[dim])
+            return merged
+        merged = {}
+        for b in selected:
+            if b:
+                for key, n in b.counts[dim].items():
+                    merged[key] = merged.get(key, 0) + n
+        return merged
+
+    @staticmethod
+    def _distinct(selected, dim):
+        if dim not in SKETCHED:
+            return None
+        hll = HyperLogLog()
+        for b in selected:
+            if b:
+                hll.merge(b.distinct[dim])
+        return hll.count()
+
+    def query(self, window, bucket=None, group_by=None, limit=10, now=None):
+        """Son window saniyesi için bucket genişliğinde zaman serisi döner.
+
+        group_by verilirse en çok alert üreten limit grup ayrı seri olarak, kalanlar
+        "other" altında toplanır; labels/data tüm pencere boyunca grup toplamlarıdır."""
+        self.flush()
+        width, timestamps = self._window(window, bucket, now)
+        with self._lock:
+            buckets = self.levels[width]
+            selected = [buckets.get(t) for t in timestamps]
+            if group_by is None:
+                totals = [b.total if b else 0 for b in selected]
+                return {"bucket": width, "timestamps": timestamps, "series": {"total": totals},
+                        "labels": ["total"], "data": [sum(totals)]}
+            overall = self._merge_counts(selected, group_by)
+            distinct = self._distinct(selected, group_by)
+            top = [key for key, _ in heapq.nlargest(limit, overall.items(), key=lambda item: item[1])]
+            series = {key: [b.counts[group_by].get(key, 0) if b else 0 for b in selected] for key in top}
+            if len(overall) > len(top):
+                series["other"] = [max(sum(b.counts[group_by].values()) - sum(b.counts[group_by].get(k, 0) for k in top), 0)
+                                   if b else 0 for b in selected]
+        labels = [str(key) for key in top]
+        data = [overall.get(key) for key in top]
+        if "other" in series:
+            labels.append("other")
+            data.append(max(sum(overall.values()) - sum(data), 0))
+        result = {"bucket": width, "timestamps": timestamps,
+                  "series": {str(key): values for key, values in series.items()},
+                  "labels": labels, "data": data}
+        if distinct is not None:
+            result["distinct"] = distinct
+        return result
+
+    def top(self, dim, k=20, window=3600, bucket=None, now=None):
+        """Pencere boyunca dim için en sık k anahtar, toplam ve farklı anahtar sayısı.
+        Özetlenen boyutlarda sayılar üstten tahmindir; error en fazla fazlalıktır."""
+        self.flush()
+        width, timestamps = self._window(window, bucket, now)
+        with self._lock:
+            buckets = self.levels[width]
+            selected = [buckets.get(t) for t in timestamps]
+            merged = self._merge_counts(selected, dim)
+            distinct = self._distinct(selected, dim)
+            total = sum(b.total for b in selected if b)
+        if isinstance(merged, SpaceSaving):
+            items = merged.top(k)
+        else:
+            items = [(key, n, 0) for key, n in heapq.nlargest(k, merged.items(), key=lambda item: item[1])]
+        return {"bucket": width, "window": window, "total": total,
+                "distinct": distinct if distinct is not None else len(merged),
+                "top": [{"key": key, "count": n, "error": error} for key, n, error in items]}
+
+
+_rollups = None
+
+
+def get_rollups():
+    global _rollups
+    if _rollups is None:
+        _rollups = RollupEngine()
+    return _rollups
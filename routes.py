@@ -1,16 +1,33 @@
 # webapp/routes.py
 import os
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+import time
+from flask import (Blueprint, Response, render_template, request, redirect, url_for, flash, jsonify,
+                   stream_with_context)
 from flask_login import login_user, logout_user, login_required, current_user
+from sqlalchemy import func, or_
+from .cache import alert_watermark, cached, log_watermark, windowed
+from .export import FORMATS, export_batches, serialize
 from .extensions import db, login_manager
-from .models import User
-from .forms import LoginForm, RegisterForm, RuleForm
-from snort_manager.controller import start_snort, stop_snort, get_snort_status
-from snort_manager.installer import check_and_install_snort, configure_snort
+from .models import User, Incident
+from .forms import LoginForm, RegisterForm, RuleForm, RuleEditForm
+from snort_manager.backend import get_backend
+from snort_manager.classify import SEVERITIES
+from snort_manager.segments import get_alert_log
+from snort_manager.supervisor import parse_interfaces
+from snort_manager.profiler import build_report
+from snort_manager.rules import RuleSet
+from snort_manager.rule_store import get_rule_store
+from snort_manager.rollup import BUCKET_NAMES, DIMENSIONS, LEVELS, TOP_FIELDS, check_window
 from config import Config
 
 main_bp = Blueprint("main_bp", __name__)
 
+@main_bp.errorhandler(ConnectionError)
+def control_unavailable(e):
+    """Çok worker'lı sunumda kontrol daemon'u kapalıysa."""
+    print(f"Control daemon error: {e}")
+    return "Snort control daemon is not running", 503
+
 @main_bp.route("/")
 def home():
     if current_user.is_authenticated:
@@ -67,76 +84,404 @@ def load_user(user_id):
 @main_bp.route("/snort_control", methods=["GET", "POST"])
 @login_required
 def snort_control():
-    """Snort'un durumunu gösterir, başlat/durdur butonları vs."""
+    """Snort'un durumunu gösterir, başlat/durdur butonları vs. Kurulum ve başlatma
+    dakikalar sürebildiği için işlemler arka planda iş olarak çalışır."""
     if request.method == "POST":
         action = request.form.get("action")
         interface = request.form.get("interface", "lo")
         if action == "start":
-            check_and_install_snort()
-            configure_snort(Config.SNORT_CONFIG_PATH, Config.SNORT_RULES_PATH)
-            start_snort(interface)
-            flash(f"Snort started on interface {interface}", "success")
-        elif action == "stop":
-            stop_snort()
-            flash("Snort stopped", "info")
-        return redirect(url_for("main_bp.snort_control"))
+            try:
+                parse_interfaces(interface)
+            except ValueError as e:
+                flash(str(e), "danger")
+                return redirect(url_for("main_bp.snort_control"))
+        backend = get_backend()
+        try:
+            if action == "start":
+                profile = request.form.get("profile") == "1"
+                job = backend.submit(action="start", interface=interface, profile=profile)
+            elif action == "stop":
+                job = backend.submit(action="stop")
+            else:
+                return redirect(url_for("main_bp.snort_control"))
+        except ValueError as e:
+            flash(f"Another Snort operation is in progress: {e}", "warning")
+            return redirect(url_for("main_bp.snort_control"))
+        if request.accept_mimetypes.best == "application/json":
+            return jsonify(job), 202
+        flash(f"Snort {action} queued", "info")
+        return redirect(url_for("main_bp.snort_control", job=job["id"]))
     
-    status = get_snort_status()
-    return render_template("snort_control.html", status=status)
+    backend = get_backend()
+    job_id = request.args.get("job")
+    return render_template("snort_control.html", status=backend.snort_status(), instances=backend.instances(),
+                           capture=backend.capture_stats(), jobs=backend.jobs(limit=10),
+                           job=backend.job(job_id=job_id) if job_id else None)
+
+@main_bp.route("/api/jobs", methods=["GET"])
+@login_required
+def jobs_data():
+    """Son arka plan işleri, yeniden eskiye."""
+    limit = min(request.args.get("limit", 10, type=int), 100)
+    return jsonify(get_backend().jobs(limit=limit))
+
+@main_bp.route("/api/jobs/<job_id>", methods=["GET"])
+@login_required
+def job_status(job_id):
+    """Tek bir işin durumu ve adımları; arayüz bitene kadar bunu yoklar."""
+    job = get_backend().job(job_id=job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job)
 
 @main_bp.route("/logs")
 @login_required
 def show_logs():
-    """Snort loglarını oku, tablo şeklinde göster."""
-    if os.path.exists(Config.SNORT_LOG_FILE):
-        with open(Config.SNORT_LOG_FILE, "r") as f:
-            lines = f.read().splitlines()
-    else:
-        lines = ["No logs available."]
-    return render_template("logs.html", logs=lines)
+    """Incident'ları ve ham Snort loglarını tablo şeklinde göster; satırlar
+    /api/incidents ve /api/logs'tan sayfa sayfa gelir."""
+    return render_template("logs.html")
+
+@main_bp.route("/api/logs", methods=["GET"])
+@login_required
+def logs_data():
+    """
+    DataTables server-side processing endpoint'i. Satır offset indeksi sayesinde
+    istenen sayfaya doğrudan seek edilir; istek başına bellek log boyutundan bağımsızdır.
+    Döndürülüp sıkıştırılmış segmentler de aynı satır numaralandırmasında görünür.
+    """
+    draw = request.args.get("draw", 0, type=int)
+    start = max(request.args.get("start", 0, type=int), 0)
+    length = request.args.get("length", 100, type=int)
+    # length=-1 ("hepsi") desteklenmez, sayfa boyutu sınırlı tutulur
+    length = min(length, 1000) if length > 0 else 100
+    search = request.args.get("search[value]", "").strip()
+    reverse = request.args.get("order[0][dir]", "asc") == "desc"
+
+    total, filtered, rows = get_alert_log().page(start, length, search, reverse)
+    return jsonify({
+        "draw": draw,
+        "recordsTotal": total,
+        "recordsFiltered": filtered,
+        "data": [[lineno + 1, text] for lineno, text in rows],
+    })
+
+@main_bp.route("/api/incidents", methods=["GET"])
+@login_required
+def incidents_data():
+    """
+    Incident tablosu için DataTables server-side endpoint'i. Port taraması gibi
+    binlerce benzer alert tek satırda, sayısı ve ilk/son görülme zamanıyla gelir.
+    Arama mesajda, kaynak/hedef IP önekinde ve SID'de yapılır; severity
+    (danger/warning/safe) ingest sırasında atanmış index'li kolondan süzülür.
+    /api/logs gibi draw sayacını döndürdüğü için önbelleğe alınmaz.
+    """
+    columns = (Incident.last_seen, Incident.first_seen, Incident.count, Incident.sid, Incident.msg,
+               Incident.src_ip, Incident.dst_ip, Incident.priority)
+    draw = request.args.get("draw", 0, type=int)
+    start = max(request.args.get("start", 0, type=int), 0)
+    length = request.args.get("length", 100, type=int)
+    length = min(length, 1000) if length > 0 else 100
+    search = request.args.get("search[value]", "").strip()
+    order_column = request.args.get("order[0][column]", 0, type=int)
+    column = columns[order_column] if 0 <= order_column < len(columns) else Incident.last_seen
+    severity = request.args.get("severity")
+    if severity and severity not in SEVERITIES:
+        return jsonify({"error": f"severity must be one of {', '.join(SEVERITIES)}"}), 400
+
+    query = Incident.query
+    total = query.count()
+    if severity:
+        query = query.filter(Incident.severity == severity)
+    if search:
+        conditions = [Incident.msg.ilike(f"%{search}%"), Incident.src_ip.startswith(search),
+                      Incident.dst_ip.startswith(search)]
+        if search.isdigit():
+            conditions.append(Incident.sid == int(search))
+        query = query.filter(or_(*conditions))
+    filtered = query.count() if search or severity else total
+    column = column.desc() if request.args.get("order[0][dir]", "desc") == "desc" else column.asc()
+    rows = query.order_by(column, Incident.id.desc()).offset(start).limit(length).all()
+
+    def fmt(ts):
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) if ts else ""
+
+    return jsonify({
+        "draw": draw,
+        "recordsTotal": total,
+        "recordsFiltered": filtered,
+        "data": [[fmt(i.last_seen), fmt(i.first_seen), i.count, f"{i.gid}:{i.sid}:{i.rev}", i.msg,
+                  i.src_ip, f"{i.dst_ip}:{i.dst_port}" if i.dst_port is not None else i.dst_ip, i.priority,
+                  i.severity or "", "closed" if i.closed else "open"] for i in rows],
+    })
+
+@main_bp.route("/api/logs/seek", methods=["GET"])
+@login_required
+@cached(log_watermark)
+def logs_seek():
+    """Verilen zamandaki (epoch saniye) ilk log satırının numarasını döner."""
+    ts = request.args.get("ts", type=float)
+    if ts is None:
+        return jsonify({"error": "ts parameter is required"}), 400
+    log = get_alert_log()
+    log.refresh()
+    return jsonify({"line": log.seek_time(ts) + 1, "total": len(log)})
+
+@main_bp.route("/api/export", methods=["GET"])
+@login_required
+def export_data():
+    """
+    Incident'ların ya da ham alert'lerin toplu dışa aktarımı (csv, jsonl, parquet,
+    arrow). Süzgeçler: since/until (epoch), sid, priority, ip (kaynak ya da hedef),
+    severity. Sonuç bellekte toplanmaz; DB'den ya da döndürülmüş segmentler dahil
+    alert log'undan parça parça okunup chunked yanıt olarak akar.
+    """
+    fmt = request.args.get("format", "csv")
+    source = request.args.get("source", "incidents")
+    severity = request.args.get("severity") or None
+    if severity and severity not in SEVERITIES:
+        return jsonify({"error": f"severity must be one of {', '.join(SEVERITIES)}"}), 400
+    try:
+        columns, batches = export_batches(
+            source,
+            since=request.args.get("since", type=float),
+            until=request.args.get("until", type=float),
+            sid=request.args.get("sid", type=int),
+            priority=request.args.get("priority", type=int),
+            ip=request.args.get("ip") or None,
+            severity=severity,
+        )
+        body = serialize(fmt, columns, batches)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    mimetype, extension = FORMATS[fmt]
+    filename = f"snort-{source}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}"
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"',
+                             "X-Accel-Buffering": "no"})
 
-@main_bp.route("/rules", methods=["GET", "POST"])
+@main_bp.route("/rules")
 @login_required
 def manage_rules():
+    """rules dizinindeki tüm kural dosyalarında sayfalı arama; kurallar tek tek düzenlenir."""
+    return render_template("rules.html", classtypes=get_rule_store().classtypes(), reload=get_backend().reload_status())
+
+@main_bp.route("/api/rules", methods=["GET"])
+@login_required
+def rules_data():
+    """Kural tarayıcısı için DataTables server-side endpoint'i."""
+    columns = ("sid", "msg", "classtype", "file")
+    draw = request.args.get("draw", 0, type=int)
+    start = max(request.args.get("start", 0, type=int), 0)
+    length = request.args.get("length", 50, type=int)
+    length = min(length, 500) if length > 0 else 50
+    order_column = request.args.get("order[0][column]", 0, type=int)
+    enabled = request.args.get("enabled", "")
+    total, filtered, rows = get_rule_store().search(
+        request.args.get("search[value]", ""),
+        enabled={"1": True, "0": False}.get(enabled),
+        classtype=request.args.get("classtype") or None,
+        offset=start,
+        limit=length,
+        sort=columns[order_column] if 0 <= order_column < len(columns) else "sid",
+        reverse=request.args.get("order[0][dir]", "asc") == "desc",
+    )
+    return jsonify({
+        "draw": draw,
+        "recordsTotal": total,
+        "recordsFiltered": filtered,
+        "data": [{"gid": e.gid, "sid": e.sid, "msg": e.msg, "classtype": e.classtype,
+                  "file": f"{e.file}:{e.line}", "enabled": e.enabled} for e in rows],
+    })
+
+@main_bp.route("/rules/<int:gid>/<int:sid>", methods=["GET", "POST"])
+@login_required
+def edit_rule(gid, sid):
+    """Tek bir kuralı düzenler; dosyada sadece o kuralın satırı değişir."""
+    store = get_rule_store()
+    entry, text = store.get(gid, sid)
+    if entry is None:
+        flash(f"Rule {gid}:{sid} not found", "danger")
+        return redirect(url_for("main_bp.manage_rules"))
+    form = RuleEditForm()
+    if form.validate_on_submit():
+        try:
+            updated = store.update(gid, sid, form.rule.data, form.enabled.data)
+        except ValueError as e:
+            flash(f"Invalid rule: {e}", "danger")
+            return render_template("rule_edit.html", form=form, entry=entry)
+        flash(_rules_changed(f"edited {updated.gid}:{updated.sid}"), "success")
+        return redirect(url_for("main_bp.manage_rules"))
+    if request.method == "GET":
+        form.rule.data = text.lstrip("#").strip()
+        form.enabled.data = entry.enabled
+    return render_template("rule_edit.html", form=form, entry=entry)
+
+@main_bp.route("/rules/<int:gid>/<int:sid>/toggle", methods=["POST"])
+@login_required
+def toggle_rule(gid, sid):
+    """Kuralı etkinleştirir / devre dışı bırakır (satırın başına "# " ekler ya da kaldırır)."""
+    store = get_rule_store()
+    entry, _ = store.get(gid, sid)
+    if entry is None:
+        return jsonify({"error": f"Rule {gid}:{sid} not found"}), 404
+    try:
+        updated = store.update(gid, sid, enabled=not entry.enabled)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    message = _rules_changed(f"{'enabled' if updated.enabled else 'disabled'} {gid}:{sid}")
+    return jsonify({"sid": sid, "enabled": updated.enabled, "message": message})
+
+@main_bp.route("/rules/profile")
+@login_required
+def rule_profile():
+    """Kural maliyet raporu: en pahalı ve hiç tetiklenmeyen kurallar."""
+    backend = get_backend()
+    session = backend.profile_session()
+    started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(session["started"])) if session else None
+    return render_template("rule_profile.html", session=session, started=started,
+                           status=backend.snort_status())
+
+@main_bp.route("/api/rules/profile", methods=["GET"])
+@login_required
+def rule_profile_data():
+    """Son profil oturumunun sid başına checks/matches/alerts/mikrosaniye değerleri,
+    kural metadatasıyla birleştirilmiş olarak."""
+    rows = get_backend().rule_profile()
+    if rows is None:
+        return jsonify({"data": []})
+    return jsonify({"data": build_report(rows, get_rule_store())})
+
+def _rules_changed(summary):
+    """Tek kural değişikliğinden sonra perf olayı işaretler ve Snort'u canlı yükletir."""
+    backend = get_backend()
+    backend.mark(label=f"Rules updated ({summary})")
+    if backend.reload_rules(summary=summary):
+        return f"Rule saved ({summary}), live reload started"
+    return f"Rule saved ({summary})"
+
+@main_bp.route("/rules/local", methods=["GET", "POST"])
+@login_required
+def edit_local_rules():
+    """local.rules dosyasının tamamını düzenleme (küçük, elle yazılan kurallar için)."""
     form = RuleForm()
     if request.method == "POST":
         if form.validate_on_submit():
-            with open(Config.SNORT_RULES_PATH, "w") as f:
+            # Kaydetmeden önce doğrula; hatalı kural Snort'un reload'unu da düşürür
+            new = RuleSet(form.rules.data)
+            if not new.valid:
+                for line, error in new.errors[:10]:
+                    flash(f"Line {line}: {error}", "danger")
+                return render_template("rules_local.html", form=form, reload=get_backend().reload_status())
+            old_text = ""
+            if os.path.exists(Config.SNORT_RULES_PATH):
+                with open(Config.SNORT_RULES_PATH, "r") as f:
+                    old_text = f.read()
+            changes = new.diff(RuleSet(old_text))
+            summary = f"+{len(changes['added'])} -{len(changes['removed'])} ~{len(changes['modified'])}"
+            tmp_path = Config.SNORT_RULES_PATH + ".tmp"
+            with open(tmp_path, "w") as f:
                 f.write(form.rules.data)
-            flash("Rules updated successfully", "success")
-            return redirect(url_for("main_bp.manage_rules"))
+            os.replace(tmp_path, Config.SNORT_RULES_PATH)
+            # Drop/alert değişimlerini kural güncellemeleriyle ilişkilendirebilmek için
+            backend = get_backend()
+            backend.mark(label=f"Rules updated ({summary})")
+            if any(changes.values()) and backend.reload_rules(summary=summary):
+                flash(f"Rules updated ({summary}), live reload started", "success")
+            else:
+                flash(f"Rules updated successfully ({summary})", "success")
+            return redirect(url_for("main_bp.edit_local_rules"))
     else:
         # Mevcut rules dosyasını form alanına doldur
         if os.path.exists(Config.SNORT_RULES_PATH):
             with open(Config.SNORT_RULES_PATH, "r") as f:
                 form.rules.data = f.read()
-    return render_template("rules.html", form=form)
+    return render_template("rules_local.html", form=form, reload=get_backend().reload_status())
+
+def _stats_watermark():
+    # Rollup sorguları zaman penceresine bağlı; DB toplamları sadece yeni alert'le değişir
+    if request.args.get("window") or request.args.get("bucket") or request.args.get("group_by"):
+        return windowed(alert_watermark)()
+    return alert_watermark()
 
 @main_bp.route("/api/log_stats", methods=["GET"])
 @login_required
+@cached(_stats_watermark)
 def log_stats():
     """
-    Örnek bir endpoint: log verisini parse edip JSON dönelim.
+    Hedef IP başına alert sayıları. Incident tablosundaki dst_ip index'i üzerinden
+    incident sayaçları toplanır, log dosyası okunmaz.
     Front-end (chart.js) bunu alıp grafik olarak gösterebilir.
+
+    window (saniye), bucket (1s/1m/1h) ya da group_by (priority/sid/src/dst/port)
+    verilirse cevap tamamen bellekteki rollup'lardan zaman serisi olarak gelir.
     """
-    if not os.path.exists(Config.SNORT_LOG_FILE):
-        return jsonify({"labels": [], "data": []})
-    
-    # Basit bir örnek: hangi IP adresine karşı kaç kere alert üretilmiş gibi bir mantık kuralım.
-    ip_count = {}
-    with open(Config.SNORT_LOG_FILE, "r") as f:
-        for line in f:
-            # Örnek: "[**] [1:1000001:0] ... -> 192.168.1.10"
-            # Basit bir parse (Gerçek log formatına göre uyarlayın)
-            if "->" in line:
-                parts = line.split("->")
-                if len(parts) == 2:
-                    dst_part = parts[1].strip()
-                    # IP'yi ayıklamaya çalışalım (çok basit parse)
-                    ip = dst_part.split(":")[0]
-                    ip_count[ip] = ip_count.get(ip, 0) + 1
+    window = request.args.get("window", type=int)
+    bucket = request.args.get("bucket")
+    group_by = request.args.get("group_by")
+    if window or bucket or group_by:
+        if bucket and bucket not in BUCKET_NAMES:
+            return jsonify({"error": f"bucket must be one of {', '.join(BUCKET_NAMES)}"}), 400
+        if group_by and group_by not in DIMENSIONS:
+            return jsonify({"error": f"group_by must be one of {', '.join(DIMENSIONS)}"}), 400
+        window = min(max(window or 3600, 1), max(retention for _, retention in LEVELS))
+        if bucket:
+            try:
+                check_window(window, BUCKET_NAMES[bucket])
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        limit = min(max(request.args.get("limit", 10, type=int), 1), 100)
+        return jsonify(get_backend().rollup_query(window=window, bucket=BUCKET_NAMES.get(bucket),
+                                                  group_by=group_by or None, limit=limit))
 
+    # Tarama/DDoS sırasında milyonlarca farklı IP olabilir: sadece en çok alert alanlar
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+    total = func.sum(Incident.count)
+    rows = (db.session.query(Incident.dst_ip, total)
+            .filter(Incident.dst_ip.isnot(None))
+            .group_by(Incident.dst_ip)
+            .order_by(total.desc())
+            .limit(limit)
+            .all())
     # Chart.js’e uygun format: labels[], data[]
-    labels = list(ip_count.keys())
-    data = list(ip_count.values())
+    labels = [ip for ip, _ in rows]
+    data = [count for _, count in rows]
     return jsonify({"labels": labels, "data": data})
+
+@main_bp.route("/api/top", methods=["GET"])
+@login_required
+@cached(windowed(alert_watermark))
+def top_stats():
+    """Bir alan (src_ip/dst_ip/sid/dst_port/priority) için pencere içindeki en sık
+    k değer ve yaklaşık farklı değer sayısı; sabit bellekli sketch'lerden hesaplanır."""
+    field = request.args.get("field", "dst_ip")
+    if field not in TOP_FIELDS:
+        return jsonify({"error": f"field must be one of {', '.join(TOP_FIELDS)}"}), 400
+    bucket = request.args.get("bucket")
+    if bucket and bucket not in BUCKET_NAMES:
+        return jsonify({"error": f"bucket must be one of {', '.join(BUCKET_NAMES)}"}), 400
+    k = min(max(request.args.get("k", 20, type=int), 1), 1000)
+    window = min(max(request.args.get("window", 3600, type=int), 1), max(retention for _, retention in LEVELS))
+    if bucket:
+        try:
+            # Özet k anahtar döner, nokta sayısı sınırı gerekmez
+            check_window(window, BUCKET_NAMES[bucket], max_points=None)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    result = get_backend().rollup_top(dim=TOP_FIELDS[field], k=k, window=window, bucket=BUCKET_NAMES.get(bucket))
+    result["field"] = field
+    return jsonify(result)
+
+@main_bp.route("/api/stream", methods=["GET"])
+@login_required
+def alert_stream():
+    """Server-Sent Events: saniyede bir birleştirilmiş alert deltaları. Tüm
+    bağlantılar ingest hattındaki tek yayıncıdan beslenir, dosya/DB okunmaz."""
+    return Response(stream_with_context(get_backend().stream()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@main_bp.route("/api/perf", methods=["GET"])
+@login_required
+def perf_stats():
+    """Instance başına paket/drop/alert/CPU zaman serisi ve olay işaretleri."""
+    window = request.args.get("window", 3600, type=int)
+    return jsonify(get_backend().perf_series(since=time.time() - window))
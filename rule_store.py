@@ -0,0 +1,218 @@
+# snort_manager/rule_store.py
+import bisect
+import os
+import threading
+from collections import namedtuple
+from config import Config
+from .rules import parse_rule
+
+RuleEntry = namedtuple("RuleEntry", ["file", "start", "end", "line", "gid", "sid", "rev",
+                                     "msg", "classtype", "enabled", "action"])
+SORT_KEYS = {
+    "sid": lambda e: (e.sid, e.gid),
+    "msg": lambda e: (e.msg or "").lower(),
+    "classtype": lambda e: e.classtype or "",
+    "file": lambda e: (e.file, e.start),
+}
+
+
+def _iter_regions(data):
+    """(başlangıç byte'ı, bitiş byte'ı, satır no, metin) üretir; "\\" ile devam
+    eden satırlar tek kural olarak birleştirilir."""
+    position = 0
+    start = number = None
+    parts = []
+    for lineno, raw in enumerate(data.splitlines(keepends=True), 1):
+        if start is None:
+            start, number = position, lineno
+        position += len(raw)
+        line = raw.rstrip(b"\r\n")
+        if line.endswith(b"\\"):
+            parts.append(line[:-1].strip())
+            continue
+        parts.append(line.strip() if parts else line)
+        yield start, position, number, b" ".join(parts).decode("utf-8", errors="ignore")
+        start, parts = None, []
+    if parts:
+        yield start, position, number, b" ".join(parts).decode("utf-8", errors="ignore")
+
+
+class RuleStore:
+    """rules dizinindeki tüm *.rules dosyalarını sid, msg, classtype ve etkinlik
+    durumuna göre indeksler. Dosya içeriği bellekte tutulmaz; her kural için
+    sadece byte aralığı saklanır. Bir kural düzenlenince yalnız o aralık
+    değiştirilir ve aynı dosyadaki sonraki kayıtların offset'leri kaydırılır,
+    dosyanın geri kalanı yeniden ayrıştırılmaz.
+
+    Ayrıştırma rules.parse_rule'un içerik cache'ini kullanır; refresh() sadece
+    mtime/boyutu değişen dosyaları yeniden okur."""
+
+    def __init__(self, rules_dir):
+        self.rules_dir = rules_dir
+        # dosya adı -> (mtime_ns, boyut, [RuleEntry, ...] offset sırasıyla)
+        self.files = {}
+        self.by_sid = {}
+        self._lock = threading.RLock()
+
+    def refresh(self):
+        with self._lock:
+            try:
+                names = sorted(n for n in os.listdir(self.rules_dir) if n.endswith(".rules"))
+            except FileNotFoundError:
+                names = []
+            for name in set(self.files) - set(names):
+                self._drop(name)
+            for name in names:
+                st = os.stat(os.path.join(self.rules_dir, name))
+                indexed = self.files.get(name)
+                if indexed is None or indexed[:2] != (st.st_mtime_ns, st.st_size):
+                    self._index(name)
+
+    def _drop(self, name):
+        for entry in self.files.pop(name)[2]:
+            if self.by_sid.get((entry.gid, entry.sid)) is entry:
+                del self.by_sid[(entry.gid, entry.sid)]
+
+    def _index(self, name):
+        if name in self.files:
+            self._drop(name)
+        path = os.path.join(self.rules_dir, name)
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+        entries = []
+        for start, end, number, text in _iter_regions(data):
+            entry = self._entry(name, start, end, number, text)
+            if entry is None:
+                continue
+            entries.append(entry)
+            # Aynı sid'in etkin kopyası devre dışı olanın önüne geçer
+            key = (entry.gid, entry.sid)
+            previous = self.by_sid.get(key)
+            if previous is None or (entry.enabled and not previous.enabled):
+                self.by_sid[key] = entry
+        self.files[name] = (st.st_mtime_ns, st.st_size, entries)
+
+    @staticmethod
+    def _entry(name, start, end, number, text):
+        rule = parse_rule(text)
+        if rule is None or rule.sid is None:
+            return None
+        return RuleEntry(name, start, end, number, rule.gid, rule.sid, rule.rev,
+                         rule.msg, rule.classtype, rule.enabled, rule.action)
+
+    def entries(self):
+        for _, _, entries in self.files.values():
+            yield from entries
+
+    def classtypes(self):
+        with self._lock:
+            return sorted({e.classtype for e in self.entries() if e.classtype})
+
+    def search(self, query="", enabled=None, classtype=None, offset=0, limit=50, sort="sid", reverse=False):
+        """(toplam, eşleşen, sayfa) döner. query sayıysa sid, değilse msg içinde aranır."""
+        query = query.strip().lower()
+        with self._lock:
+            entries = list(self.entries())
+            total = len(entries)
+            if query.isdigit():
+                entries = [e for e in entries if str(e.sid).startswith(query)]
+            elif query:
+                entries = [e for e in entries if query in (e.msg or "").lower()]
+            if enabled is not None:
+                entries = [e for e in entries if e.enabled == enabled]
+            if classtype:
+                entries = [e for e in entries if e.classtype == classtype]
+        entries.sort(key=SORT_KEYS.get(sort, SORT_KEYS["sid"]), reverse=reverse)
+        return total, len(entries), entries[offset:offset + limit]
+
+    def get(self, gid, sid):
+        """(RuleEntry, kural metni) ya da (None, None)."""
+        with self._lock:
+            entry = self.by_sid.get((gid, sid))
+            if entry is None:
+                return None, None
+            entry = self._fresh(entry)
+            with open(os.path.join(self.rules_dir, entry.file), "rb") as f:
+                f.seek(entry.start)
+                raw = f.read(entry.end - entry.start)
+        return entry, next(_iter_regions(raw))[3]
+
+    def _fresh(self, entry):
+        """Dosya dışarıdan değiştiyse yeniden indeksleyip güncel kaydı döner."""
+        path = os.path.join(self.rules_dir, entry.file)
+        st = os.stat(path)
+        if self.files[entry.file][:2] != (st.st_mtime_ns, st.st_size):
+            self._index(entry.file)
+            entry = self.by_sid.get((entry.gid, entry.sid))
+            if entry is None:
+                raise ValueError("Rule was removed from disk")
+        return entry
+
+    def update(self, gid, sid, text=None, enabled=None):
+        """Bir kuralın metnini ve/veya etkinlik durumunu değiştirir. Yeni metin
+        doğrulanır; sid değişiyorsa başka bir kuralla çakışmamalıdır. Geçersiz
+        kuralda ValueError."""
+        with self._lock:
+            entry, current = self.get(gid, sid)
+            if entry is None:
+                raise ValueError(f"Rule {gid}:{sid} not found")
+            # Çok satırlı girdi tek satıra indirilir; tırnak içindeki boşluklara dokunulmaz
+            text = " ".join(part.strip().rstrip("\\").strip()
+                            for part in (text if text is not None else current).splitlines() if part.strip())
+            if enabled is None:
+                enabled = not text.startswith("#")
+            text = text.lstrip("#").strip()
+            rule = parse_rule(text)
+            if rule is None:
+                raise ValueError("Not a rule")
+            if rule.errors:
+                raise ValueError("; ".join(rule.errors))
+            key = (rule.gid, rule.sid)
+            if key != (gid, sid) and key in self.by_sid:
+                raise ValueError(f"sid {rule.gid}:{rule.sid} already exists in {self.by_sid[key].file}")
+            line = (text if enabled else f"# {text}") + "\n"
+            self._splice(entry, line)
+            return self.by_sid[key]
+
+    def _splice(self, entry, line):
+        path = os.path.join(self.rules_dir, entry.file)
+        with open(path, "rb") as f:
+            data = f.read()
+        new = line.encode("utf-8")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data[:entry.start])
+            f.write(new)
+            f.write(data[entry.end:])
+        os.replace(tmp_path, path)
+        st = os.stat(path)
+
+        # Sonraki kayıtları kaydır, düzenlenen kaydı yenisiyle değiştir
+        delta = len(new) - (entry.end - entry.start)
+        line_delta = 1 - (data.count(b"\n", entry.start, entry.end) or 1)
+        _, _, entries = self.files[entry.file]
+        i = bisect.bisect_left([e.start for e in entries], entry.start)
+        replacement = self._entry(entry.file, entry.start, entry.start + len(new), entry.line, line)
+        for j in range(i + 1, len(entries)):
+            e = entries[j]
+            moved = e._replace(start=e.start + delta, end=e.end + delta, line=e.line + line_delta)
+            entries[j] = moved
+            if self.by_sid.get((e.gid, e.sid)) is e:
+                self.by_sid[(e.gid, e.sid)] = moved
+        if self.by_sid.get((entry.gid, entry.sid)) is entry:
+            del self.by_sid[(entry.gid, entry.sid)]
+        entries[i] = replacement
+        self.by_sid[(replacement.gid, replacement.sid)] = replacement
+        self.files[entry.file] = (st.st_mtime_ns, st.st_size, entries)
+
+
+_store = None
+
+
+def get_rule_store():
+    global _store
+    if _store is None:
+        _store = RuleStore(Config.SNORT_RULES_DIR)
+    _store.refresh()
+    return _store
@@ -0,0 +1,179 @@
+# snort_manager/rules.py
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+ACTIONS = {"alert", "log", "pass", "drop", "reject", "sdrop", "block", "rewrite"}
+PROTOCOLS = {"ip", "tcp", "udp", "icmp"}
+# Snort 3 servis kuralları: "alert http ( ... )" gibi kısa başlık
+SERVICES = {"http", "http2", "ssl", "dns", "ftp", "smtp", "pop3", "imap", "ssh", "sip",
+            "dce_smb", "dce_tcp", "modbus", "dnp3", "file", "telnet", "netbios-ssn"}
+DIRECTIONS = {"->", "<>"}
+# "anahtar" ya da "anahtar: değer;" — değerde tırnaklı kısımlar ve \; kaçışları olabilir
+OPTION_RE = re.compile(r'\s*([\w.\-]+)\s*(?::\s*((?:[^;"\\]|\\.|"(?:[^"\\]|\\.)*")*?))?\s*;')
+INT_OPTIONS = {"sid", "gid", "rev", "priority"}
+# Snort 2'de content'e bağlı ayrı seçenekler (Snort 3'te content değerinin içindedir)
+CONTENT_MODIFIERS = {"nocase", "rawbytes", "depth", "offset", "distance", "within", "fast_pattern"}
+POSITION_RE = re.compile(r"^-?\d+$|^[A-Za-z_]\w*$")
+
+Rule = namedtuple("Rule", ["action", "proto", "header", "options", "gid", "sid", "rev",
+                           "msg", "classtype", "priority", "enabled", "text", "errors"])
+
+
+def _unquote(value):
+    if value and len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+@lru_cache(maxsize=131072)
+def parse_rule(text):
+    """Tek bir kural satırını ayrıştırır ve doğrular. "#" ile başlayan kural
+    devre dışıdır. Kural değilse (yorum, boş satır) None döner.
+
+    Sonuç içerikle anahtarlanan LRU cache'te tutulur; yeniden yüklemede yalnızca
+    değişen satırlar tekrar ayrıştırılır."""
+    stripped = text.strip()
+    enabled = not stripped.startswith("#")
+    if not enabled:
+        stripped = stripped.lstrip("#").strip()
+        if stripped.split(" ", 1)[0] not in ACTIONS or "(" not in stripped:
+            return None
+    if not stripped:
+        return None
+    errors = []
+    head, paren, body = stripped.partition("(")
+    tokens = head.split()
+    if not paren or not body.rstrip().endswith(")"):
+        errors.append("missing option block '( ... )'")
+    body = body.rstrip()[:-1]
+    action = tokens[0] if tokens else ""
+    proto = tokens[1] if len(tokens) > 1 else ""
+    if action not in ACTIONS:
+        errors.append(f"unknown action '{action}'")
+    if len(tokens) == 7:
+        if proto not in PROTOCOLS and proto not in SERVICES:
+            errors.append(f"unknown protocol '{proto}'")
+        if tokens[4] not in DIRECTIONS:
+            errors.append(f"invalid direction '{tokens[4]}'")
+    elif len(tokens) == 2:
+        if proto not in SERVICES and proto not in PROTOCOLS:
+            errors.append(f"unknown service '{proto}'")
+    elif len(tokens) != 1:
+        errors.append("header must be 'action proto src sport dir dst dport'")
+
+    options = []
+    position = 0
+    for m in OPTION_RE.finditer(body):
+        if m.start() != position:
+            break
+        options.append((m.group(1), m.group(2)))
+        position = m.end()
+    if body[position:].strip():
+        errors.append(f"cannot parse options near '{body[position:position + 30].strip()}'")
+
+    values = {}
+    seen_content = False
+    for key, value in options:
+        values.setdefault(key, value)
+        if key in INT_OPTIONS:
+            if value is None or not value.strip().isdigit():
+                errors.append(f"{key} must be a positive integer")
+                continue
+        elif key in ("content", "uricontent"):
+            if value is None or not value.lstrip("!").lstrip().startswith('"'):
+                errors.append(f"{key} requires a quoted value")
+            seen_content = True
+        elif key == "pcre":
+            if value is None or not _unquote(value.lstrip("!").strip()).startswith(("/", "m")):
+                errors.append("pcre requires a quoted /regex/")
+        elif key == "msg":
+            if value is None or not (value.startswith('"') and value.endswith('"')):
+                errors.append("msg must be a quoted string")
+        elif key in CONTENT_MODIFIERS:
+            if not seen_content:
+                errors.append(f"{key} must follow a content option")
+            if key in ("depth", "offset", "distance", "within") and not POSITION_RE.match(value or ""):
+                errors.append(f"{key} requires a number")
+
+    sid = values.get("sid") or ""
+    sid = int(sid) if sid.strip().isdigit() else None
+    if sid is None and "sid" not in values:
+        errors.append("missing sid")
+    elif sid == 0:
+        errors.append("sid must be a positive integer")
+    rev = (values.get("rev") or "").strip()
+    priority = (values.get("priority") or "").strip()
+    gid = (values.get("gid") or "").strip()
+    return Rule(
+        action=action,
+        proto=proto,
+        header=head.strip(),
+        options=tuple(options),
+        gid=int(gid) if gid.isdigit() else 1,
+        sid=sid,
+        rev=int(rev) if rev.isdigit() else None,
+        msg=_unquote(values.get("msg")),
+        classtype=values.get("classtype"),
+        priority=int(priority) if priority.isdigit() else None,
+        enabled=enabled,
+        text=stripped,
+        errors=tuple(errors),
+    )
+
+
+def iter_rule_lines(text):
+    """(satır no, mantıksal satır) üretir; "\\" ile biten satırlar birleştirilir."""
+    buffer, start = [], None
+    for number, line in enumerate(text.splitlines(), 1):
+        if start is None:
+            start = number
+        if line.endswith("\\"):
+            buffer.append(line[:-1])
+            continue
+        buffer.append(line)
+        yield start, " ".join(part.strip() for part in buffer) if len(buffer) > 1 else buffer[0]
+        buffer, start = [], None
+    if buffer:
+        yield start, " ".join(part.strip() for part in buffer)
+
+
+class RuleSet:
+    """Bir kural metninin ayrıştırılmış hali: kurallar, (gid, sid) indeksi ve hatalar."""
+
+    def __init__(self, text):
+        self.rules = []
+        self.by_sid = {}
+        self.errors = []
+        for number, line in iter_rule_lines(text):
+            rule = parse_rule(line)
+            # Devre dışı kuralları Snort okumaz; hataları kaydetmeyi engellemez
+            if rule is None or (rule.errors and not rule.enabled):
+                continue
+            for error in rule.errors:
+                self.errors.append((number, error))
+            if rule.sid is None:
+                continue
+            key = (rule.gid, rule.sid)
+            previous = self.by_sid.get(key)
+            if previous is not None:
+                if previous.enabled and rule.enabled:
+                    self.errors.append((number, f"duplicate sid {rule.gid}:{rule.sid}"))
+                if previous.enabled or not rule.enabled:
+                    continue
+                self.rules.remove(previous)
+            self.rules.append(rule)
+            self.by_sid[key] = rule
+
+    @property
+    def valid(self):
+        return not self.errors
+
+    def diff(self, old):
+        """old'a göre eklenen / silinen / değişen kuralların (gid, sid) listeleri.
+        Sadece etkinleştirme durumu değişen kurallar da "modified" sayılır."""
+        added = [key for key in self.by_sid if key not in old.by_sid]
+        removed = [key for key in old.by_sid if key not in self.by_sid]
+        modified = [key for key, rule in self.by_sid.items()
+                    if key in old.by_sid and (old.by_sid[key].text, old.by_sid[key].enabled) != (rule.text, rule.enabled)]
+        return {"added": added, "removed": removed, "modified": modified}
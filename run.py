@@ -1,7 +1,11 @@
 # run.py
+import os
 from webapp import create_app
 
 app = create_app()
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # Geliştirme sunucusu; üretimde gunicorn -c gunicorn.conf.py wsgi:app.
+    # Debug reloader uygulamayı ikinci bir süreçte yeniden başlatır, ingest
+    # hattı ve Snort iki kez çalışmasın diye reloader kapalı
+    app.run(host="0.0.0.0", port=5000, debug=os.environ.get("FLASK_DEBUG") == "1", use_reloader=False)
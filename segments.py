@@ -0,0 +1,445 @@
+# snort_manager/segments.py
+import bisect
+import glob
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+from .line_index import BLOCK_LINES, HEAD_BYTES, RECORD, LineIndex, get_line_index
+from .parser import line_timestamp
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MANIFEST_SUFFIX = ".manifest.json"
+BLOCK_SUFFIX = ".blk"
+# Döndürülmüş, henüz sıkıştırılmamış segment: "<log>.20260102-030405"
+RAW_SEGMENT_RE = re.compile(r"\.\d{8}-\d{6}(?:-\d+)?$")
+READ_CHUNK = 1024 * 1024
+# Okuyucu tarafında açılmış blok önbelleği (blok başına BLOCK_LINES satır)
+CACHED_BLOCKS = 16
+
+
+def _codec(name):
+    """(dosya soneki, sıkıştır, aç). zstandard kurulu değilse zstd yerine gzip.
+    "none": henüz sıkıştırılmamış ham segment."""
+    if name == "none":
+        # Ham segmentin son satırı yarım kalmış olabilir
+        return "", bytes, lambda data: data if data.endswith(b"\n") else data + b"\n"
+    if name == "zstd" and zstandard is not None:
+        return ".zst", zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress
+    if name == "zstd":
+        raise ValueError("zstandard is not installed")
+    return ".gz", lambda data: gzip.compress(data, 6, mtime=0), gzip.decompress
+
+
+def _head_timestamp(path):
+    try:
+        with open(path, "rb") as f:
+            return line_timestamp(f.read(HEAD_BYTES))
+    except OSError:
+        return None
+
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(path):
+    try:
+        with open(path + MANIFEST_SUFFIX) as f:
+            return json.load(f)["segments"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+class SegmentManager:
+    """Yazıcı tarafı: aktif log dosyasını boyut/yaş eşiğinde döndürür, kapanan
+    segmenti arka planda sıkıştırır ve zaman aralığını manifest'e yazar.
+
+    Segmentler BLOCK_LINES satırlık bağımsız bloklar halinde sıkıştırılır
+    (ardışık gzip üyeleri / zstd frame'leri; zcat/zstdcat ile okunabilir).
+    "<segment>.blk" her bloğun sıkıştırılmış offset'ini ve ilk zaman damgasını
+    tutar, böylece okuyucular segmentin tamamını açmadan sayfa okuyabilir.
+
+    Döndürme rename ile yapılır: ingester açık dosyayı sonuna kadar okuyup
+    inode değişimini görünce yeni dosyaya geçer. Ham segment hemen manifest'e
+    "none" codec'iyle eklenir, sıkıştırma bitince kaydı sıkıştırılmışıyla değişir;
+    satırlar arada okuyuculardan kaybolmaz."""
+
+    def __init__(self, path, max_bytes=None, max_age=None, retention=None, retention_bytes=None,
+                 compression="zstd"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.retention = retention
+        self.retention_bytes = retention_bytes
+        self.compression = compression if compression != "zstd" or zstandard is not None else "gzip"
+        # Dosyayı okuyan taraf (ingester) aktif dosyayı açmış mı? Açmadan döndürülürse
+        # segment hiç okunmadan atlanır; bu durumda döndürme bir sonraki flush'a kalır
+        self.reader_ready = None
+        self._active_first = None
+        self._compressing = set()
+        self._lock = threading.Lock()
+
+    def due(self, size):
+        """Aktif dosya (size byte) döndürülmeli mi?"""
+        if size == 0 or (self.reader_ready is not None and not self.reader_ready()):
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        if self.max_age:
+            if self._active_first is None:
+                self._active_first = _head_timestamp(self.path) or time.time()
+            return time.time() - self._active_first >= self.max_age
+        return False
+
+    def rotate(self):
+        """Aktif dosyayı segment adına taşır ve sıkıştırmayı başlatır. Çağıran
+        dosyayı kapatmış olmalı; sonra aynı yolda yenisini açar."""
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        raw_path = f"{self.path}.{stamp}"
+        n = 1
+        # Aynı saniyede ikinci döndürme: ham ya da sıkıştırılmış segmentin üzerine yazma
+        while any(os.path.exists(raw_path + suffix) for suffix in ("", ".gz", ".zst")):
+            raw_path = f"{self.path}.{stamp}-{n}"
+            n += 1
+        try:
+            os.rename(self.path, raw_path)
+        except OSError as e:
+            print(f"Log rotation failed: {e}")
+            return None
+        self._active_first = None
+        self.add_raw(raw_path)
+        threading.Thread(target=self.compress, args=(raw_path,), name="log-compress", daemon=True).start()
+        return raw_path
+
+    def recover(self):
+        """Yarım kalmış (sıkıştırılmamış) segmentleri sıkıştırır ve retention uygular.
+        get_segment_manager bunu arka planda çalıştırır."""
+        raw_paths = [p for p in sorted(glob.glob(glob.escape(self.path) + ".*")) if RAW_SEGMENT_RE.search(p)]
+        listed = {s["file"] for s in read_manifest(self.path)}
+        pending = []
+        for raw_path in raw_paths:
+            name = os.path.basename(raw_path)
+            if listed & {name + ".gz", name + ".zst"}:
+                # Sıkıştırılmışı manifest'te: ham dosya sadece silinmeden kalmış
+                for path in (raw_path, raw_path + BLOCK_SUFFIX):
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+                continue
+            if name not in listed:
+                self.add_raw(raw_path)
+            pending.append(raw_path)
+        for raw_path in pending:
+            self.compress(raw_path)
+        self.enforce_retention()
+
+    def add_raw(self, raw_path):
+        """Döndürülmüş ham segmenti sıkıştırılana kadar okunabilsin diye manifest'e
+        "none" codec'iyle ekler; blok offset'leri ham dosyadaki yerlerdir."""
+        try:
+            entry, blocks = self._split(raw_path, "none")
+            with open(raw_path + BLOCK_SUFFIX, "wb") as f:
+                f.write(blocks)
+        except OSError as e:
+            print(f"Cannot index log segment {raw_path}: {e}")
+            return None
+        self._replace_entries(entry, ())
+        return entry
+
+    def _split(self, raw_path, codec, dst=None):
+        """raw_path'i BLOCK_LINES satırlık bloklara böler: (manifest kaydı, blok indeksi).
+        dst verilirse bloklar codec ile sıkıştırılıp oraya yazılır. Kayıttaki inode ve
+        end (son tam satırın bittiği offset) ham dosyanındır; import bunları canlı
+        ingester'ın checkpoint'iyle karşılaştırır."""
+        suffix, compress, _ = _codec(codec)
+        entry = {"file": os.path.basename(raw_path) + suffix, "codec": codec, "first_ts": None,
+                 "last_ts": None, "lines": 0, "bytes": 0, "size": 0, "inode": None, "end": 0}
+        blocks = bytearray()
+        last_ts = 0.0
+        offset = 0
+        partial = 0
+        with open(raw_path, "rb") as src:
+            entry["inode"] = os.fstat(src.fileno()).st_ino
+            buf = b""
+            pending = []
+            while True:
+                chunk = src.read(READ_CHUNK)
+                if chunk:
+                    lines = (buf + chunk).split(b"\n")
+                    buf = lines.pop()
+                    pending.extend(lines)
+                elif buf:
+                    # Yarım kalmış son satır da saklanır
+                    partial = len(buf)
+                    pending.append(buf)
+                    buf = b""
+                # Tam bloklar hemen, kalan satırlar dosya bitince yazılır
+                while len(pending) >= BLOCK_LINES or (not chunk and pending):
+                    block, pending = pending[:BLOCK_LINES], pending[BLOCK_LINES:]
+                    stamps = [line_timestamp(line[:HEAD_BYTES]) for line in block]
+                    block_ts = next((ts for ts in stamps if ts is not None), last_ts)
+                    last_ts = next((ts for ts in reversed(stamps) if ts is not None), block_ts)
+                    if entry["first_ts"] is None and block_ts:
+                        entry["first_ts"] = block_ts
+                    data = b"\n".join(block) + b"\n"
+                    if dst is None:
+                        blocks += RECORD.pack(offset, block_ts)
+                    else:
+                        blocks += RECORD.pack(dst.tell(), block_ts)
+                        dst.write(compress(data))
+                    offset += len(data)
+                    entry["lines"] += len(block)
+                    entry["bytes"] += len(data)
+                if not chunk:
+                    break
+            entry["size"] = dst.tell() if dst is not None else src.tell()
+            entry["end"] = src.tell() - partial
+        entry["last_ts"] = last_ts or entry["first_ts"]
+        return entry, blocks
+
+    def _replace_entries(self, entry, names):
+        """entry'yi manifest'e ekler; aynı adlı kayıtla names'teki kayıtlar çıkarılır."""
+        drop = {entry["file"], *names}
+        with self._lock:
+            segments = [s for s in read_manifest(self.path) if s["file"] not in drop]
+            segments.append(entry)
+            segments.sort(key=lambda s: (s["first_ts"] or 0, s["file"]))
+            _write_json(self.path + MANIFEST_SUFFIX, {"segments": segments})
+
+    def compress(self, raw_path):
+        # Döndürme thread'i ile arka plandaki recover aynı segmente denk gelebilir
+        with self._lock:
+            if raw_path in self._compressing or not os.path.exists(raw_path):
+                return None
+            self._compressing.add(raw_path)
+        try:
+            out_path = raw_path + _codec(self.compression)[0]
+            try:
+                with open(out_path + ".tmp", "wb") as dst:
+                    entry, blocks = self._split(raw_path, self.compression, dst)
+                with open(out_path + BLOCK_SUFFIX, "wb") as f:
+                    f.write(blocks)
+                os.replace(out_path + ".tmp", out_path)
+            except OSError as e:
+                print(f"Log segment compression failed for {raw_path}: {e}")
+                return None
+            # Ham kayıt sıkıştırılmışıyla değişir; okuyucular manifest'i yeniden okur
+            self._replace_entries(entry, (os.path.basename(raw_path),))
+            for path in (raw_path, raw_path + BLOCK_SUFFIX):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+        finally:
+            with self._lock:
+                self._compressing.discard(raw_path)
+        self.enforce_retention()
+        return entry
+
+    def enforce_retention(self, now=None):
+        """Süresi geçen ya da toplam boyut sınırını aşan en eski segmentleri siler."""
+        now = now or time.time()
+        with self._lock:
+            segments = read_manifest(self.path)
+            keep = list(segments)
+            if self.retention:
+                keep = [s for s in keep if (s["last_ts"] or now) >= now - self.retention]
+            if self.retention_bytes:
+                while keep and sum(s["size"] for s in keep) > self.retention_bytes:
+                    keep.pop(0)
+            removed = [s for s in segments if s not in keep]
+            if not removed:
+                return []
+            _write_json(self.path + MANIFEST_SUFFIX, {"segments": keep})
+        directory = os.path.dirname(self.path)
+        for segment in removed:
+            for path in (segment["file"], segment["file"] + BLOCK_SUFFIX):
+                try:
+                    os.unlink(os.path.join(directory, path))
+                except OSError:
+                    pass
+        return removed
+
+
+class SegmentedLog:
+    """Okuyucu tarafı: sıkıştırılmış segmentler + aktif dosya (LineIndex) tek bir
+    satır numaralandırması olarak görünür; en eski segmentin ilk satırı 0'dır.
+    Zaman aralığı verilen okumalar aralık dışındaki segmentleri hiç açmaz."""
+
+    def __init__(self, index):
+        self.index = index
+        self.path = index.path
+        self.directory = os.path.dirname(self.path)
+        self.segments = []
+        self.starts = []
+        self.segment_lines = 0
+        self._manifest_mtime = None
+        self._blocks = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def count(self):
+        return self.segment_lines + self.index.count
+
+    def refresh(self):
+        try:
+            mtime = os.stat(self.path + MANIFEST_SUFFIX).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._manifest_mtime:
+            with self._lock:
+                self._manifest_mtime = mtime
+                self.segments = read_manifest(self.path) if mtime else []
+                self.starts = []
+                total = 0
+                for segment in self.segments:
+                    self.starts.append(total)
+                    total += segment["lines"]
+                self.segment_lines = total
+                names = {segment["file"] for segment in self.segments}
+                self._blocks = {name: blocks for name, blocks in self._blocks.items() if name in names}
+        return self.index.refresh()
+
+    def _block_index(self, segment):
+        blocks = self._blocks.get(segment["file"])
+        if blocks is None:
+            with open(os.path.join(self.directory, segment["file"] + BLOCK_SUFFIX), "rb") as f:
+                data = f.read()
+            blocks = [RECORD.unpack_from(data, pos) for pos in range(0, len(data), RECORD.size)]
+            self._blocks[segment["file"]] = blocks
+        return blocks
+
+    def _block(self, segment, i):
+        """Segmentin i. bloğunun satırları."""
+        key = (segment["file"], i)
+        with self._lock:
+            lines = self._cache.get(key)
+            if lines is not None:
+                self._cache.move_to_end(key)
+                return lines
+        blocks = self._block_index(segment)
+        begin = blocks[i][0]
+        end = blocks[i + 1][0] if i + 1 < len(blocks) else segment["size"]
+        with open(os.path.join(self.directory, segment["file"]), "rb") as f:
+            f.seek(begin)
+            data = f.read(end - begin)
+        lines = _codec(segment["codec"])[2](data).decode("utf-8", errors="replace").split("\n")[:-1]
+        with self._lock:
+            self._cache[key] = lines
+            if len(self._cache) > CACHED_BLOCKS:
+                self._cache.popitem(last=False)
+        return lines
+
+    def read_lines(self, first, count):
+        """[first, first + count) aralığındaki satırlar (segmentler + aktif dosya)."""
+        last = min(first + count, self.count)
+        rows = []
+        pos = first
+        while pos < last and pos < self.segment_lines:
+            n = bisect.bisect_right(self.starts, pos) - 1
+            segment, start = self.segments[n], self.starts[n]
+            i, offset = divmod(pos - start, BLOCK_LINES)
+            take = min(BLOCK_LINES - offset, last - pos, start + segment["lines"] - pos)
+            try:
+                lines = self._block(segment, i)[offset:offset + take]
+            except (OSError, ValueError) as e:
+                # Retention silmiş ya da codec kurulu değil: satırlar boş döner
+                print(f"Cannot read log segment {segment['file']}: {e}")
+                lines = []
+            rows.extend(lines + [""] * (take - len(lines)))
+            pos += take
+        if pos < last:
+            rows.extend(self.index.read_lines(pos - self.segment_lines, last - pos))
+        return rows
+
+    def seek_time(self, ts):
+        """Zaman damgası ts'ye eşit ya da büyük ilk satırın numarası."""
+        for n, segment in enumerate(self.segments):
+            if segment["last_ts"] is None or segment["last_ts"] < ts:
+                continue
+            blocks = self._block_index(segment)
+            i = max(bisect.bisect_left([b[1] for b in blocks], ts) - 1, 0)
+            lineno = self.starts[n] + i * BLOCK_LINES
+            for line in self._block(segment, i):
+                stamp = line_timestamp(line[:HEAD_BYTES].encode())
+                if stamp is not None and stamp >= ts:
+                    return lineno
+                lineno += 1
+            return lineno
+        return self.segment_lines + self.index.seek_time(ts)
+
+    def iter_lines(self, reverse=False, since=None, until=None):
+        """(satır no, metin) çiftleri; since/until (epoch) verilirse aralık dışındaki
+        segmentler atlanır. Satır düzeyinde süzme çağırana kalır."""
+        parts = []
+        for n, segment in enumerate(self.segments):
+            if since is not None and segment["last_ts"] is not None and segment["last_ts"] < since:
+                continue
+            if until is not None and segment["first_ts"] is not None and segment["first_ts"] > until:
+                continue
+            parts.append((self.starts[n], segment["lines"]))
+        active_first = self.segment_lines
+        if since is not None:
+            active_first += self.index.seek_time(since)
+        parts.append((active_first, self.count - active_first))
+        if reverse:
+            parts.reverse()
+        for first, count in parts:
+            starts = range(first, first + count, BLOCK_LINES)
+            if reverse:
+                starts = reversed(starts)
+            for start in starts:
+                numbered = enumerate(self.read_lines(start, min(BLOCK_LINES, first + count - start)), start)
+                if reverse:
+                    numbered = reversed(list(numbered))
+                yield from numbered
+
+    # Sayfalama LineIndex ile aynı: refresh/read_lines/iter_lines/count üzerinden
+    page = LineIndex.page
+
+
+_segment_manager = None
+_alert_log = None
+
+
+def get_segment_manager():
+    """Yakalanan log dosyası (Config.SNORT_LOG_FILE) için döndürme yöneticisi;
+    döndürme kapalıysa None."""
+    global _segment_manager
+    if _segment_manager is None and (Config.SNORT_LOG_ROTATE_BYTES or Config.SNORT_LOG_ROTATE_SECONDS):
+        _segment_manager = SegmentManager(
+            Config.SNORT_LOG_FILE,
+            max_bytes=Config.SNORT_LOG_ROTATE_BYTES,
+            max_age=Config.SNORT_LOG_ROTATE_SECONDS,
+            retention=Config.SNORT_LOG_RETENTION_DAYS * 86400 if Config.SNORT_LOG_RETENTION_DAYS else None,
+            retention_bytes=Config.SNORT_LOG_RETENTION_BYTES,
+            compression=Config.SNORT_LOG_COMPRESSION,
+        )
+        # Çağıran supervisor kilidini tutuyor olabilir: sıkıştırma beklenmez
+        threading.Thread(target=_segment_manager.recover, name="log-compress", daemon=True).start()
+    return _segment_manager
+
+
+def get_alert_log():
+    """Logs görünümü ve dışa aktarım için segment farkında okuyucu."""
+    global _alert_log
+    if _alert_log is None:
+        _alert_log = SegmentedLog(get_line_index())
+    return _alert_log
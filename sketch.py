@@ -0,0 +1,126 @@
+# snort_manager/sketch.py
+import heapq
+import math
+
+MASK64 = (1 << 64) - 1
+# HyperLogLog register sayısı 2^p; p=10 için ~%3 standart hata, 1 KiB bellek
+HLL_PRECISION = 10
+_POW2 = [2.0 ** -i for i in range(66)]
+
+
+def _hash64(key):
+    """hash() üzerine splitmix64 karıştırıcısı: int anahtarlar (sid, port) kendi
+    değerine hash'lendiği için bitler dağıtılmadan HLL kullanılamaz. str hash'i
+    süreç başına tuzlanır; sketch'ler yalnızca aynı süreç içinde birleştirilir."""
+    h = hash(key) & MASK64
+    h ^= h >> 30
+    h = (h * 0xBF58476D1CE4E5B9) & MASK64
+    h ^= h >> 27
+    h = (h * 0x94D049BB133111EB) & MASK64
+    return h ^ (h >> 31)
+
+
+class SpaceSaving:
+    """Sabit kapasiteli top-K özeti (Metwally ve ark.). En fazla capacity anahtar
+    izlenir; yeni bir anahtar geldiğinde en küçük sayaç ondan devralınır, böylece
+    sayılar en fazla error kadar fazla tahmin edilir ve toplam her zaman kesindir.
+    dict gibi get/items/values sunar; aynı türden özetler merge ile birleştirilir."""
+
+    __slots__ = ("capacity", "counts", "errors", "_heap")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        # Anahtar başına tek (sayı, anahtar) girdisi; sayı güncel değerden küçük olabilir
+        self._heap = []
+
+    def __len__(self):
+        return len(self.counts)
+
+    def get(self, key, default=0):
+        return self.counts.get(key, default)
+
+    def items(self):
+        return self.counts.items()
+
+    def values(self):
+        return self.counts.values()
+
+    def add(self, key, n=1, error=0):
+        counts = self.counts
+        current = counts.get(key)
+        if current is not None:
+            counts[key] = current + n
+            self.errors[key] += error
+            return
+        heap = self._heap
+        if len(counts) < self.capacity:
+            counts[key] = n
+            self.errors[key] = error
+            heapq.heappush(heap, (n, key))
+            return
+        while True:
+            low, victim = heap[0]
+            actual = counts[victim]
+            if actual == low:
+                break
+            heapq.heapreplace(heap, (actual, victim))
+        del counts[victim]
+        del self.errors[victim]
+        counts[key] = low + n
+        self.errors[key] = low + error
+        heapq.heapreplace(heap, (low + n, key))
+
+    def update(self, counts):
+        """Kesin sayaçlardan (ör. saniyelik dict) toplu ekleme."""
+        add = self.add
+        for key, n in counts.items():
+            add(key, n)
+
+    def merge(self, other):
+        add = self.add
+        errors = other.errors
+        for key, n in other.counts.items():
+            add(key, n, errors[key])
+
+    def top(self, k):
+        """En büyük k anahtar: [(anahtar, sayı, hata payı), ...]."""
+        return [(key, n, self.errors[key])
+                for key, n in heapq.nlargest(k, self.counts.items(), key=lambda item: item[1])]
+
+
+class HyperLogLog:
+    """Sabit bellekli farklı eleman sayısı tahmini; register'ların maksimumu
+    alınarak bucket'lar ve instance'lar arasında kayıpsız birleştirilir."""
+
+    __slots__ = ("p", "registers")
+
+    def __init__(self, p=HLL_PRECISION):
+        self.p = p
+        self.registers = bytearray(1 << p)
+
+    def add(self, key):
+        h = _hash64(key)
+        p = self.p
+        rank = 65 - p - (h & ((1 << (64 - p)) - 1)).bit_length()
+        index = h >> (64 - p)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add_many(self, keys):
+        for key in keys:
+            self.add(key)
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        registers = self.registers
+        m = len(registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(map(_POW2.__getitem__, registers))
+        zeros = registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Küçük kardinalitelerde linear counting daha doğru
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
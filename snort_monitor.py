@@ -4,6 +4,8 @@ import subprocess
 import threading
 from datetime import datetime
 from flask import Flask, render_template, request, redirect, url_for, flash
+from snort_manager.capture import LogCapture
+from snort_manager.segments import get_segment_manager
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key'  # Güvenlik için kullanılan gizli anahtar
@@ -61,12 +63,12 @@ def stop_snort():
         snort_process = None
 
 def log_snort_output():
-    """Snort çıktısını log dosyasına yazar."""
+    """Snort çıktısını log dosyasının sonuna toplu olarak ekler (önceki loglar korunur)."""
     global snort_process
     if snort_process:
-        with open(snort_log_file, "w") as log_file:
-            for line in iter(snort_process.stdout.readline, b''):
-                log_file.write(line.decode('utf-8'))
+        capture = LogCapture(snort_log_file, rotator=get_segment_manager())
+        capture.attach(snort_process.stdout)
+        capture.join()
 
 @app.route('/')
 def index():
@@ -0,0 +1,214 @@
+# snort_manager/supervisor.py
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+
+MIN_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+# Bu kadar süre ayakta kalan instance'ın backoff'u sıfırlanır
+STABLE_AFTER = 60.0
+# Arayüz adları Snort'un argümanlarına ve log dizin adlarına girer
+INTERFACE_RE = re.compile(r"^[A-Za-z0-9_.:-]+$")
+
+
+def parse_interfaces(spec):
+    """"eth0*4, eth1" -> [("eth0", 0, 4), ("eth0", 1, 4), ("eth0", 2, 4), ("eth0", 3, 4), ("eth1", 0, 1)].
+    "*N" aynı arayüzde afpacket fanout ile N worker anlamına gelir. Geçersiz arayüz
+    adında ValueError."""
+    result = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, workers = item.partition("*")
+        name = name.strip()
+        if not INTERFACE_RE.match(name):
+            raise ValueError(f"Invalid interface name: {name!r}")
+        workers = int(workers) if workers.isdigit() and int(workers) > 0 else 1
+        result.extend((name, i, workers) for i in range(workers))
+    return result
+
+
+class SnortInstance:
+    """Supervisor'ın yönettiği tek bir Snort süreci ve sayaçları."""
+
+    def __init__(self, interface, worker, workers, cpu, log_dir):
+        self.interface = interface
+        self.worker = worker
+        self.workers = workers
+        self.cpu = cpu
+        self.log_dir = log_dir
+        self.name = interface if workers == 1 else f"{interface}-{worker}"
+        self.process = None
+        # Bu süreç başlarken snort_stderr.log'un boyutu; çıktısı buradan itibaren okunur
+        self.stderr_offset = 0
+        self.state = "stopped"
+        self.started_at = None
+        self.restarts = 0
+        self.exit_code = None
+        self.backoff = MIN_BACKOFF
+        self.next_start = None
+        # "alerts", "packets" gibi monoton sayaçlar; oranlar bunlardan hesaplanır
+        self.counters = {}
+        self.rates = {}
+        self._sample = (time.monotonic(), {})
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    def uptime(self):
+        if self.state != "running" or self.started_at is None:
+            return 0
+        return time.time() - self.started_at
+
+    def update_rates(self):
+        now = time.monotonic()
+        then, previous = self._sample
+        elapsed = now - then
+        if elapsed <= 0:
+            return
+        self.rates = {key: (value - previous.get(key, 0)) / elapsed
+                      for key, value in self.counters.items()}
+        self._sample = (now, dict(self.counters))
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "interface": self.interface,
+            "cpu": self.cpu,
+            "pid": self.pid,
+            "state": self.state,
+            "uptime": round(self.uptime()),
+            "restarts": self.restarts,
+            "exit_code": self.exit_code,
+            "counters": dict(self.counters),
+            "rates": {key: round(value, 1) for key, value in self.rates.items()},
+        }
+
+
+class SnortSupervisor:
+    """Her arayüz (ya da fanout worker'ı) için ayrı bir Snort süreci başlatır,
+    CPU'lara sabitler, çöken süreçleri üstel backoff ile yeniden başlatır.
+
+    build_command(instance) argv listesini üretir; on_spawn(instance) süreç
+    başladıktan sonra çıktısını ingest hattına bağlamak için, collect(instance)
+    her kontrolde instance.counters'ı güncellemek için çağrılır."""
+
+    def __init__(self, build_command, on_spawn=None, collect=None, check_interval=1.0):
+        self.build_command = build_command
+        self.on_spawn = on_spawn
+        self.collect = collect
+        self.check_interval = check_interval
+        self.instances = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, interfaces, log_dir, cpus=None):
+        """interfaces: parse_interfaces çıktısı. Tek instance varsa log_dir'i doğrudan,
+        birden fazlaysa instance başına bir alt dizin kullanır."""
+        self.stop()
+        cpus = list(cpus) if cpus else sorted(os.sched_getaffinity(0))
+        with self._lock:
+            self.instances = []
+            for i, (interface, worker, workers) in enumerate(interfaces):
+                instance = SnortInstance(interface, worker, workers, cpus[i % len(cpus)], log_dir)
+                if len(interfaces) > 1:
+                    instance.log_dir = os.path.join(log_dir, instance.name)
+                os.makedirs(instance.log_dir, exist_ok=True)
+                self.instances.append(instance)
+                self._spawn(instance)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._monitor, name="snort-supervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            for instance in self.instances:
+                instance.state = "stopped"
+                instance.next_start = None
+                if instance.process and instance.process.poll() is None:
+                    instance.process.terminate()
+            for instance in self.instances:
+                if instance.process:
+                    try:
+                        instance.process.wait(timeout)
+                    except subprocess.TimeoutExpired:
+                        instance.process.kill()
+
+    def reload(self):
+        """Çalışan instance'lara SIGHUP gönderir: Snort yapılandırmayı ve kuralları
+        trafiği kesmeden yeniden yükler. Sinyal gönderilen instance'ları döner."""
+        targets = []
+        with self._lock:
+            for instance in self.instances:
+                if instance.state != "running" or instance.process.poll() is not None:
+                    continue
+                try:
+                    os.kill(instance.pid, signal.SIGHUP)
+                    targets.append(instance)
+                except OSError as e:
+                    print(f"Failed to reload Snort on {instance.name}: {e}")
+        return targets
+
+    def running(self):
+        return any(i.state == "running" for i in self.instances)
+
+    def status(self):
+        with self._lock:
+            return [instance.to_dict() for instance in self.instances]
+
+    def _spawn(self, instance):
+        command = self.build_command(instance)
+        cpu = instance.cpu
+        try:
+            with open(os.path.join(instance.log_dir, "snort_stderr.log"), "ab") as stderr_log:
+                instance.stderr_offset = stderr_log.tell()
+                # preexec_fn fork sonrası, exec öncesi çalışır: Snort bu CPU'ya sabitlenir
+                instance.process = subprocess.Popen(
+                    command, stdout=subprocess.PIPE, stderr=stderr_log,
+                    preexec_fn=lambda: os.sched_setaffinity(0, {cpu}),
+                )
+        except Exception as e:
+            print(f"Failed to start Snort on {instance.name}: {e}")
+            self._schedule_restart(instance)
+            return
+        instance.state = "running"
+        instance.started_at = time.time()
+        instance.exit_code = None
+        instance.next_start = None
+        if self.on_spawn:
+            self.on_spawn(instance)
+
+    def _schedule_restart(self, instance):
+        instance.state = "backoff"
+        instance.next_start = time.monotonic() + instance.backoff
+        instance.backoff = min(instance.backoff * 2, MAX_BACKOFF)
+
+    def _monitor(self):
+        while not self._stop.wait(self.check_interval):
+            with self._lock:
+                for instance in self.instances:
+                    if self.collect:
+                        self.collect(instance)
+                    instance.update_rates()
+                    if instance.state == "running":
+                        code = instance.process.poll()
+                        if code is None:
+                            if time.time() - instance.started_at >= STABLE_AFTER:
+                                instance.backoff = MIN_BACKOFF
+                            continue
+                        instance.exit_code = code
+                        print(f"Snort on {instance.name} exited with {code}, restarting in {instance.backoff:.0f}s")
+                        self._schedule_restart(instance)
+                    elif instance.state == "backoff" and time.monotonic() >= instance.next_start:
+                        instance.restarts += 1
+                        self._spawn(instance)
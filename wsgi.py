@@ -0,0 +1,8 @@
+# wsgi.py
+"""Üretim giriş noktası: gunicorn -c gunicorn.conf.py wsgi:app
+
+Worker'lar Snort'u ve ingest hattını kendileri çalıştırmaz; gunicorn.conf.py
+kontrol daemon'unu başlatır ve worker'lar ona Unix soketi üzerinden bağlanır."""
+from webapp import create_app
+
+app = create_app()